@@ -0,0 +1,59 @@
+"""Benchmarks for binning variants by frequency in ``class_by_freq``.
+
+``count_per_record`` is the previous implementation that locates the bin of each
+variant with ``locate()`` and increments nested lists.  ``count_batched`` uses
+``ClassByFreqCounter``, which bins all buffered variants at once.  With hundreds of
+thresholds, the cost of ``locate()`` grows linearly while the batched version stays
+the same.
+
+Run with ``pytest benchmarks/bench_class_by_freq.py`` (needs ``pytest-benchmark``).
+"""
+
+import random
+
+import pytest
+
+from clinvar_data import class_by_freq
+from clinvar_data.pbs.class_by_freq import CoarseClinicalSignificance
+
+#: Number of variants per round.
+VARIANTS = 100_000
+#: Number of genes the variants are distributed over.
+GENES = 2_000
+
+
+@pytest.fixture(scope="module")
+def variants():
+    rng = random.Random(42)
+    classes = [v.number for v in CoarseClinicalSignificance.DESCRIPTOR.values if v.number]
+    return [
+        (
+            f"HGNC:{rng.randint(1, GENES)}",
+            rng.choice(classes),
+            rng.random() ** 4 if rng.random() < 0.8 else None,
+        )
+        for _ in range(VARIANTS)
+    ]
+
+
+def count_per_record(thresholds, variants):
+    counts = {}
+    for hgnc_id, pathogenicity, gmaf in variants:
+        if hgnc_id not in counts:
+            counts[hgnc_id] = class_by_freq.zero_counts(len(thresholds))
+        counts[hgnc_id][pathogenicity][class_by_freq.locate(thresholds, gmaf)] += 1
+    return counts
+
+
+def count_batched(thresholds, variants):
+    counter = class_by_freq.ClassByFreqCounter(thresholds)
+    for hgnc_id, pathogenicity, gmaf in variants:
+        counter.add(hgnc_id, pathogenicity, gmaf)
+    return counter.to_dict()
+
+
+@pytest.mark.parametrize("num_thresholds", [len(class_by_freq.DEFAULT_THRESHOLDS), 500])
+@pytest.mark.parametrize("impl", [count_per_record, count_batched])
+def test_class_by_freq(benchmark, variants, impl, num_thresholds):
+    thresholds = [i / (num_thresholds - 1) for i in range(num_thresholds)]
+    benchmark(impl, thresholds, variants)
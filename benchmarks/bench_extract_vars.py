@@ -0,0 +1,96 @@
+"""Benchmarks for thinning out the records of extracted variants.
+
+The ``ex_kynu`` record is enlarged to a VCV with many SCVs (including trait sets
+and observations) and several sequence locations.  ``records_previous`` is the
+previous implementation that copies the aggregate classifications and all clinical
+assertions for each sequence location and then clears the dropped fields.
+``records_current`` copies only the kept fields, once per VCV.
+
+Run with ``pytest benchmarks/bench_extract_vars.py`` (needs ``pytest-benchmark``).
+"""
+
+import pytest
+
+from clinvar_data import extract_vars
+from clinvar_data.io import records
+from clinvar_data.pbs.clinvar_public import (
+    AggregateClassificationSet,
+    ClinicalAssertion,
+)
+from clinvar_data.pbs.extracted_vars import ExtractedVcvRecord
+
+#: Number of SCVs of the enlarged record.
+SCVS = 200
+#: Number of copies of the sequence locations of the enlarged record.
+LOCATION_COPIES = 2
+
+
+@pytest.fixture(scope="module")
+def variation_archive():
+    va = next(records.iter_variation_archives("tests/clinvar_data/data/ex_kynu.jsonl"))
+    classified_record = va.classified_record
+    assertion = classified_record.clinical_assertions[0]
+    for _ in range(SCVS - 1):
+        classified_record.clinical_assertions.add().CopyFrom(assertion)
+    locations = list(classified_record.simple_allele.locations)
+    for _ in range(LOCATION_COPIES - 1):
+        classified_record.simple_allele.locations.extend(locations)
+    return va
+
+
+def records_previous(va):
+    """Previous implementation, thinning out by ``CopyFrom()`` for each location."""
+    classified_record = va.classified_record
+    result = []
+    for location in classified_record.simple_allele.locations:
+        for sequence_location in location.sequence_locations:
+            classifications = AggregateClassificationSet()
+            classifications.CopyFrom(classified_record.classifications)
+            for field in extract_vars.AGGREGATE_CLASSIFICATION_SET_NESTED_DROPPED:
+                if classifications.HasField(field):
+                    for key in extract_vars.AGGREGATE_CLASSIFICATION_DROPPED:
+                        getattr(classifications, field).ClearField(key)
+            assertions = []
+            for clinical_assertion in classified_record.clinical_assertions:
+                entry = ClinicalAssertion()
+                entry.CopyFrom(clinical_assertion)
+                for key in extract_vars.CLINICAL_ASSERTION_DROPPED:
+                    entry.ClearField(key)
+                entry.clinvar_accession.ClearField("submitter_identifiers")
+                entry.classifications.ClearField("comments")
+                assertions.append(entry)
+            record = ExtractedVcvRecord(
+                classifications=classifications,
+                clinical_assertions=assertions,
+                sequence_location=sequence_location,
+            )
+            result.append(record.SerializeToString())
+    return result
+
+
+def records_current(va):
+    """Current implementation, copying the kept fields once per VCV."""
+    classified_record = va.classified_record
+    record = ExtractedVcvRecord()
+    extract_vars.thin_out_aggregate_classification_set_into(
+        classified_record.classifications, record.classifications
+    )
+    for clinical_assertion in classified_record.clinical_assertions:
+        extract_vars.thin_out_clinical_assertion_into(
+            clinical_assertion, record.clinical_assertions.add()
+        )
+    result = []
+    for location in classified_record.simple_allele.locations:
+        for sequence_location in location.sequence_locations:
+            record.sequence_location.CopyFrom(sequence_location)
+            result.append(record.SerializeToString())
+    return result
+
+
+def test_same_result(variation_archive):
+    assert records_previous(variation_archive) == records_current(variation_archive)
+
+
+@pytest.mark.parametrize("impl", [records_previous, records_current])
+def test_thin_out(benchmark, variation_archive, impl):
+    benchmark(impl, variation_archive)
@@ -0,0 +1,98 @@
+"""Benchmarks for left-aligning indels in ``normalize.normalize``.
+
+The variants mimic the ClinVar records that are expensive to normalize: expansions
+and contractions of microsatellites and long duplications, given right-aligned
+as obtained from HGVS descriptions.  ``normalize_stepwise`` is the previous
+implementation that shifts one base at a time and serves as the baseline.
+
+Run with ``pytest benchmarks/bench_normalize.py`` (needs ``pytest-benchmark``).
+"""
+
+import random
+
+import pysam
+import pytest
+
+from clinvar_data.conversion import normalize
+from clinvar_data.conversion.normalizer import CachedFastaFile
+
+
+def normalize_stepwise(pysam_fasta, chrom, pos, ref, alt):
+    """Previous implementation of the left-alignment, shifting one base at a time."""
+    keep_working = True
+    while keep_working:
+        keep_working = False
+        if len(ref) > 0 and len(alt) > 0 and ref[-1] == alt[-1]:
+            ref = ref[:-1]
+            alt = alt[:-1]
+            keep_working = True
+        if len(ref) == 0 or len(alt) == 0:
+            preceding_base = pysam_fasta.fetch(chrom, pos - 2, pos - 1)
+            ref = preceding_base + ref
+            alt = preceding_base + alt
+            pos = pos - 1
+            keep_working = True
+    while len(ref) > 1 and len(alt) > 1 and ref[0] == alt[0]:
+        ref = ref[1:]
+        alt = alt[1:]
+        pos = pos + 1
+    return chrom, pos, ref, alt
+
+
+def normalize_windowed(pysam_fasta, chrom, pos, ref, alt):
+    """Current implementation (without the REF check done by both)."""
+    return normalize.normalize(pysam_fasta, chrom, pos, ref, alt)
+
+
+@pytest.fixture(scope="module")
+def reference_and_variants(tmp_path_factory):
+    """Write reference with microsatellites and return FASTA path and right-aligned variants."""
+    rng = random.Random(42)
+    parts = []
+    repeats = []  # (start, unit, count), 0-based
+    offset = 0
+    for _ in range(200):
+        spacer = "".join(rng.choice("ACGT") for _ in range(rng.randint(500, 2000)))
+        unit = rng.choice(["A", "CA", "CAG", "AAAT", "GGGGCC"])
+        count = rng.randint(20, 300)
+        parts.append(spacer)
+        offset += len(spacer)
+        repeats.append((offset, unit, count))
+        parts.append(unit * count)
+        offset += len(unit) * count
+    seq = "".join(parts) + "ACGT" * 100
+    path = f"{tmp_path_factory.mktemp('ref')}/ref.fa"
+    with open(path, "wt") as outputf:
+        print(">chr1", file=outputf)
+        for i in range(0, len(seq), 60):
+            print(seq[i : i + 60], file=outputf)
+    pysam.faidx(path)
+
+    variants = []
+    for start, unit, count in repeats:
+        end = start + len(unit) * count  # 0-based, exclusive
+        copies = rng.randint(1, min(count, 20))
+        anchor = seq[end - 1]
+        # microsatellite expansion and contraction at the right end of the repeat
+        variants.append(("chr1", end, anchor, anchor + unit * copies))
+        deleted = seq[end - len(unit) * copies - 1 : end]
+        variants.append(("chr1", end - len(unit) * copies, deleted, anchor))
+        # long duplication of the repeat and its downstream sequence
+        dup = seq[end - len(unit) * count // 2 : end + rng.randint(100, 1000)]
+        last = end + len(dup) - len(unit) * count // 2
+        variants.append(("chr1", last, seq[last - 1], seq[last - 1] + dup))
+    return path, variants
+
+
+@pytest.mark.parametrize("fasta_kind", ["pysam", "cached"])
+@pytest.mark.parametrize("impl", [normalize_stepwise, normalize_windowed])
+def test_left_align(benchmark, reference_and_variants, fasta_kind, impl):
+    path, variants = reference_and_variants
+    fasta_file = pysam.FastaFile(path)
+    fasta = CachedFastaFile(fasta_file) if fasta_kind == "cached" else fasta_file
+    expected = [normalize_stepwise(fasta_file, *variant) for variant in variants]
+
+    def run():
+        return [impl(fasta, *variant) for variant in variants]
+
+    assert benchmark(run) == expected
@@ -0,0 +1,68 @@
+"""Benchmarks for the XML parser backends of the conversion.
+
+Each parser backend of ``clinvar_data.conversion.parsing`` streams a synthetic
+release (see ``synthetic.write_release_xml()``) and the records are converted with
+``ConvertVariationArchive``.  Besides the time, the mean peak of the memory allocated
+while parsing and converting one record is measured with ``tracemalloc`` in an extra
+run and stored as ``peak_kib_per_record`` in ``extra_info``.
+
+Run with ``pytest benchmarks/bench_parsing.py`` (needs ``pytest-benchmark``).
+"""
+
+import tracemalloc
+import typing
+
+import pytest
+import synthetic
+
+from clinvar_data.conversion import dict_to_pb, parsing
+
+#: Number of records of the synthetic release.
+RECORDS = 1_000
+
+
+@pytest.fixture(scope="module")
+def path_xml(tmp_path_factory) -> str:
+    path = str(tmp_path_factory.mktemp("release") / "release.xml")
+    synthetic.write_release_xml(path, RECORDS)
+    return path
+
+
+def parse_and_convert(
+    path: str, parser: str, callback: typing.Optional[typing.Callable[[], None]] = None
+):
+    """Parse the records in ``path`` and convert each, calling ``callback`` after each."""
+
+    def handle(item: dict[str, typing.Any]) -> bool:
+        dict_to_pb.ConvertVariationArchive.xmldict_data_to_pb(item)
+        if callback is not None:
+            callback()
+        return True
+
+    with open(path, "rb") as inputf:
+        parsing.parse_stream(inputf, handle, parser)
+
+
+def peak_kib_per_record(path: str, parser: str) -> float:
+    """Return the mean peak of memory allocated for parsing and converting one record."""
+    peaks = []
+    baseline = 0
+
+    def record_peak():
+        nonlocal baseline
+        peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+
+    tracemalloc.start()
+    try:
+        parse_and_convert(path, parser, record_peak)
+    finally:
+        tracemalloc.stop()
+    return sum(peaks) / len(peaks) / 1024
+
+
+@pytest.mark.parametrize("parser", parsing.PARSERS)
+def test_parse_and_convert(benchmark, path_xml, parser):
+    benchmark.pedantic(parse_and_convert, args=(path_xml, parser), rounds=3, iterations=1)
+    benchmark.extra_info["peak_kib_per_record"] = peak_kib_per_record(path_xml, parser)
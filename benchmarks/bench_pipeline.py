@@ -0,0 +1,154 @@
+"""End-to-end benchmarks of the ClinVar data pipeline on a synthetic release.
+
+A release of ``RECORDS`` records is generated offline from the test fixtures with
+``synthetic.write_release()`` (seed ``SEED``) and converted once.  The conversion,
+the normalizer, the variant extraction, and the reports are then timed on it.  Each
+benchmark stores the throughput as ``records_per_second`` and the peak resident set
+size of a separate run in a forked process as ``peak_rss_mib`` in ``extra_info``.
+
+The size and seed can be changed with the ``CLINVAR_BENCH_RECORDS`` and
+``CLINVAR_BENCH_SEED`` environment variables.  To compare commits, run with
+``--benchmark-autosave`` on the baseline and ``--benchmark-compare`` afterwards.
+
+Run with ``pytest benchmarks/bench_pipeline.py`` (needs ``pytest-benchmark``).
+"""
+
+import os
+import typing
+
+import pytest
+import synthetic
+
+from clinvar_data import (
+    class_by_freq,
+    conversion,
+    extract_vars,
+    gene_impact,
+    phenotype_link,
+)
+from clinvar_data.conversion.normalizer import VariationArchiveNormalizer
+from clinvar_data.io import records
+
+#: Number of records of the synthetic release.
+RECORDS = int(os.environ.get("CLINVAR_BENCH_RECORDS", synthetic.DEFAULT_RECORDS))
+#: Seed of the synthetic release.
+SEED = int(os.environ.get("CLINVAR_BENCH_SEED", synthetic.DEFAULT_SEED))
+#: Number of timed rounds per benchmark.
+ROUNDS = 3
+
+
+class Converted(typing.NamedTuple):
+    """The converted synthetic release."""
+
+    #: The synthetic release.
+    release: synthetic.Release
+    #: Path to the converted JSONL.
+    jsonl: str
+    #: Number of converted (normalized) records.
+    records: int
+
+
+@pytest.fixture(scope="module")
+def release(tmp_path_factory) -> synthetic.Release:
+    return synthetic.write_release(str(tmp_path_factory.mktemp("release")), RECORDS, SEED)
+
+
+@pytest.fixture(scope="module")
+def converted(release, tmp_path_factory) -> Converted:
+    jsonl = str(tmp_path_factory.mktemp("converted") / "release.jsonl")
+    conversion.convert(
+        release.xml,
+        jsonl,
+        show_progress=False,
+        fasta_ref_hg19=release.fasta_hg19,
+        fasta_ref_hg38=release.fasta_hg38,
+    )
+    with open(jsonl, "rt") as inputf:
+        return Converted(release, jsonl, sum(1 for _ in inputf))
+
+
+def peak_rss_mib(func: typing.Callable, *args, **kwargs) -> float:
+    """Run ``func`` in a forked process and return its peak resident set size in MiB."""
+    pid = os.fork()
+    if pid == 0:  # pragma: no cover
+        code = 1
+        try:
+            func(*args, **kwargs)
+            code = 0
+        finally:
+            os._exit(code)
+    _, status, rusage = os.wait4(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+    return rusage.ru_maxrss / 1024  # KiB on Linux
+
+
+def run_benchmark(benchmark, records: int, func: typing.Callable, *args, **kwargs):
+    """Time ``func`` and record the throughput and the peak memory."""
+    benchmark.pedantic(func, args=args, kwargs=kwargs, rounds=ROUNDS, iterations=1)
+    if benchmark.stats:  # not with --benchmark-disable
+        benchmark.extra_info["records"] = records
+        benchmark.extra_info["records_per_second"] = records / benchmark.stats.stats.mean
+    benchmark.extra_info["peak_rss_mib"] = peak_rss_mib(func, *args, **kwargs)
+
+
+def test_convert(benchmark, release, tmp_path):
+    run_benchmark(
+        benchmark,
+        release.records,
+        conversion.convert,
+        release.xml,
+        str(tmp_path / "release.jsonl"),
+        show_progress=False,
+        fasta_ref_hg19=release.fasta_hg19,
+        fasta_ref_hg38=release.fasta_hg38,
+    )
+
+
+def test_normalizer(benchmark, converted):
+    variation_archives = list(records.iter_variation_archives(converted.jsonl))
+
+    def normalize():
+        normalizer = VariationArchiveNormalizer(
+            converted.release.fasta_hg19, converted.release.fasta_hg38
+        )
+        for variation_archive in variation_archives:
+            normalizer.normalize(variation_archive)
+
+    run_benchmark(benchmark, len(variation_archives), normalize)
+
+
+def test_extract_vars(benchmark, converted, tmp_path):
+    run_benchmark(
+        benchmark, converted.records, extract_vars.run, converted.jsonl, str(tmp_path), False
+    )
+
+
+def test_gene_impact(benchmark, converted, tmp_path):
+    run_benchmark(
+        benchmark,
+        converted.records,
+        gene_impact.run_report,
+        converted.jsonl,
+        str(tmp_path / "gene_impact.jsonl"),
+    )
+
+
+def test_phenotype_link(benchmark, converted, tmp_path):
+    run_benchmark(
+        benchmark,
+        converted.records,
+        phenotype_link.run_report,
+        converted.jsonl,
+        str(tmp_path / "phenotype_link.jsonl"),
+    )
+
+
+def test_class_by_freq(benchmark, converted, tmp_path):
+    run_benchmark(
+        benchmark,
+        converted.records,
+        class_by_freq.run_report,
+        converted.jsonl,
+        str(tmp_path / "class_by_freq.jsonl"),
+        class_by_freq.DEFAULT_THRESHOLDS,
+    )
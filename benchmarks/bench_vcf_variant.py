@@ -0,0 +1,48 @@
+"""Benchmarks for the per-record overhead of the VCF variant types in the normalizer.
+
+For each record, the normalization pipeline creates a variant when extracting it from
+the ``VariationArchive``, one per expanded IUPAC code, and one for the normalized
+result, and then compares the result to the input.  This is done with the
+pydantic ``VcfVariant`` (as previously) and with the ``VcfRecord`` named tuple.
+
+Run with ``pytest benchmarks/bench_vcf_variant.py`` (needs ``pytest-benchmark``).
+"""
+
+import random
+
+import pytest
+
+from clinvar_data.conversion.normalizer import VcfRecord, VcfVariant
+
+#: Number of records per round.
+RECORDS = 10_000
+
+
+@pytest.fixture(scope="module")
+def values():
+    rng = random.Random(42)
+    return [
+        (f"chr{rng.randint(1, 22)}", rng.randint(1, 10**8), rng.choice("ACGT"), rng.choice("ACGT"))
+        for _ in range(RECORDS)
+    ]
+
+
+def pipeline_pydantic(values):
+    for chrom, pos, ref, alt in values:
+        variant = VcfVariant(chrom=chrom, pos=pos, ref=ref, alt=alt)
+        copy = variant.model_copy(update={"alt": alt})
+        result = VcfVariant(chrom=copy.chrom, pos=copy.pos, ref=copy.ref, alt=copy.alt)
+        assert result == variant
+
+
+def pipeline_record(values):
+    for chrom, pos, ref, alt in values:
+        variant = VcfRecord(chrom, pos, ref, alt)
+        copy = variant._replace(alt=alt)
+        result = VcfRecord(copy.chrom, copy.pos, copy.ref, copy.alt)
+        assert result == variant
+
+
+@pytest.mark.parametrize("impl", [pipeline_pydantic, pipeline_record])
+def test_vcf_variant_overhead(benchmark, values, impl):
+    benchmark(impl, values)
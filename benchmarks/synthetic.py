@@ -0,0 +1,250 @@
+"""Reproducible synthetic ClinVar releases for the pipeline benchmarks.
+
+The ``<VariationArchive>`` records of the XML fixtures in ``tests/clinvar_data/data``
+are replicated and mutated with a seeded random number generator, such that the same
+seed and size always give the same release:
+
+* VCV/RCV/SCV accessions and variation/allele IDs are renumbered to be unique,
+* the sequence locations of each copy are moved to a random position of a compact
+  synthetic genome of ``CONTIG_SIZE`` bp per chromosome,
+* HGNC IDs are drawn from a pool of ``GENE_POOL`` genes,
+* aggregate germline classifications and global minor allele frequencies are drawn
+  at random.
+
+``write_reference()`` writes a random reference with the REF alleles of the release
+at their positions, so normalization runs offline on realistic records.
+
+Can also be run as a script to write a release for profiling by hand::
+
+    python benchmarks/synthetic.py OUTPUT_DIR [--records N] [--seed S]
+"""
+
+import argparse
+import glob
+import os
+import random
+import re
+import sys
+import typing
+
+import pysam
+
+#: Directory with the XML fixtures.
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "..", "tests", "clinvar_data", "data")
+#: Default number of records of a release.
+DEFAULT_RECORDS = 5_000
+#: Default seed.
+DEFAULT_SEED = 42
+#: Length of each synthetic chromosome.
+CONTIG_SIZE = 2_000_000
+#: Distance of moved variants from the chromosome ends.
+MARGIN = 10_000
+#: Number of distinct HGNC IDs.
+GENE_POOL = 2_000
+#: Chromosomes of the synthetic genome.
+CHROMS = [str(i) for i in range(1, 23)] + ["X", "Y", "MT"]
+#: Aggregate germline classifications to draw from.
+GERMLINE_CLASSIFICATIONS = (
+    "Pathogenic",
+    "Likely pathogenic",
+    "Uncertain significance",
+    "Likely benign",
+    "Benign",
+    "Conflicting classifications of pathogenicity",
+)
+#: Coordinate attributes of ``<SequenceLocation>``.
+COORDINATES = (
+    "start",
+    "stop",
+    "display_start",
+    "display_stop",
+    "innerStart",
+    "innerStop",
+    "outerStart",
+    "outerStop",
+    "positionVCF",
+)
+
+_RE_RECORD = re.compile(r"<VariationArchive\b.*?</VariationArchive>\n", re.DOTALL)
+_RE_ACCESSION = re.compile(r"\b(VCV|RCV|SCV)(\d{9})\b")
+_RE_ID = re.compile(r'\b(VariationID|AlleleID)="(\d+)"')
+_RE_HGNC = re.compile(r'HGNC_ID="HGNC:(\d+)"')
+_RE_SEQUENCE_LOCATION = re.compile(r"<SequenceLocation\b[^>]*>")
+_RE_ATTRIBUTE = re.compile(r'(\w+)="([^"]*)"')
+_RE_GERMLINE_DESCRIPTION = re.compile(
+    r"(<GermlineClassification\b[^>]*>(?:(?!</GermlineClassification>).)*?"
+    r"<Description\b[^>]*>)[^<]*",
+    re.DOTALL,
+)
+_RE_GMAF = re.compile(r'(<GlobalMinorAlleleFrequency Value=")[^"]*')
+#: Translation of random bytes to nucleotides.
+_NUCLEOTIDES = bytes(b"ACGT"[i % 4] for i in range(256))
+
+
+class Release(typing.NamedTuple):
+    """Paths and size of a written synthetic release."""
+
+    #: Path to the release XML.
+    xml: str
+    #: Path to the GRCh37 reference FASTA.
+    fasta_hg19: str
+    #: Path to the GRCh38 reference FASTA.
+    fasta_hg38: str
+    #: Number of records.
+    records: int
+
+
+def load_fixture_records() -> tuple[str, list[str]]:
+    """Return the XML header and the distinct ``<VariationArchive>`` records of the fixtures."""
+    header = ""
+    records: dict[str, str] = {}
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, "*.xml"))):
+        with open(path, "rt") as inputf:
+            text = inputf.read()
+        matches = list(_RE_RECORD.finditer(text))
+        if matches and not header:
+            header = text[: matches[0].start()]
+        for match in matches:
+            accession = _RE_ACCESSION.search(match.group(0))
+            records.setdefault(accession.group(0) if accession else path, match.group(0))
+    return header, [records[key] for key in sorted(records)]
+
+
+class Mutator:
+    """Create mutated copies of fixture records with unique identifiers."""
+
+    def __init__(self, seed: int = DEFAULT_SEED):
+        #: The random number generator.
+        self.rng = random.Random(seed)
+        #: Last assigned number by accession type or ID attribute.
+        self.counters: dict[str, int] = {}
+
+    def _next(self, key: str) -> int:
+        self.counters[key] = self.counters.get(key, 0) + 1
+        return self.counters[key]
+
+    def _move_locations(self, record: str) -> str:
+        deltas: dict[str, int] = {}
+        for tag in _RE_SEQUENCE_LOCATION.findall(record):
+            attrs = dict(_RE_ATTRIBUTE.findall(tag))
+            anchor = attrs.get("positionVCF") or attrs.get("start")
+            assembly = attrs.get("Assembly", "")
+            if anchor and assembly not in deltas:
+                deltas[assembly] = self.rng.randrange(MARGIN, CONTIG_SIZE - MARGIN) - int(anchor)
+
+        def move(match: re.Match) -> str:
+            tag = match.group(0)
+            delta = deltas.get(dict(_RE_ATTRIBUTE.findall(tag)).get("Assembly", ""), 0)
+
+            def shift(attr: re.Match) -> str:
+                name, value = attr.groups()
+                if name not in COORDINATES or not value.isdigit():
+                    return attr.group(0)
+                return f'{name}="{max(1, int(value) + delta)}"'
+
+            return _RE_ATTRIBUTE.sub(shift, tag)
+
+        return _RE_SEQUENCE_LOCATION.sub(move, record)
+
+    def mutate(self, record: str) -> str:
+        """Return a copy of ``record`` with new identifiers, locations, and annotations."""
+        accessions: dict[str, str] = {}
+        ids: dict[tuple[str, str], int] = {}
+        genes: dict[str, int] = {}
+
+        def accession(match: re.Match) -> str:
+            if match.group(0) not in accessions:
+                prefix = match.group(1)
+                accessions[match.group(0)] = f"{prefix}{self._next(prefix):09d}"
+            return accessions[match.group(0)]
+
+        def identifier(match: re.Match) -> str:
+            # the variation ID of the VCV is also used for its simple allele
+            key = match.groups()
+            if key not in ids:
+                ids[key] = self._next(match.group(1))
+            return f'{match.group(1)}="{ids[key]}"'
+
+        def gene(match: re.Match) -> str:
+            if match.group(1) not in genes:
+                genes[match.group(1)] = self.rng.randrange(1, GENE_POOL + 1)
+            return f'HGNC_ID="HGNC:{genes[match.group(1)]}"'
+
+        classification = self.rng.choice(GERMLINE_CLASSIFICATIONS)
+        gmaf = 10 ** self.rng.uniform(-5, -0.31)
+
+        record = _RE_ACCESSION.sub(accession, record)
+        record = _RE_ID.sub(identifier, record)
+        record = _RE_HGNC.sub(gene, record)
+        record = _RE_GERMLINE_DESCRIPTION.sub(lambda m: m.group(1) + classification, record)
+        record = _RE_GMAF.sub(lambda m: f"{m.group(1)}{gmaf:.5f}", record)
+        return self._move_locations(record)
+
+
+def write_release_xml(path: str, records: int = DEFAULT_RECORDS, seed: int = DEFAULT_SEED):
+    """Write a synthetic release of ``records`` records to ``path``."""
+    header, fixtures = load_fixture_records()
+    mutator = Mutator(seed)
+    with open(path, "wt") as outputf:
+        outputf.write(header)
+        for _ in range(records):
+            outputf.write(mutator.mutate(mutator.rng.choice(fixtures)))
+        outputf.write("</ClinVarVariationRelease>\n")
+
+
+def write_reference(path_xml: str, assembly: str, path_fasta: str, seed: int = DEFAULT_SEED):
+    """Write a random reference for ``assembly`` with the REF alleles of the release.
+
+    The contigs are prefixed with ``chr`` as expected by the normalizer.
+    """
+    rng = random.Random(f"{seed}-{assembly}")
+    contigs = {
+        chrom: bytearray(rng.randbytes(CONTIG_SIZE).translate(_NUCLEOTIDES)) for chrom in CHROMS
+    }
+    with open(path_xml, "rt") as inputf:
+        for tag in _RE_SEQUENCE_LOCATION.findall(inputf.read()):
+            attrs = dict(_RE_ATTRIBUTE.findall(tag))
+            ref = attrs.get("referenceAlleleVCF", "")
+            if attrs.get("Assembly") != assembly or attrs.get("Chr") not in CHROMS or not ref:
+                continue
+            pos = int(attrs["positionVCF"]) - 1
+            if ref.strip("ACGT") or pos + len(ref) > CONTIG_SIZE:
+                continue
+            contigs[attrs["Chr"]][pos : pos + len(ref)] = ref.encode()
+    with open(path_fasta, "wb") as outputf:
+        for chrom, seq in contigs.items():
+            lines = (seq[offset : offset + 60] for offset in range(0, len(seq), 60))
+            outputf.write(b">chr%s\n%s\n" % (chrom.encode(), b"\n".join(lines)))
+    pysam.faidx(path_fasta)
+
+
+def write_release(
+    output_dir: str, records: int = DEFAULT_RECORDS, seed: int = DEFAULT_SEED
+) -> Release:
+    """Write a synthetic release with references to ``output_dir``."""
+    os.makedirs(output_dir, exist_ok=True)
+    release = Release(
+        xml=os.path.join(output_dir, "release.xml"),
+        fasta_hg19=os.path.join(output_dir, "hg19.fa"),
+        fasta_hg38=os.path.join(output_dir, "hg38.fa"),
+        records=records,
+    )
+    write_release_xml(release.xml, records, seed)
+    write_reference(release.xml, "GRCh37", release.fasta_hg19, seed)
+    write_reference(release.xml, "GRCh38", release.fasta_hg38, seed)
+    return release
+
+
+def main(argv: typing.Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("output_dir", help="directory to write the release to")
+    parser.add_argument("--records", type=int, default=DEFAULT_RECORDS, help="number of records")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="random seed")
+    args = parser.parse_args(argv)
+    release = write_release(args.output_dir, args.records, args.seed)
+    print(f"wrote {release.records} records to {release.xml}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,12 @@
 """Determin ACMG class by frequency."""
 
 import gzip
-import json
 import typing
 
-from google.protobuf.json_format import MessageToDict, Parse
-import tqdm
+import numpy as np
 
+from clinvar_data import reports
+from clinvar_data.io import json_codec
 from clinvar_data.pbs.class_by_freq import CoarseClinicalSignificance
 from clinvar_data.pbs.class_by_freq_pb2 import GeneCoarseClinsigFrequencyCounts
 from clinvar_data.pbs.clinvar_public_pb2 import VariationArchive
@@ -32,6 +32,11 @@ DEFAULT_THRESHOLDS = [
     1.0,
 ]
 
+#: Number of coarse clinical significance values, the enum values are used as indices.
+NUM_CLASSES = len(CoarseClinicalSignificance.DESCRIPTOR.values)
+#: Number of buffered variants after which they are binned.
+FLUSH_INTERVAL = 100_000
+
 
 class ConvertCoarseClinicalSignificance:
     """Static method helper for germline clinical significance summary string to coarse enum conversion."""
@@ -73,86 +78,209 @@ def locate(thresholds: typing.List[float], value: typing.Optional[float]) -> int
     return len(thresholds)
 
 
-def generate_counts(path_input: str, thresholds: typing.List[float]):
-    """Generate counts from variant JSONL file."""
-    counts = {}
+def locate_all(thresholds: typing.List[float], values: np.ndarray) -> np.ndarray:
+    """Vectorized ``locate()`` for an array of ``values``, ``NaN`` for missing ones."""
+    # The first threshold not below a value is also the first position where the
+    # running maximum is not below it, such that unsorted thresholds work as well.
+    bounds = np.maximum.accumulate(np.asarray(thresholds, dtype=np.float64))
+    result = np.searchsorted(bounds, values, side="left")
+    result[np.isnan(values)] = 0
+    return result
 
-    if path_input.endswith(".gz"):
-        inputf = gzip.open(path_input, "rt")
-    else:
-        inputf = open(path_input, "rt")
 
-    with inputf:
-        for line in tqdm.tqdm(inputf, desc="processing", unit=" JSONL records"):
-            va: VariationArchive = Parse(line, message=VariationArchive())
+class ClassByFreqCounter:
+    """Counts per gene, coarse clinical significance, and frequency bin in a NumPy array.
 
-            # Obtain germline classification description or skip record if has none.
-            if not va.classified_record.HasField("classifications"):
-                continue
-            elif not va.classified_record.classifications.HasField("germline_classification"):
-                continue
-            elif not va.classified_record.classifications.germline_classification.HasField(
-                "description"
-            ):
-                continue
-            else:
-                description: str = (
-                    va.classified_record.classifications.germline_classification.description
-                )
-                pathogenicity: CoarseClinicalSignificance.ValueType = (
-                    ConvertCoarseClinicalSignificance.from_str(description)
-                )
-            if pathogenicity == CoarseClinicalSignificance.COARSE_CLINICAL_SIGNIFICANCE_UNSPECIFIED:
-                continue
+    HGNC IDs are mapped to rows of ``counts`` with the shape (genes, classes, bins) in
+    order of appearance.  The variants are buffered and binned in bulk by ``flush()``
+    with one ``searchsorted()`` and one ``bincount()`` call, so the cost per variant
+    does not depend on the number of thresholds.
+    """
 
-            # Obtain minor allele frequency.
-            gmaf: float | None = None
-            if not va.HasField("classified_record"):
-                continue
-            elif not va.classified_record.HasField("simple_allele"):
-                continue
-            elif va.classified_record.simple_allele.HasField("global_minor_allele_frequency"):
-                gmaf = va.classified_record.simple_allele.global_minor_allele_frequency.value
-
-            # Try to get VCF location and skip unless is sequence variant.
-            is_seqvar = False
-            simple_allele = va.classified_record.simple_allele
-            for location in simple_allele.locations or []:
-                for sequence_location in location.sequence_locations or []:
-                    if (
-                        sequence_location.HasField("reference_allele")
-                        and len(sequence_location.reference_allele) < 50
-                        and sequence_location.HasField("alternate_allele")
-                        and len(sequence_location.alternate_allele) < 50
-                    ) or (
-                        sequence_location.HasField("reference_allele_vcf")
-                        and len(sequence_location.reference_allele_vcf) < 50
-                        and sequence_location.HasField("alternate_allele_vcf")
-                        and len(sequence_location.alternate_allele_vcf) < 50
-                    ):
-                        is_seqvar = True
-                        break
-            if not is_seqvar:
-                continue
+    def __init__(self, thresholds: typing.List[float]):
+        #: Upper bounds of the frequency bins.
+        self.thresholds = thresholds
+        #: HGNC IDs in order of their rows.
+        self.hgnc_ids: list[str] = []
+        #: Row by HGNC ID.
+        self.rows: dict[str, int] = {}
+        #: The counts, rows beyond ``len(hgnc_ids)`` are unused capacity.
+        self.counts = np.zeros((0, NUM_CLASSES, len(thresholds) + 1), dtype=np.int64)
+        #: Buffered rows, coarse clinical significances, and frequencies (``NaN`` if none).
+        self.pending: tuple[list[int], list[int], list[float]] = ([], [], [])
+
+    def _row(self, hgnc_id: str) -> int:
+        row = self.rows.get(hgnc_id)
+        if row is None:
+            row = self.rows[hgnc_id] = len(self.hgnc_ids)
+            self.hgnc_ids.append(hgnc_id)
+        return row
+
+    def add(
+        self,
+        hgnc_id: str,
+        pathogenicity: CoarseClinicalSignificance.ValueType,
+        gmaf: typing.Optional[float],
+    ):
+        """Count a variant in ``hgnc_id`` with the given ``pathogenicity`` and ``gmaf``."""
+        rows, classes, gmafs = self.pending
+        rows.append(self._row(hgnc_id))
+        classes.append(pathogenicity)
+        gmafs.append(np.nan if gmaf is None else gmaf)
+        if len(rows) >= FLUSH_INTERVAL:
+            self.flush()
+
+    def _reserve(self):
+        """Grow ``counts`` to hold a row for each HGNC ID."""
+        if len(self.hgnc_ids) > self.counts.shape[0]:
+            grown = np.zeros(
+                (max(len(self.hgnc_ids), 2 * self.counts.shape[0]),) + self.counts.shape[1:],
+                dtype=np.int64,
+            )
+            grown[: self.counts.shape[0]] = self.counts
+            self.counts = grown
+
+    def flush(self):
+        """Bin the buffered variants and add them to ``counts``."""
+        self._reserve()
+        rows, classes, gmafs = self.pending
+        if not rows:
+            return
+        bins = locate_all(self.thresholds, np.array(gmafs, dtype=np.float64))
+        num_bins = self.counts.shape[2]
+        flat = (np.array(rows) * NUM_CLASSES + np.array(classes)) * num_bins + bins
+        used = self.counts[: len(self.hgnc_ids)]
+        used += np.bincount(flat, minlength=used.size).reshape(used.shape)
+        self.pending = ([], [], [])
+
+    def merge(self, other: "ClassByFreqCounter"):
+        """Add the counts of ``other`` (with the same thresholds)."""
+        other.flush()
+        rows = np.array([self._row(hgnc_id) for hgnc_id in other.hgnc_ids], dtype=np.int64)
+        self.flush()
+        # the rows are distinct, so fancy indexing adds each one once
+        self.counts[rows] += other.counts[: len(other.hgnc_ids)]
 
-            # Obtain gene HGNC ID.
-            hgnc_id: str | None = None
-            for gene in va.classified_record.simple_allele.genes:
-                if not gene.HasField("hgnc_id"):
-                    continue
-                else:
-                    hgnc_id = gene.hgnc_id
+    def to_dict(self) -> dict:
+        """Return the counts by HGNC ID in the format of ``zero_counts()``."""
+        self.flush()
+        return {
+            hgnc_id: {
+                klass: gene_counts[klass].tolist() for klass in zero_counts(len(self.thresholds))
+            }
+            for hgnc_id, gene_counts in zip(self.hgnc_ids, self.counts)
+        }
+
+    def __getstate__(self):
+        # partial counts are pickled for merging after parallel processing
+        self.flush()
+        return self.__dict__
+
+
+class ClassByFreqAccumulator(reports.Accumulator):
+    """Count variants per gene, coarse clinical significance, and frequency bin."""
+
+    mergeable = True
+    fields = (
+        "classified_record.classifications.germline_classification.description",
+        "classified_record.simple_allele.global_minor_allele_frequency.value",
+        "classified_record.simple_allele.locations.sequence_locations.reference_allele",
+        "classified_record.simple_allele.locations.sequence_locations.alternate_allele",
+        "classified_record.simple_allele.locations.sequence_locations.reference_allele_vcf",
+        "classified_record.simple_allele.locations.sequence_locations.alternate_allele_vcf",
+        "classified_record.simple_allele.genes.hgnc_id",
+    )
+
+    def __init__(self, thresholds: typing.List[float], path_output: typing.Optional[str] = None):
+        #: Upper bounds of the frequency bins.
+        self.thresholds = thresholds
+        #: Path to write the report to, if any.
+        self.path_output = path_output
+        #: The counts.
+        self.counter = ClassByFreqCounter(thresholds)
+
+    @property
+    def counts(self) -> dict:
+        """Counters by HGNC ID."""
+        return self.counter.to_dict()
+
+    def add(self, va: VariationArchive):  # noqa: C901
+        # Obtain germline classification description or skip record if has none.
+        if not va.classified_record.HasField("classifications"):
+            return
+        elif not va.classified_record.classifications.HasField("germline_classification"):
+            return
+        elif not va.classified_record.classifications.germline_classification.HasField(
+            "description"
+        ):
+            return
+        else:
+            description: str = (
+                va.classified_record.classifications.germline_classification.description
+            )
+            pathogenicity: CoarseClinicalSignificance.ValueType = (
+                ConvertCoarseClinicalSignificance.from_str(description)
+            )
+        if pathogenicity == CoarseClinicalSignificance.COARSE_CLINICAL_SIGNIFICANCE_UNSPECIFIED:
+            return
+
+        # Obtain minor allele frequency.
+        gmaf: float | None = None
+        if not va.HasField("classified_record"):
+            return
+        elif not va.classified_record.HasField("simple_allele"):
+            return
+        elif va.classified_record.simple_allele.HasField("global_minor_allele_frequency"):
+            gmaf = va.classified_record.simple_allele.global_minor_allele_frequency.value
+
+        # Try to get VCF location and skip unless is sequence variant.
+        is_seqvar = False
+        simple_allele = va.classified_record.simple_allele
+        for location in simple_allele.locations or []:
+            for sequence_location in location.sequence_locations or []:
+                if (
+                    sequence_location.HasField("reference_allele")
+                    and len(sequence_location.reference_allele) < 50
+                    and sequence_location.HasField("alternate_allele")
+                    and len(sequence_location.alternate_allele) < 50
+                ) or (
+                    sequence_location.HasField("reference_allele_vcf")
+                    and len(sequence_location.reference_allele_vcf) < 50
+                    and sequence_location.HasField("alternate_allele_vcf")
+                    and len(sequence_location.alternate_allele_vcf) < 50
+                ):
+                    is_seqvar = True
                     break
-            if not hgnc_id:
+        if not is_seqvar:
+            return
+
+        # Obtain gene HGNC ID.
+        hgnc_id: str | None = None
+        for gene in va.classified_record.simple_allele.genes:
+            if not gene.HasField("hgnc_id"):
                 continue
+            else:
+                hgnc_id = gene.hgnc_id
+                break
+        if not hgnc_id:
+            return
+
+        self.counter.add(hgnc_id, pathogenicity, gmaf)
 
-            if hgnc_id not in counts:
-                counts[hgnc_id] = zero_counts(len(thresholds))
+    def merge(self, other: reports.Accumulator):
+        assert isinstance(other, ClassByFreqAccumulator)
+        self.counter.merge(other.counter)
 
-            idx = locate(thresholds, gmaf)
-            counts[hgnc_id][pathogenicity][idx] += 1
+    def finish(self):
+        if self.path_output is not None:
+            write_report(self.counts, self.path_output)
 
-    return counts
+
+def generate_counts(path_input: str, thresholds: typing.List[float], processes: int = 1):
+    """Generate counts from variant JSONL file."""
+    accumulator = ClassByFreqAccumulator(thresholds)
+    reports.run(path_input, [accumulator], processes=processes)
+    return accumulator.counts
 
 
 def write_report(counts: dict, path_output: str):
@@ -177,11 +305,12 @@ def write_report(counts: dict, path_output: str):
                 ],
             )
             print(
-                json.dumps(MessageToDict(record)),
+                json_codec.dumps(record),
                 file=outputf,
             )
 
 
-def run_report(path_input: str, path_output: str, thresholds: typing.List[float]):
-    counts = generate_counts(path_input, thresholds)
-    write_report(counts, path_output)
+def run_report(
+    path_input: str, path_output: str, thresholds: typing.List[float], processes: int = 1
+):
+    reports.run(path_input, [ClassByFreqAccumulator(thresholds, path_output)], processes=processes)
@@ -0,0 +1,18 @@
+"""Helpers for the classifications of ClinVar records."""
+
+import typing
+
+from clinvar_data.pbs.clinvar_public_pb2 import ClinicalAssertion
+
+
+def scv_classification(assertion: ClinicalAssertion) -> typing.Optional[str]:
+    """Return the germline, oncogenicity, or somatic clinical impact classification of an SCV."""
+    classifications = assertion.classifications
+    if classifications.HasField("germline_classification"):
+        return classifications.germline_classification
+    elif classifications.HasField("oncogenicity_classification"):
+        return classifications.oncogenicity_classification
+    elif classifications.HasField("somatic_clinical_impact"):
+        return classifications.somatic_clinical_impact.value
+    else:
+        return None
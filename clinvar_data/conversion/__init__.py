@@ -1,18 +1,19 @@
 """Code to convert ClinVar XML to JSONL"""
 
+import collections
+import contextlib
 import gzip
-import json
 import sys
 import traceback
 import typing
 
 import click
-from google.protobuf.json_format import MessageToDict
+from logzero import logger
 import tqdm
-import xmltodict
 
-from clinvar_data.conversion import dict_to_pb
-from clinvar_data.conversion.normalizer import VariationArchiveNormalizer
+from clinvar_data.conversion import dict_to_pb, parallel, parsing, profiling
+from clinvar_data.conversion.normalizer import CATEGORIES, VariationArchiveNormalizer
+from clinvar_data.io import records
 from clinvar_data.pbs import clinvar_public
 
 #: Total number of VariantArchive records in ClinVar on 2025-02-28: 3437148.
@@ -24,6 +25,16 @@ def convert_variation_archive(json_va: dict) -> clinvar_public.VariationArchive:
     return dict_to_pb.ConvertVariationArchive.xmldict_data_to_pb(json_va)
 
 
+def open_input(input_file: str, use_click: bool = False) -> typing.BinaryIO:
+    """Open the ClinVar XML file ``input_file``, which may be gzip compressed."""
+    if input_file.endswith((".gz", ".bgz")):
+        return typing.cast(typing.BinaryIO, gzip.open(input_file, "rb"))
+    elif use_click:
+        return typing.cast(typing.BinaryIO, click.open_file(input_file, "rb"))
+    else:
+        return open(input_file, "rb")
+
+
 def convert(
     input_file: str,
     output_file: str,
@@ -32,54 +43,123 @@ def convert(
     show_progress: bool = True,
     fasta_ref_hg19: typing.Optional[str] = None,
     fasta_ref_hg38: typing.Optional[str] = None,
+    jobs: int = 1,
+    parser: str = parsing.PARSER_XMLTODICT,
+    normalization_cache: typing.Optional[str] = None,
+    profile_converters: typing.Optional[str] = None,
 ) -> int:
-    """Run conversion from ClinVar XML to JSONL"""
-    if input_file.endswith((".gz", ".bgz")):
-        inputf: typing.Union[typing.BinaryIO, gzip.GzipFile] = gzip.open(input_file, "rb")
-    elif use_click:
-        inputf = click.open_file(input_file, "rb")
-    else:
-        inputf = open(input_file, "rb")
-
-    if output_file.endswith(".gz"):
-        outputf = gzip.open(output_file, "wt")
-    elif use_click:
-        outputf = click.open_file(output_file, "wt")
-    else:
-        outputf = open(output_file, "wt")
+    """Run conversion from ClinVar XML to JSONL
+
+    With ``jobs > 1``, parsing, conversion, and normalization is done in a pool of
+    ``jobs`` worker processes while the output order stays the same as for the
+    serial conversion.  ``parser`` selects the XML parser backend, see
+    ``clinvar_data.conversion.parsing``.
+
+    The output format is derived from ``output_file``, see ``clinvar_data.io.records``;
+    e.g., ``*.binpb.zst`` leads to Zstandard-compressed length-delimited protobuf.
+    For ``*.bgz`` output, a BGZF file and an index for fetching single records by
+    accession are written.
+
+    ``normalization_cache`` is a directory for caching normalization results across
+    runs, see ``clinvar_data.conversion.norm_cache``.
+
+    With ``profile_converters``, the calls and wall times of the converters and of
+    parsing, normalization, and serialization are logged as a table at the end and
+    written as JSON to the given path, see ``clinvar_data.conversion.profiling``.
+    Profiling is only supported for ``jobs == 1``.
+    """
+    if profile_converters and jobs > 1:
+        raise ValueError("Profiling the converters is only supported with one job")
+    profile = profiling.ConverterProfile() if profile_converters else None
+    inputf = open_input(input_file, use_click)
 
     pb: tqdm.tqdm | None = None
     if show_progress:
         pb = tqdm.tqdm(
             desc="parsing", unit=" VariationArchive records", smoothing=0.001, total=TOTAL_RECORDS
         )
+
+    with inputf, records.RecordWriter(output_file, use_click=use_click) as writer:
+        if jobs > 1:
+            errors = _convert_parallel(
+                inputf,
+                writer,
+                max_records,
+                pb,
+                fasta_ref_hg19,
+                fasta_ref_hg38,
+                jobs,
+                parser,
+                normalization_cache,
+            )
+        else:
+            errors = _convert_serial(
+                inputf,
+                writer,
+                max_records,
+                pb,
+                fasta_ref_hg19,
+                fasta_ref_hg38,
+                parser,
+                normalization_cache,
+                profile,
+            )
+
+    if profile is not None:
+        logger.info("conversion profile:\n%s", profile.format_table())
+        profile.write_json(typing.cast(str, profile_converters))
+
+    if errors == 0:
+        return 0
+    else:
+        print(f"a total of {errors} errors occurred", file=sys.stderr)
+        return 1
+
+
+def _log_normalization_stats(stats: typing.Mapping[str, int]):
+    """Log the number of records by normalization outcome."""
+    logger.info(
+        "normalization statistics: %s",
+        ", ".join(f"{category}={stats.get(category, 0)}" for category in CATEGORIES),
+    )
+
+
+def _convert_serial(
+    inputf: typing.BinaryIO,
+    writer: records.RecordWriter,
+    max_records: int,
+    pb: typing.Optional[tqdm.tqdm],
+    fasta_ref_hg19: typing.Optional[str],
+    fasta_ref_hg38: typing.Optional[str],
+    parser: str,
+    normalization_cache: typing.Optional[str] = None,
+    profile: typing.Optional[profiling.ConverterProfile] = None,
+) -> int:
+    """Run conversion in the current process, returns number of errors."""
     records_written = 0
     errors = 0
+    section = profile.section if profile is not None else profiling.null_section
 
-    normalizer = VariationArchiveNormalizer(fasta_ref_hg19, fasta_ref_hg38)
+    normalizer = VariationArchiveNormalizer(fasta_ref_hg19, fasta_ref_hg38, normalization_cache)
 
-    def handle_variationarchive(ctx: list[dict], json_cvs: dict):
-        """Handle single VariationArchive entry after parsing by ``xmltodict``."""
+    def handle_variationarchive(json_va: dict) -> bool:
+        """Handle single VariationArchive entry after parsing into ``xmltodict`` shape."""
         try:
-            key, val = ctx[-1]
-            assert key == "VariationArchive"
-            json_va = {key: {f"@{k}": v for k, v in val.items()}}
-            json_va[key].update(json_cvs)
+            assert "VariationArchive" in json_va
             data = convert_variation_archive(json_va)
-            normalized_data_list = normalizer.normalize(data)
+            with section(profiling.SECTION_NORMALIZATION):
+                normalized_data_list = normalizer.normalize(data)
         except Exception:  # pragma: no cover
             nonlocal errors
             errors += 1
             print("Problem with data: exception and data follow", file=sys.stderr)
             traceback.print_exc()
-            print(json_cvs, file=sys.stderr)
+            print(json_va, file=sys.stderr)
             return True
 
-        for normalized_data in normalized_data_list:
-            print(
-                json.dumps(MessageToDict(normalized_data)),
-                file=outputf,
-            )
+        with section(profiling.SECTION_SERIALIZATION):
+            for normalized_data in normalized_data_list:
+                writer.write(normalized_data)
 
         nonlocal records_written
         records_written += 1
@@ -88,13 +168,68 @@ def convert(
 
         return max_records == 0 or records_written < max_records
 
-    try:
-        xmltodict.parse(inputf, item_depth=2, item_callback=handle_variationarchive)
-    except xmltodict.ParsingInterrupted:  # pragma: no cover
+    with contextlib.ExitStack() as stack:
+        if profile is not None:
+            stack.enter_context(profile.installed())
+        with section(profiling.SECTION_XML_PARSE):
+            completed = parsing.parse_stream(inputf, handle_variationarchive, parser)
+    if not completed:
         print(f"stopping after parsing {records_written} records", file=sys.stderr)
-
-    if errors == 0:
-        return 0
-    else:
-        print(f"a total of {errors} errors occurred", file=sys.stderr)
-        return 1
+    _log_normalization_stats(normalizer.stats)
+    for assembly, cache_info in normalizer.cache_info().items():
+        logger.info("FASTA cache statistics for %s: %s", assembly, cache_info)
+    normalizer.close()
+
+    return errors
+
+
+def _convert_parallel(
+    inputf: typing.BinaryIO,
+    writer: records.RecordWriter,
+    max_records: int,
+    pb: typing.Optional[tqdm.tqdm],
+    fasta_ref_hg19: typing.Optional[str],
+    fasta_ref_hg38: typing.Optional[str],
+    jobs: int,
+    parser: str,
+    normalization_cache: typing.Optional[str] = None,
+) -> int:
+    """Run conversion in ``jobs`` worker processes, returns number of errors."""
+    records_written = 0
+    errors = 0
+    stats: typing.Counter[str] = collections.Counter()
+
+    results = parallel.run_parallel(
+        inputf,
+        jobs,
+        fasta_ref_hg19,
+        fasta_ref_hg38,
+        parser=parser,
+        output_format=writer.fmt,
+        with_keys=writer.index is not None,
+        cache_dir=normalization_cache,
+    )
+    try:
+        for result in results:
+            if result.records is None:
+                errors += 1
+                print(result.error, file=sys.stderr)
+                continue
+            for i, record in enumerate(result.records):
+                writer.write_serialized(
+                    record,
+                    result.keys[i] if result.keys else None,
+                    result.states[i] if result.states else None,
+                )
+            stats[typing.cast(str, result.category)] += 1
+            records_written += 1
+            if pb:
+                pb.update(1)
+            if max_records != 0 and records_written >= max_records:
+                print(f"stopping after parsing {records_written} records", file=sys.stderr)
+                break
+    finally:
+        results.close()
+    _log_normalization_stats(stats)
+
+    return errors
@@ -1,12 +1,11 @@
 """Code for converting dicts from ``xmltodict`` to Protocol Buffers"""
 
 from dataclasses import dataclass
-import time
 from typing import Any, Dict
 
-import dateutil.parser
 import google.protobuf.timestamp_pb2
 
+from clinvar_data.conversion import timestamps
 from clinvar_data.pbs.clinvar_public import (
     AggregateClassificationSet,
     AggregatedGermlineClassification,
@@ -1047,9 +1046,7 @@ class ConvertBaseAttribute(ConverterBase):
         # obtain date value
         date_value: google.protobuf.timestamp_pb2.Timestamp | None = None
         if "@dateValue" in tag_attribute:
-            dt = dateutil.parser.parse(tag_attribute["@dateValue"])
-            seconds = int(time.mktime(dt.timetuple()))
-            date_value = google.protobuf.timestamp_pb2.Timestamp(seconds=seconds)
+            date_value = timestamps.to_timestamp(tag_attribute["@dateValue"])
 
         return BaseAttribute(
             value=text_value,
@@ -1251,9 +1248,7 @@ class ConvertDescriptionHistory(ConverterBase):
 
         dated: google.protobuf.timestamp_pb2.Timestamp | None = None
         if "@Dated" in tag_history_record:
-            parsed = dateutil.parser.parse(tag_history_record["@Dated"])
-            seconds = int(time.mktime(parsed.timetuple()))
-            dated = google.protobuf.timestamp_pb2.Timestamp(seconds=seconds)
+            dated = timestamps.to_timestamp(tag_history_record["@Dated"])
 
         return DescriptionHistory(
             description=tag_history_record["Description"],
@@ -1619,9 +1614,7 @@ class ConvertTraitSet(ConverterBase):
         # Obtain date_last_evaluated
         date_last_evaluated: google.protobuf.timestamp_pb2.Timestamp | None = None
         if "@DateLastEvaluated" in tag_trait_set:
-            parsed = dateutil.parser.parse(tag_trait_set["@DateLastEvaluated"])
-            seconds = int(time.mktime(parsed.timetuple()))
-            date_last_evaluated = google.protobuf.timestamp_pb2.Timestamp(seconds=seconds)
+            date_last_evaluated = timestamps.to_timestamp(tag_trait_set["@DateLastEvaluated"])
         # Obtain id
         id_: int | None = None
         if "@ID" in tag_trait_set:
@@ -1713,21 +1706,19 @@ class ConvertAggregatedGermlineClassification(ConverterBase):
         # Obtain date_last_evaluated
         date_last_evaluated: google.protobuf.timestamp_pb2.Timestamp | None = None
         if "@DateLastEvaluated" in tag_germline_classification:
-            parsed = dateutil.parser.parse(tag_germline_classification["@DateLastEvaluated"])
-            seconds = int(time.mktime(parsed.timetuple()))
-            date_last_evaluated = google.protobuf.timestamp_pb2.Timestamp(seconds=seconds)
+            date_last_evaluated = timestamps.to_timestamp(
+                tag_germline_classification["@DateLastEvaluated"]
+            )
         # Obtain date_created
         date_created: google.protobuf.timestamp_pb2.Timestamp | None = None
         if "@DateCreated" in tag_germline_classification:
-            parsed = dateutil.parser.parse(tag_germline_classification["@DateCreated"])
-            seconds = int(time.mktime(parsed.timetuple()))
-            date_created = google.protobuf.timestamp_pb2.Timestamp(seconds=seconds)
+            date_created = timestamps.to_timestamp(tag_germline_classification["@DateCreated"])
         # Obtain most_recent_submission
         most_recent_submission: google.protobuf.timestamp_pb2.Timestamp | None = None
         if "@MostRecentSubmission" in tag_germline_classification:
-            parsed = dateutil.parser.parse(tag_germline_classification["@MostRecentSubmission"])
-            seconds = int(time.mktime(parsed.timetuple()))
-            most_recent_submission = google.protobuf.timestamp_pb2.Timestamp(seconds=seconds)
+            most_recent_submission = timestamps.to_timestamp(
+                tag_germline_classification["@MostRecentSubmission"]
+            )
 
         # Obtain number_of_submissions
         number_of_submissions: int | None = None
@@ -1800,21 +1791,19 @@ class ConvertAggregatedSomaticClinicalImpact(ConverterBase):
         # Obtain date_last_evaluated
         date_last_evaluated: google.protobuf.timestamp_pb2.Timestamp | None = None
         if "@DateLastEvaluated" in tag_somatic_clinical_impact:
-            parsed = dateutil.parser.parse(tag_somatic_clinical_impact["@DateLastEvaluated"])
-            seconds = int(time.mktime(parsed.timetuple()))
-            date_last_evaluated = google.protobuf.timestamp_pb2.Timestamp(seconds=seconds)
+            date_last_evaluated = timestamps.to_timestamp(
+                tag_somatic_clinical_impact["@DateLastEvaluated"]
+            )
         # Obtain date_created
         date_created: google.protobuf.timestamp_pb2.Timestamp | None = None
         if "@DateCreated" in tag_somatic_clinical_impact:
-            parsed = dateutil.parser.parse(tag_somatic_clinical_impact["@DateCreated"])
-            seconds = int(time.mktime(parsed.timetuple()))
-            date_created = google.protobuf.timestamp_pb2.Timestamp(seconds=seconds)
+            date_created = timestamps.to_timestamp(tag_somatic_clinical_impact["@DateCreated"])
         # Obtain most_recent_submission
         most_recent_submission: google.protobuf.timestamp_pb2.Timestamp | None = None
         if "@MostRecentSubmission" in tag_somatic_clinical_impact:
-            parsed = dateutil.parser.parse(tag_somatic_clinical_impact["@MostRecentSubmission"])
-            seconds = int(time.mktime(parsed.timetuple()))
-            most_recent_submission = google.protobuf.timestamp_pb2.Timestamp(seconds=seconds)
+            most_recent_submission = timestamps.to_timestamp(
+                tag_somatic_clinical_impact["@MostRecentSubmission"]
+            )
 
         # Obtain number_of_submissions
         number_of_submissions: int | None = None
@@ -1886,21 +1875,19 @@ class ConvertAggregatedOncogenicityClassification(ConverterBase):
         # Obtain date_last_evaluated
         date_last_evaluated: google.protobuf.timestamp_pb2.Timestamp | None = None
         if "@DateLastEvaluated" in tag_oncogenicity_classification:
-            parsed = dateutil.parser.parse(tag_oncogenicity_classification["@DateLastEvaluated"])
-            seconds = int(time.mktime(parsed.timetuple()))
-            date_last_evaluated = google.protobuf.timestamp_pb2.Timestamp(seconds=seconds)
+            date_last_evaluated = timestamps.to_timestamp(
+                tag_oncogenicity_classification["@DateLastEvaluated"]
+            )
         # Obtain date_created
         date_created: google.protobuf.timestamp_pb2.Timestamp | None = None
         if "@DateCreated" in tag_oncogenicity_classification:
-            parsed = dateutil.parser.parse(tag_oncogenicity_classification["@DateCreated"])
-            seconds = int(time.mktime(parsed.timetuple()))
-            date_created = google.protobuf.timestamp_pb2.Timestamp(seconds=seconds)
+            date_created = timestamps.to_timestamp(tag_oncogenicity_classification["@DateCreated"])
         # Obtain most_recent_submission
         most_recent_submission: google.protobuf.timestamp_pb2.Timestamp | None = None
         if "@MostRecentSubmission" in tag_oncogenicity_classification:
-            parsed = dateutil.parser.parse(tag_oncogenicity_classification["@MostRecentSubmission"])
-            seconds = int(time.mktime(parsed.timetuple()))
-            most_recent_submission = google.protobuf.timestamp_pb2.Timestamp(seconds=seconds)
+            most_recent_submission = timestamps.to_timestamp(
+                tag_oncogenicity_classification["@MostRecentSubmission"]
+            )
 
         # Obtain number_of_submissions
         number_of_submissions: int | None = None
@@ -2002,9 +1989,9 @@ class ConvertClinicalSignificance(ConverterBase):
         cxcs: CitationsXrefsComments = cls.parse_citations_xrefs_comments(tag_clinical_significance)
         date_last_evaluated: google.protobuf.timestamp_pb2.Timestamp | None = None
         if "@DateLastEvaluated" in tag_clinical_significance:
-            parsed = dateutil.parser.parse(tag_clinical_significance["@DateLastEvaluated"])
-            seconds = int(time.mktime(parsed.timetuple()))
-            date_last_evaluated = google.protobuf.timestamp_pb2.Timestamp(seconds=seconds)
+            date_last_evaluated = timestamps.to_timestamp(
+                tag_clinical_significance["@DateLastEvaluated"]
+            )
 
         return ClinicalSignificance(
             review_status=review_status,
@@ -2103,9 +2090,7 @@ class ConvertRecordHistory(ConverterBase):
             comment = ConvertComment.xmldict_data_to_pb({"Comment": tag_record_history["Comment"]})
         accession: str = tag_record_history["@Accession"]
         version: int = int(tag_record_history["@Version"])
-        date_changed_parsed = dateutil.parser.parse(tag_record_history["@DateChanged"])
-        date_changed_seconds = int(time.mktime(date_changed_parsed.timetuple()))
-        date_changed = google.protobuf.timestamp_pb2.Timestamp(seconds=date_changed_seconds)
+        date_changed = timestamps.to_timestamp(tag_record_history["@DateChanged"])
         variation_id: int | None = None
         if "@VariationID" in tag_record_history:
             variation_id = int(tag_record_history["@VariationID"])
@@ -2229,9 +2214,7 @@ class ConvertClassificationScv(ConverterBase):
 
         date_last_evaluated: google.protobuf.timestamp_pb2.Timestamp | None = None
         if "@DateLastEvaluated" in tag_classification:
-            parsed = dateutil.parser.parse(tag_classification["@DateLastEvaluated"])
-            seconds = int(time.mktime(parsed.timetuple()))
-            date_last_evaluated = google.protobuf.timestamp_pb2.Timestamp(seconds=seconds)
+            date_last_evaluated = timestamps.to_timestamp(tag_classification["@DateLastEvaluated"])
 
         return ClassificationScv(
             review_status=review_status,
@@ -2355,9 +2338,7 @@ class ConvertClinicalAssertionRecordHistory(ConverterBase):
             comment = ConvertComment.xmldict_data_to_pb({"Comment": tag_record_history["Comment"]})
         accession: str = tag_record_history["@Accession"]
         version: int = int(tag_record_history["@Version"])
-        date_changed_parsed = dateutil.parser.parse(tag_record_history["@DateChanged"])
-        date_changed_seconds = int(time.mktime(date_changed_parsed.timetuple()))
-        date_changed = google.protobuf.timestamp_pb2.Timestamp(seconds=date_changed_seconds)
+        date_changed = timestamps.to_timestamp(tag_record_history["@DateChanged"])
 
         return ClinicalAssertionRecordHistory(
             comment=comment,
@@ -2531,9 +2512,7 @@ class ConvertDosageSensitivity(ConverterBase):
         value: str = tag_inner.get("#text", "")
         last_evaluated: google.protobuf.timestamp_pb2.Timestamp | None = None
         if "@last_evaluated" in tag_inner:
-            parsed = dateutil.parser.parse(tag_inner["@last_evaluated"])
-            seconds = int(time.mktime(parsed.timetuple()))
-            last_evaluated = google.protobuf.timestamp_pb2.Timestamp(seconds=seconds)
+            last_evaluated = timestamps.to_timestamp(tag_inner["@last_evaluated"])
         clingen: str | None = None
         if "@ClinGen" in tag_inner:
             clingen = tag_inner["@ClinGen"]
@@ -2588,9 +2567,7 @@ class ConvertDeletedScv(ConverterBase):
 
         accession: str = tag_scv["#text"]
         version: int = int(tag_scv["@Version"])
-        date_deleted_parsed = dateutil.parser.parse(tag_scv["@DateDeleted"])
-        date_deleted_seconds = int(time.mktime(date_deleted_parsed.timetuple()))
-        date_deleted = google.protobuf.timestamp_pb2.Timestamp(seconds=date_deleted_seconds)
+        date_deleted = timestamps.to_timestamp(tag_scv["@DateDeleted"])
 
         return DeletedScv(
             accession=accession,
@@ -4042,14 +4019,10 @@ class ConvertClinicalAssertion(ConverterBase):
         )
         date_updated: google.protobuf.timestamp_pb2.Timestamp | None = None
         if "@DateUpdated" in tag_cva:
-            dt_date_updated = dateutil.parser.parse(tag_cva["@DateUpdated"])
-            seconds_date_updated = int(time.mktime(dt_date_updated.timetuple()))
-            date_updated = google.protobuf.timestamp_pb2.Timestamp(seconds=seconds_date_updated)
+            date_updated = timestamps.to_timestamp(tag_cva["@DateUpdated"])
         date_created: google.protobuf.timestamp_pb2.Timestamp | None = None
         if "@DateCreated" in tag_cva:
-            dt_date_created = dateutil.parser.parse(tag_cva["@DateCreated"])
-            seconds_date_created = int(time.mktime(dt_date_created.timetuple()))
-            date_created = google.protobuf.timestamp_pb2.Timestamp(seconds=seconds_date_created)
+            date_created = timestamps.to_timestamp(tag_cva["@DateCreated"])
 
         return ClinicalAssertion.ClinvarAccession(
             accession=accession,
@@ -4176,23 +4149,13 @@ class ConvertClinicalAssertion(ConverterBase):
             ]
         date_created: google.protobuf.timestamp_pb2.Timestamp | None = None
         if "DateCreated" in tag_ca:
-            dt_date_created = dateutil.parser.parse(tag_ca["DateCreated"])
-            seconds_date_created = int(time.mktime(dt_date_created.timetuple()))
-            date_created = google.protobuf.timestamp_pb2.Timestamp(seconds=seconds_date_created)
+            date_created = timestamps.to_timestamp(tag_ca["DateCreated"])
         date_last_updated: google.protobuf.timestamp_pb2.Timestamp | None = None
         if "DateLastUpdated" in tag_ca:
-            dt_date_last_updated = dateutil.parser.parse(tag_ca["DateLastUpdated"])
-            seconds_date_last_updated = int(time.mktime(dt_date_last_updated.timetuple()))
-            date_last_updated = google.protobuf.timestamp_pb2.Timestamp(
-                seconds=seconds_date_last_updated
-            )
+            date_last_updated = timestamps.to_timestamp(tag_ca["DateLastUpdated"])
         submission_date: google.protobuf.timestamp_pb2.Timestamp | None = None
         if "SubmissionDate" in tag_ca:
-            dt_submission_date = dateutil.parser.parse(tag_ca["SubmissionDate"])
-            seconds_submission_date = int(time.mktime(dt_submission_date.timetuple()))
-            submission_date = google.protobuf.timestamp_pb2.Timestamp(
-                seconds=seconds_submission_date
-            )
+            submission_date = timestamps.to_timestamp(tag_ca["SubmissionDate"])
         id_: int | None = None
         if "@ID" in tag_ca:
             id_ = int(tag_ca["@ID"])
@@ -4766,9 +4729,7 @@ class ConvertRcvAccession(ConverterBase):
             value: str = tag_description["#text"]
             date_last_evaluated: google.protobuf.timestamp_pb2.Timestamp | None = None
             if "@DateLastEvaluated" in tag_description:
-                dt = dateutil.parser.parse(tag_description["@DateLastEvaluated"])
-                seconds = int(time.mktime(dt.timetuple()))
-                date_last_evaluated = google.protobuf.timestamp_pb2.Timestamp(seconds=seconds)
+                date_last_evaluated = timestamps.to_timestamp(tag_description["@DateLastEvaluated"])
             submission_count: int | None = None
             if "@SubmissionCount" in tag_description:
                 submission_count = int(tag_description["@SubmissionCount"])
@@ -4833,9 +4794,7 @@ class ConvertRcvAccession(ConverterBase):
             )
             date_last_evaluated: google.protobuf.timestamp_pb2.Timestamp | None = None
             if "@DateLastEvaluated" in tag_description:
-                dt = dateutil.parser.parse(tag_description["@DateLastEvaluated"])
-                seconds = int(time.mktime(dt.timetuple()))
-                date_last_evaluated = google.protobuf.timestamp_pb2.Timestamp(seconds=seconds)
+                date_last_evaluated = timestamps.to_timestamp(tag_description["@DateLastEvaluated"])
             submission_count: int | None = None
             if "@SubmissionCount" in tag_description:
                 submission_count = int(tag_description["@SubmissionCount"])
@@ -4899,9 +4858,7 @@ class ConvertRcvAccession(ConverterBase):
             value: str = tag_description["#text"]
             date_last_evaluated: google.protobuf.timestamp_pb2.Timestamp | None = None
             if "@DateLastEvaluated" in tag_description:
-                dt = dateutil.parser.parse(tag_description["@DateLastEvaluated"])
-                seconds = int(time.mktime(dt.timetuple()))
-                date_last_evaluated = google.protobuf.timestamp_pb2.Timestamp(seconds=seconds)
+                date_last_evaluated = timestamps.to_timestamp(tag_description["@DateLastEvaluated"])
             submission_count: int | None = None
             if "@SubmissionCount" in tag_description:
                 submission_count = int(tag_description["@SubmissionCount"])
@@ -5271,23 +5228,13 @@ class ConvertVariationArchive(ConverterBase):
         variation_type: str = tag_va["@VariationType"]
         date_created: google.protobuf.timestamp_pb2.Timestamp | None = None
         if "@DateCreated" in tag_va:
-            date_created_dt = dateutil.parser.parse(tag_va["@DateCreated"])
-            date_created_seconds = int(time.mktime(date_created_dt.timetuple()))
-            date_created = google.protobuf.timestamp_pb2.Timestamp(seconds=date_created_seconds)
+            date_created = timestamps.to_timestamp(tag_va["@DateCreated"])
         date_last_updated: google.protobuf.timestamp_pb2.Timestamp | None = None
         if "@DateLastUpdated" in tag_va:
-            date_last_updated_dt = dateutil.parser.parse(tag_va["@DateLastUpdated"])
-            date_last_updated_seconds = int(time.mktime(date_last_updated_dt.timetuple()))
-            date_last_updated = google.protobuf.timestamp_pb2.Timestamp(
-                seconds=date_last_updated_seconds
-            )
+            date_last_updated = timestamps.to_timestamp(tag_va["@DateLastUpdated"])
         most_recent_submission: google.protobuf.timestamp_pb2.Timestamp | None = None
         if "@MostRecentSubmission" in tag_va:
-            most_recent_submission_dt = dateutil.parser.parse(tag_va["@MostRecentSubmission"])
-            most_recent_submission_seconds = int(time.mktime(most_recent_submission_dt.timetuple()))
-            most_recent_submission = google.protobuf.timestamp_pb2.Timestamp(
-                seconds=most_recent_submission_seconds
-            )
+            most_recent_submission = timestamps.to_timestamp(tag_va["@MostRecentSubmission"])
         accession: str = tag_va["@Accession"]
         version: int = int(tag_va["@Version"])
         number_of_submitters: int = int(tag_va["@NumberOfSubmitters"])
@@ -5367,9 +5314,7 @@ class ConvertClinvarVariationRelease(ConverterBase):
 
         release_date: google.protobuf.timestamp_pb2.Timestamp | None = None
         if "@ReleaseDate" in tag_release:
-            release_date_dt = dateutil.parser.parse(tag_release["@ReleaseDate"])
-            release_date_seconds = int(time.mktime(release_date_dt.timetuple()))
-            release_date = google.protobuf.timestamp_pb2.Timestamp(seconds=release_date_seconds)
+            release_date = timestamps.to_timestamp(tag_release["@ReleaseDate"])
         variation_archives: list[VariationArchive] | None = None
         if "VariationArchive" in tag_release:
             variation_archives = [
@@ -0,0 +1,204 @@
+"""Incremental conversion of a ClinVar release based on the conversion of the previous one.
+
+Between releases, only a small fraction of the ``VariationArchive`` records change.
+``convert_incremental()`` takes the BGZF output of the previous conversion together
+with its index (see ``clinvar_data.io.index``) and compares the accession, version,
+record type, and date of last update of each record in the new XML release to the
+index, looking up one VCV at a time.  The serialized records of unchanged VCVs are
+copied from the previous output byte by byte, only new and updated VCVs are converted
+and normalized.
+
+A manifest lists the VCVs that have been added, updated, or removed.
+"""
+
+import collections
+import re
+import sys
+import typing
+
+from logzero import logger
+import tqdm
+
+from clinvar_data.conversion import (
+    TOTAL_RECORDS,
+    dict_to_pb,
+    open_input,
+    parallel,
+    parsing,
+    timestamps,
+)
+from clinvar_data.conversion.normalizer import VariationArchiveNormalizer
+from clinvar_data.io import bgzf, index, records
+from clinvar_data.pbs.clinvar_public_pb2 import VariationArchive
+
+#: Suffix appended to the output file name for the default manifest path.
+MANIFEST_SUFFIX = ".changes.tsv"
+#: Column names of the manifest.
+MANIFEST_HEADER = ("change", "accession", "version")
+#: Change of VCVs not in the previous release.
+CHANGE_ADDED = "added"
+#: Change of VCVs with new version, record type, or date of last update.
+CHANGE_UPDATED = "updated"
+#: Change of VCVs only in the previous release.
+CHANGE_REMOVED = "removed"
+
+#: Opening tag of a ``VariationArchive`` chunk, the attributes are in the first group.
+_RE_OPENING_TAG = re.compile(rb'<VariationArchive((?:\s+[^\s=>]+\s*=\s*"[^"]*")*)\s*>')
+#: One attribute of an opening tag.
+_RE_ATTRIBUTE = re.compile(rb'([^\s=]+)\s*=\s*"([^"]*)"')
+
+
+def chunk_attributes(chunk: bytes) -> dict[str, str]:
+    """Return the attributes of the ``VariationArchive`` element in ``chunk``.
+
+    Entities in the values are not resolved.
+    """
+    match = _RE_OPENING_TAG.match(chunk)
+    if match is None:
+        raise ValueError("Could not parse opening tag of VariationArchive")
+    return {
+        key.decode("utf-8"): value.decode("utf-8")
+        for key, value in _RE_ATTRIBUTE.findall(match.group(1))
+    }
+
+
+def chunk_state(attributes: dict[str, str]) -> str:
+    """Return ``index.record_state()`` for the record with the given XML ``attributes``."""
+    va = VariationArchive(
+        record_type=dict_to_pb.ConvertVariationArchive.convert_record_type(attributes["RecordType"])
+    )
+    if "DateLastUpdated" in attributes:
+        # same conversion as in ``ConvertVariationArchive``
+        va.date_last_updated.CopyFrom(timestamps.to_timestamp(attributes["DateLastUpdated"]))
+    return index.record_state(va)
+
+
+class PreviousRecord(typing.NamedTuple):
+    """A serialized record of the previous conversion."""
+
+    #: Virtual offset of the serialized record.
+    virtual_offset: int
+    #: Length of the serialized record in bytes.
+    length: int
+    #: Accessions of the record to index.
+    keys: list[index.Key]
+
+
+class PreviousVcv(typing.NamedTuple):
+    """The records of one VCV in the previous conversion."""
+
+    #: Version of the VCV.
+    version: int
+    #: State of the VCV, see ``index.record_state()``.
+    state: typing.Optional[str]
+    #: The records (more than one in case of expanded IUPAC codes).
+    records: list[PreviousRecord]
+
+
+def previous_vcv(index_reader: index.IndexReader, accession: str) -> typing.Optional[PreviousVcv]:
+    """Look up the records of VCV ``accession`` in the index of the previous conversion."""
+    result: typing.Optional[PreviousVcv] = None
+    for entry in index_reader.vcv_entries(accession):
+        if entry.accession == entry.vcv:
+            if result is None:
+                result = PreviousVcv(entry.version, entry.state, [])
+            result.records.append(PreviousRecord(entry.virtual_offset, entry.length, []))
+        typing.cast(PreviousVcv, result).records[-1].keys.append((entry.accession, entry.version))
+    return result
+
+
+def convert_incremental(
+    input_file: str,
+    output_file: str,
+    previous_file: str,
+    manifest_file: typing.Optional[str] = None,
+    use_click: bool = False,
+    show_progress: bool = True,
+    fasta_ref_hg19: typing.Optional[str] = None,
+    fasta_ref_hg38: typing.Optional[str] = None,
+    parser: str = parsing.PARSER_XMLTODICT,
+    normalization_cache: typing.Optional[str] = None,
+) -> int:
+    """Convert ``input_file`` to ``output_file`` reusing the records of ``previous_file``.
+
+    ``previous_file`` must be a ``*.bgz`` output of ``convert()`` (or of this function)
+    with its index, and ``output_file`` must have the same record format.  Use a
+    ``*.bgz`` output file for chaining incremental conversions.  The manifest is
+    written to ``manifest_file`` (default: ``output_file`` with ``MANIFEST_SUFFIX``).
+
+    Records written with an index lacking the record states are always converted.
+    """
+    fmt = records.format_for_path(previous_file)
+    if not previous_file.endswith(records.SUFFIX_BGZF):
+        raise ValueError(f"Previous output must be BGZF with index: {previous_file}")
+    if records.format_for_path(output_file) != fmt:
+        raise ValueError(f"Output {output_file} must have the same format as {previous_file}")
+    seen: set[str] = set()
+    counts: typing.Counter[str] = collections.Counter()
+    errors = 0
+
+    pb: tqdm.tqdm | None = None
+    if show_progress:
+        pb = tqdm.tqdm(
+            desc="parsing", unit=" VariationArchive records", smoothing=0.001, total=TOTAL_RECORDS
+        )
+
+    index_reader = index.IndexReader(previous_file + index.INDEX_SUFFIX)
+    normalizer = VariationArchiveNormalizer(fasta_ref_hg19, fasta_ref_hg38, normalization_cache)
+    with open_input(input_file, use_click) as inputf, bgzf.BgzfReader(
+        open(previous_file, "rb")
+    ) as previous_reader, records.RecordWriter(output_file, use_click=use_click) as writer, open(
+        manifest_file or output_file + MANIFEST_SUFFIX, "wt"
+    ) as manifestf:
+        print("#" + "\t".join(MANIFEST_HEADER), file=manifestf)
+        for chunk in parallel.iter_variation_archive_chunks(inputf):
+            if pb:
+                pb.update(1)
+            attributes = chunk_attributes(chunk)
+            accession, version = attributes["Accession"], int(attributes["Version"])
+            seen.add(accession)
+            vcv = previous_vcv(index_reader, accession)
+            if vcv is not None and vcv.version == version and vcv.state == chunk_state(attributes):
+                for record in vcv.records:
+                    payload = previous_reader.read_at(record.virtual_offset, record.length)
+                    data = payload if fmt == records.FORMAT_BINPB else payload.decode("utf-8")
+                    writer.write_serialized(data, record.keys, vcv.state)
+                counts["unchanged"] += 1
+                continue
+
+            result = parallel.convert_chunk(
+                chunk, normalizer, parser, fmt, with_keys=writer.index is not None
+            )
+            if result.records is None:
+                errors += 1
+                print(result.error, file=sys.stderr)
+                continue
+            for i, serialized in enumerate(result.records):
+                writer.write_serialized(
+                    serialized,
+                    result.keys[i] if result.keys else None,
+                    result.states[i] if result.states else None,
+                )
+            change = CHANGE_ADDED if vcv is None else CHANGE_UPDATED
+            counts[change] += 1
+            print(f"{change}\t{accession}\t{version}", file=manifestf)
+
+        for accession, version in index_reader.iter_vcvs():
+            if accession not in seen:
+                counts[CHANGE_REMOVED] += 1
+                print(f"{CHANGE_REMOVED}\t{accession}\t{version}", file=manifestf)
+    normalizer.close()
+    index_reader.close()
+
+    logger.info(
+        "incremental conversion: %s",
+        ", ".join(
+            f"{change}={counts[change]}"
+            for change in ("unchanged", CHANGE_ADDED, CHANGE_UPDATED, CHANGE_REMOVED)
+        ),
+    )
+    if errors == 0:
+        return 0
+    else:
+        print(f"a total of {errors} errors occurred", file=sys.stderr)
+        return 1
@@ -0,0 +1,176 @@
+"""Persistent cache of variant normalization results in SQLite.
+
+Between ClinVar releases, nearly all VCF variants stay the same.  ``NormalizationCache``
+stores the results of ``DnaNormalizer`` keyed by assembly and input variant in a SQLite
+database within a user-specified directory such that re-conversion does not need to
+access the FASTA file for known variants.
+
+Each assembly is tagged with the SHA-256 checksum of its FASTA file.  When the
+checksum changes, the results for the assembly are dropped.  The checksums are
+memoized by path, size, and modification time of the FASTA file.
+"""
+
+import hashlib
+import os
+import sqlite3
+import typing
+
+from logzero import logger
+
+#: File name of the database within the cache directory.
+DB_NAME = "normalization.sqlite3"
+#: Number of pending results after which they are written to the database.
+FLUSH_INTERVAL = 1000
+#: Size of the blocks read for computing checksums.
+CHECKSUM_BLOCK_SIZE = 1 << 20
+#: Seconds to wait for other processes holding the database lock.
+LOCK_TIMEOUT = 60.0
+
+#: Statements for creating the database schema.
+SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS checksums (
+        path TEXT PRIMARY KEY,
+        size INTEGER NOT NULL,
+        mtime_ns INTEGER NOT NULL,
+        checksum TEXT NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS refs (
+        assembly TEXT PRIMARY KEY,
+        checksum TEXT NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS results (
+        assembly TEXT NOT NULL,
+        chrom TEXT NOT NULL,
+        pos INTEGER NOT NULL,
+        ref TEXT NOT NULL,
+        alt TEXT NOT NULL,
+        norm_pos INTEGER NOT NULL,
+        norm_ref TEXT NOT NULL,
+        norm_alt TEXT NOT NULL,
+        wrong_ref INTEGER NOT NULL,
+        PRIMARY KEY (assembly, chrom, pos, ref, alt)
+    ) WITHOUT ROWID""",
+)
+
+
+class CachedResult(typing.NamedTuple):
+    """Normalization result of a variant (the chromosome does not change)."""
+
+    #: Normalized position.
+    pos: int
+    #: Normalized reference allele.
+    ref: str
+    #: Normalized alternate allele.
+    alt: str
+    #: Whether the reference allele did not match the FASTA file.
+    wrong_ref: bool
+
+
+def connect(cache_dir: str) -> sqlite3.Connection:
+    """Open the database in ``cache_dir``, creating directory and schema as needed."""
+    os.makedirs(cache_dir, exist_ok=True)
+    conn = sqlite3.connect(os.path.join(cache_dir, DB_NAME), timeout=LOCK_TIMEOUT)
+    # allow parallel readers while one process writes
+    conn.execute("PRAGMA journal_mode=WAL")
+    with conn:
+        for statement in SCHEMA:
+            conn.execute(statement)
+    return conn
+
+
+def fasta_checksum(conn: sqlite3.Connection, path: str) -> str:
+    """Return the SHA-256 checksum of the file at ``path``, memoized in the database."""
+    stat = os.stat(path)
+    key = (os.path.realpath(path), stat.st_size, stat.st_mtime_ns)
+    row = conn.execute(
+        "SELECT checksum FROM checksums WHERE path = ? AND size = ? AND mtime_ns = ?", key
+    ).fetchone()
+    if row is not None:
+        return row[0]
+    logger.info("computing checksum of %s", path)
+    hasher = hashlib.sha256()
+    with open(path, "rb") as inputf:
+        for block in iter(lambda: inputf.read(CHECKSUM_BLOCK_SIZE), b""):
+            hasher.update(block)
+    checksum = hasher.hexdigest()
+    with conn:
+        conn.execute("INSERT OR REPLACE INTO checksums VALUES (?, ?, ?, ?)", key + (checksum,))
+    return checksum
+
+
+class NormalizationCache:
+    """Cache of normalization results for one assembly.
+
+    New results are kept in memory and written in one transaction on ``flush()``
+    (or after ``FLUSH_INTERVAL`` results) so that the database lock is only held
+    briefly when several processes share the cache.  Lookups see the pending
+    results, too.
+    """
+
+    def __init__(self, cache_dir: str, assembly: str, fasta_path: str):
+        #: The assembly of the cached results.
+        self.assembly = assembly
+        #: Connection to the database.
+        self.conn = connect(cache_dir)
+        #: Checksum of the FASTA file.
+        self.checksum = fasta_checksum(self.conn, fasta_path)
+        #: Results not yet written to the database by variant.
+        self.pending: dict[tuple[str, int, str, str], CachedResult] = {}
+        #: Number of lookups answered from the cache.
+        self.hits = 0
+        #: Number of lookups not found in the cache.
+        self.misses = 0
+        with self.conn:
+            row = self.conn.execute(
+                "SELECT checksum FROM refs WHERE assembly = ?", (assembly,)
+            ).fetchone()
+            if row is None or row[0] != self.checksum:
+                if row is not None:
+                    logger.info("FASTA file for %s changed, invalidating cache", assembly)
+                self.conn.execute("DELETE FROM results WHERE assembly = ?", (assembly,))
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO refs VALUES (?, ?)", (assembly, self.checksum)
+                )
+
+    def get(self, chrom: str, pos: int, ref: str, alt: str) -> typing.Optional[CachedResult]:
+        """Return the cached result for the variant, if any."""
+        pending = self.pending.get((chrom, pos, ref, alt))
+        if pending is not None:
+            self.hits += 1
+            return pending
+        row = self.conn.execute(
+            "SELECT norm_pos, norm_ref, norm_alt, wrong_ref FROM results "
+            "WHERE assembly = ? AND chrom = ? AND pos = ? AND ref = ? AND alt = ?",
+            (self.assembly, chrom, pos, ref, alt),
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return CachedResult(row[0], row[1], row[2], bool(row[3]))
+
+    def put(self, chrom: str, pos: int, ref: str, alt: str, result: CachedResult):
+        """Store the result for the variant."""
+        self.pending[(chrom, pos, ref, alt)] = result
+        if len(self.pending) >= FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self):
+        """Write the pending results to the database."""
+        if not self.pending:
+            return
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (self.assembly, *variant, result.pos, result.ref, result.alt)
+                    + (int(result.wrong_ref),)
+                    for variant, result in self.pending.items()
+                ],
+            )
+        self.pending = {}
+
+    def close(self):
+        """Flush and close the database."""
+        self.flush()
+        self.conn.close()
@@ -111,24 +111,90 @@ def normalize(
         and alt in ["A", "C", "G", "T"]
     ):
         return chrom, pos, ref, alt
-    # This first loop left-aligns and removes excess nucleotides on the right.
-    # This is Algorithm 1 lines 1-6 from Tan et al 2015
-    keep_working = True
-    while keep_working:
-        keep_working = False
-        if len(ref) > 0 and len(alt) > 0 and ref[-1] == alt[-1]:
-            ref = ref[:-1]
-            alt = alt[:-1]
-            keep_working = True
-        if len(ref) == 0 or len(alt) == 0:
-            preceding_base = pysam_fasta.fetch(chrom, pos - 2, pos - 1)
-            ref = preceding_base + ref
-            alt = preceding_base + alt
-            pos = pos - 1
-            keep_working = True
-    # This second loop removes excess nucleotides on the left. This is Algorithm 1 lines 7-8.
-    while len(ref) > 1 and len(alt) > 1 and ref[0] == alt[0]:
-        ref = ref[1:]
-        alt = alt[1:]
-        pos = pos + 1
+    # Left-align and remove excess nucleotides on the right.  This is Algorithm 1
+    # lines 1-6 from Tan et al 2015.  Instead of shifting by one base at a time, the
+    # common suffix is removed at once and indels are shifted with a single scan
+    # over a window of upstream sequence, see ``_left_align_indel``.
+    suffix = _common_suffix_length(ref, alt)
+    if suffix:
+        ref = ref[:-suffix]
+        alt = alt[:-suffix]
+    if len(ref) == 0 or len(alt) == 0:
+        pos, ref, alt = _left_align_indel(pysam_fasta, chrom, pos, ref, alt)
+    # Remove excess nucleotides on the left. This is Algorithm 1 lines 7-8.
+    prefix = _common_prefix_length(ref, alt, min(len(ref), len(alt)) - 1)
+    if prefix > 0:
+        ref = ref[prefix:]
+        alt = alt[prefix:]
+        pos = pos + prefix
     return chrom, pos, ref, alt
+
+
+#: Initial size of the upstream window for left-aligning indels.
+LEFT_ALIGN_WINDOW = 64
+#: Number of bases to compare at once when left-aligning indels.
+LEFT_ALIGN_BLOCK = 16
+
+
+def _common_suffix_length(a: str, b: str) -> int:
+    """Return the length of the common suffix of ``a`` and ``b``."""
+    length = 0
+    limit = min(len(a), len(b))
+    while length < limit and a[-1 - length] == b[-1 - length]:
+        length += 1
+    return length
+
+
+def _common_prefix_length(a: str, b: str, limit: int) -> int:
+    """Return the length of the common prefix of ``a`` and ``b``, at most ``limit``."""
+    length = 0
+    while length < limit and a[length] == b[length]:
+        length += 1
+    return length
+
+
+def _left_align_indel(
+    pysam_fasta: pysam.FastaFile, chrom: str, pos: int, ref: str, alt: str
+) -> typing.Tuple[int, str, str]:
+    """Left-align the insertion or deletion of ``ref + alt`` (one of them empty) before ``pos``.
+
+    Shifting the indel sequence ``seq`` left by one base is possible if the preceding
+    reference base equals the last base of ``seq``, which then becomes the rotated
+    ``preceding_base + seq[:-1]``.  With ``text = upstream + seq``, the ``j``-th shift
+    is thus possible iff ``text[-n - 1 - j] == text[-1 - j]`` with ``n = len(seq)``,
+    such that the number of shifts can be found with one scan.  The upstream window
+    is enlarged only if the scan reaches its start.  Finally, the preceding base is
+    prepended as in the one-base-at-a-time algorithm.
+    """
+    seq = ref or alt
+    n = len(seq)
+    size = max(LEFT_ALIGN_WINDOW, 2 * n)
+    shift = 0
+    while True:
+        window_start = max(0, pos - 1 - size)
+        upstream = pysam_fasta.fetch(chrom, window_start, pos - 1)
+        text = upstream + seq
+        last = len(upstream) - 1
+        # compare blocks first, then single bases
+        end = last + 1 - shift
+        while (
+            end >= LEFT_ALIGN_BLOCK
+            and text[end - LEFT_ALIGN_BLOCK : end] == text[end - LEFT_ALIGN_BLOCK + n : end + n]
+        ):
+            end -= LEFT_ALIGN_BLOCK
+        shift = last + 1 - end
+        while shift <= last and text[last - shift] == text[last - shift + n]:
+            shift += 1
+        if shift <= last or window_start == 0:
+            break
+        size *= 4
+    if shift <= last:
+        preceding_base = text[last - shift]
+    else:
+        # reached the start of the contig, fetching before it raises an error
+        preceding_base = pysam_fasta.fetch(chrom, pos - 2 - shift, pos - 1 - shift)
+    shifted = text[last + 1 - shift : last + 1 - shift + n]
+    if ref:
+        return pos - shift - 1, preceding_base + shifted, preceding_base
+    else:
+        return pos - shift - 1, preceding_base, preceding_base + shifted
@@ -7,6 +7,7 @@ are prefixed with "chr", and the PAR on "chrY" is not N-masked, and
 You will have to manually append a "chrMT" to "hg19.fa" and "hg38.fa".
 """
 
+import collections
 import typing
 
 from logzero import logger
@@ -14,10 +15,12 @@ import pydantic
 import pysam
 
 from clinvar_data.conversion import normalize
+from clinvar_data.conversion.norm_cache import CachedResult, NormalizationCache
 from clinvar_data.pbs import clinvar_public
 from clinvar_data.pbs.clinvar_public_pb2 import (
     Allele,
     ClassifiedRecord,
+    Location,
     VariationArchive,
 )
 
@@ -60,6 +63,22 @@ def expand_ambiguous(seq: str) -> typing.Iterator[str]:
 CHROMS_WITH_SEQ = list(map(str, range(1, 23))) + ["X", "Y", "MT"]
 
 
+class VcfRecord(typing.NamedTuple):
+    """Lightweight VCF variant used within the normalization pipeline.
+
+    Creating and copying these is much cheaper than for the validated ``VcfVariant``.
+    """
+
+    #: Chromosome.
+    chrom: str
+    #: Position.
+    pos: int
+    #: Reference allele.
+    ref: str
+    #: Alternate allele.
+    alt: str
+
+
 class VcfVariant(pydantic.BaseModel):
     """VCF variant."""
 
@@ -74,15 +93,153 @@ class VcfVariant(pydantic.BaseModel):
 
     model_config = pydantic.ConfigDict(frozen=True)
 
+    @classmethod
+    def from_record(cls, record: VcfRecord) -> "VcfVariant":
+        """Create from a ``VcfRecord``."""
+        return cls(chrom=record.chrom, pos=record.pos, ref=record.ref, alt=record.alt)
+
+    def to_record(self) -> VcfRecord:
+        """Convert to a ``VcfRecord``."""
+        return VcfRecord(self.chrom, self.pos, self.ref, self.alt)
+
+
+#: Size of the windows cached by ``CachedFastaFile``.
+FASTA_WINDOW_SIZE = 1 << 16
+#: Maximal number of windows kept by ``CachedFastaFile``.
+FASTA_MAX_WINDOWS = 256
+
+
+class CacheInfo(typing.NamedTuple):
+    """Statistics of ``CachedFastaFile``, similar to ``functools.lru_cache``."""
+
+    #: Number of windows served from the cache.
+    hits: int
+    #: Number of windows read from the FASTA file.
+    misses: int
+    #: Maximal number of windows in the cache.
+    maxsize: int
+    #: Current number of windows in the cache.
+    currsize: int
+
+
+class CachedFastaFile:
+    """Wrap a ``pysam.FastaFile`` and serve ``fetch()`` calls from an LRU cache of windows.
+
+    The sequence is read in windows of ``window_size`` bp and the ``max_windows`` most
+    recently used windows are kept in memory.  The normalization only needs a few
+    bases around each variant, so nearby variants and the left-alignment loop hit
+    the same windows.
+    """
+
+    def __init__(
+        self,
+        fasta_file: pysam.FastaFile,
+        window_size: int = FASTA_WINDOW_SIZE,
+        max_windows: int = FASTA_MAX_WINDOWS,
+    ):
+        #: The wrapped FASTA file.
+        self.fasta_file = fasta_file
+        #: Size of the windows.
+        self.window_size = window_size
+        #: Maximal number of windows to keep.
+        self.max_windows = max_windows
+        #: Cached windows by contig and window number, least recently used first.
+        self.windows: collections.OrderedDict[tuple[str, int], str] = collections.OrderedDict()
+        #: Number of windows served from the cache.
+        self.hits = 0
+        #: Number of windows read from the FASTA file.
+        self.misses = 0
+
+    def _window(self, reference: str, number: int) -> str:
+        key = (reference, number)
+        window = self.windows.get(key)
+        if window is not None:
+            self.hits += 1
+            self.windows.move_to_end(key)
+            return window
+        self.misses += 1
+        start = number * self.window_size
+        window = self.fasta_file.fetch(reference, start, start + self.window_size)
+        self.windows[key] = window
+        if len(self.windows) > self.max_windows:
+            self.windows.popitem(last=False)
+        return window
+
+    def fetch(self, reference: str, start: int, end: int) -> str:
+        """Fetch sequence of ``reference`` from 0-based ``start`` to (exclusive) ``end``."""
+        if start < 0 or end <= start:
+            # let pysam handle the corner cases
+            return self.fasta_file.fetch(reference, start, end)
+        first, last = start // self.window_size, (end - 1) // self.window_size
+        offset = start - first * self.window_size
+        if first == last:
+            return self._window(reference, first)[offset : offset + end - start]
+        seq = "".join(self._window(reference, number) for number in range(first, last + 1))
+        return seq[offset : offset + end - start]
+
+    def cache_info(self) -> CacheInfo:
+        """Return hit/miss statistics of the cache."""
+        return CacheInfo(self.hits, self.misses, self.max_windows, len(self.windows))
+
 
 class DnaNormalizer:
     """Normalize a variant based on chrom/pos/ref/alt for DNA characters."""
 
-    def __init__(self, fasta_ref: str):
-        #: FASTA reference file.
-        self.fasta_ref = pysam.FastaFile(fasta_ref)
+    def __init__(self, fasta_ref: str, cache: typing.Optional[NormalizationCache] = None):
+        #: FASTA reference file, with windows cached.
+        self.fasta_ref = CachedFastaFile(pysam.FastaFile(fasta_ref))
+        #: Optional persistent cache of normalization results.
+        self.cache = cache
+        #: Number of variants for which ``normalize()`` found that REF does not match.
+        self.wrong_ref = 0
+
+    def is_normal(self, chrom: str, pos: int, ref: str, alt: str) -> typing.Optional[bool]:
+        """Check whether the variant is left unchanged by ``normalize()`` without running it.
+
+        This is the case for SNVs and MNVs of upper case ``ACGT`` without common first or
+        last base.  Returns ``True`` if so and the REF matches, ``False`` if so but the REF
+        does not match (``normalize()`` would then keep the variant), and ``None`` if the
+        variant needs to be normalized.
+        """
+        if (
+            not ref
+            or len(ref) != len(alt)
+            or ref[0] == alt[0]
+            or ref[-1] == alt[-1]
+            or ref.strip("ACGT")
+            or alt.strip("ACGT")
+        ):
+            return None
+        if self.cache is not None:
+            cached = self.cache.get(chrom, pos, ref, alt)
+            if cached is not None:
+                return not cached.wrong_ref
+        result = self.fasta_ref.fetch(chrom, pos - 1, pos - 1 + len(ref)).upper() == ref
+        if self.cache is not None:
+            self.cache.put(chrom, pos, ref, alt, CachedResult(pos, ref, alt, not result))
+        return result
 
     def normalize(self, variant: VcfVariant) -> VcfVariant:
+        """Normalize ``variant``, see ``normalize_record()``."""
+        return VcfVariant.from_record(self.normalize_record(variant.to_record()))
+
+    def normalize_record(self, variant: VcfRecord) -> VcfRecord:
+        """Normalize ``variant``; it is returned as is if REF is wrong or equal to ALT."""
+        if self.cache is None:
+            return self._normalize_record(variant)
+        cached = self.cache.get(*variant)
+        if cached is not None:
+            if cached.wrong_ref:
+                self.wrong_ref += 1
+            return VcfRecord(variant.chrom, cached.pos, cached.ref, cached.alt)
+        wrong_ref = self.wrong_ref
+        result = self._normalize_record(variant)
+        self.cache.put(
+            *variant, CachedResult(result.pos, result.ref, result.alt, self.wrong_ref != wrong_ref)
+        )
+        return result
+
+    def _normalize_record(self, variant: VcfRecord) -> VcfRecord:
         try:
             chrom, pos, ref, alt = normalize.normalize(
                 self.fasta_ref, variant.chrom, variant.pos, variant.ref, variant.alt
@@ -99,8 +256,10 @@ class DnaNormalizer:
                     ref,
                     alt,
                 )
-            return VcfVariant(chrom=chrom, pos=pos, ref=ref, alt=alt)
+            return VcfRecord(chrom, pos, ref, alt)
         except (normalize.RefEqualsAltError, normalize.WrongRefError) as e:
+            if isinstance(e, normalize.WrongRefError):
+                self.wrong_ref += 1
             logger.info("Skipping normalization because of error (will write out though): %s", e)
             return variant
 
@@ -111,24 +270,31 @@ class AmbiguousDnaNormalizer:
     This implies normalizing to a list of variants.
     """
 
-    def __init__(self, fasta_ref: str):
+    def __init__(self, fasta_ref: str, cache: typing.Optional[NormalizationCache] = None):
         #: Internal normalizer.
-        self.normalizer = DnaNormalizer(fasta_ref)
+        self.normalizer = DnaNormalizer(fasta_ref, cache)
 
     def normalize(self, variant: VcfVariant) -> typing.List[VcfVariant]:
+        """Normalize ``variant``, see ``normalize_record()``."""
+        return [
+            VcfVariant.from_record(record) for record in self.normalize_record(variant.to_record())
+        ]
+
+    def normalize_record(self, variant: VcfRecord) -> typing.List[VcfRecord]:
+        """Normalize ``variant``, one result per expanded alternate allele."""
         if is_ambiguous(variant.alt):
             return [
-                self.normalizer.normalize(variant.model_copy(update={"alt": alt}))
+                self.normalizer.normalize_record(variant._replace(alt=alt))
                 for alt in expand_ambiguous(variant.alt)
             ]
         else:
-            return [self.normalizer.normalize(variant)]
+            return [self.normalizer.normalize_record(variant)]
 
 
-def vcf_variant_from_variant_archive(
+def vcf_sequence_location(
     va: VariationArchive, assembly: typing.Literal["GRCh37", "GRCh38"]
-) -> typing.Optional[VcfVariant]:
-    """Extract ``VcfVariant`` from a ``VariationArchive`mak` (via sequence location)."""
+) -> typing.Optional[Location.SequenceLocation]:
+    """Return the sequence location with the VCF variant of ``va`` on ``assembly``, if any."""
     if not va.HasField("classified_record"):
         return None
     classified_record: ClassifiedRecord = va.classified_record
@@ -144,17 +310,37 @@ def vcf_variant_from_variant_archive(
             ):
                 chrom = clinvar_public.Chromosome.Name(sequence_location.chr)[len("CHROMOSOME_") :]
                 if chrom in CHROMS_WITH_SEQ:
-                    return VcfVariant(
-                        chrom=f"chr{chrom}",
-                        pos=sequence_location.position_vcf,
-                        ref=sequence_location.reference_allele_vcf,
-                        alt=sequence_location.alternate_allele_vcf,
-                    )
+                    return sequence_location
     return None
 
 
+def vcf_record_from_variant_archive(
+    va: VariationArchive, assembly: typing.Literal["GRCh37", "GRCh38"]
+) -> typing.Optional[VcfRecord]:
+    """Extract ``VcfRecord`` from a ``VariationArchive`` (via sequence location)."""
+    sequence_location = vcf_sequence_location(va, assembly)
+    if sequence_location is None:
+        return None
+    return VcfRecord(
+        "chr" + clinvar_public.Chromosome.Name(sequence_location.chr)[len("CHROMOSOME_") :],
+        sequence_location.position_vcf,
+        sequence_location.reference_allele_vcf,
+        sequence_location.alternate_allele_vcf,
+    )
+
+
+def vcf_variant_from_variant_archive(
+    va: VariationArchive, assembly: typing.Literal["GRCh37", "GRCh38"]
+) -> typing.Optional[VcfVariant]:
+    """Extract ``VcfVariant`` from a ``VariationArchive`` (via sequence location)."""
+    record = vcf_record_from_variant_archive(va, assembly)
+    return VcfVariant.from_record(record) if record is not None else None
+
+
 def write_vcf_variant_to_va(
-    va: VariationArchive, vcf_variant: VcfVariant, assembly: typing.Literal["GRCh37", "GRCh38"]
+    va: VariationArchive,
+    vcf_variant: typing.Union[VcfRecord, VcfVariant],
+    assembly: typing.Literal["GRCh37", "GRCh38"],
 ):
     """Write VCF variant coordinates to a ``VariationArchive``."""
     if not va.HasField("classified_record"):
@@ -175,13 +361,35 @@ def write_vcf_variant_to_va(
                 sequence_location.alternate_allele_vcf = vcf_variant.alt
 
 
-class MatchedVcfVariants(pydantic.BaseModel):
+class MatchedVcfVariants:
     """Stores pair of matched hg19/hg38 variants."""
 
-    #: HG19 variant.
-    hg19: typing.Optional[VcfVariant] = None
-    #: HG38 variant.
-    hg38: typing.Optional[VcfVariant] = None
+    __slots__ = ("hg19", "hg38")
+
+    def __init__(
+        self, hg19: typing.Optional[VcfRecord] = None, hg38: typing.Optional[VcfRecord] = None
+    ):
+        #: HG19 variant.
+        self.hg19 = hg19
+        #: HG38 variant.
+        self.hg38 = hg38
+
+
+#: Normalization outcome: records returned as they are.
+CATEGORY_UNTOUCHED = "untouched"
+#: Normalization outcome: records with the VCF variant rewritten.
+CATEGORY_NORMALIZED = "normalized"
+#: Normalization outcome: records expanded for ambiguous IUPAC codes in the alternate allele.
+CATEGORY_EXPANDED_IUPAC = "expanded_iupac"
+#: Normalization outcome: records where REF does not match the reference sequence.
+CATEGORY_WRONG_REF = "wrong_ref"
+#: All normalization outcomes, in order of reporting.
+CATEGORIES = (
+    CATEGORY_UNTOUCHED,
+    CATEGORY_NORMALIZED,
+    CATEGORY_EXPANDED_IUPAC,
+    CATEGORY_WRONG_REF,
+)
 
 
 class VariationArchiveNormalizer:
@@ -191,17 +399,60 @@ class VariationArchiveNormalizer:
     Note that this will also expand ambiguous IUPAC codes in the alternate allele,
     leading to duplicate records in terms of VCV but still unique in terms
     of VCF positions.
+
+    With ``cache_dir``, the normalization results are cached on disk, see
+    ``clinvar_data.conversion.norm_cache``.  Call ``close()`` when done.
     """
 
     def __init__(
         self,
         fasta_ref_hg19: typing.Optional[str] = None,
         fasta_ref_hg38: typing.Optional[str] = None,
+        cache_dir: typing.Optional[str] = None,
     ):
+        #: Persistent caches of the normalization results by assembly.
+        self.caches: dict[str, NormalizationCache] = {}
+        if cache_dir:
+            for assembly, fasta_ref in (("GRCh37", fasta_ref_hg19), ("GRCh38", fasta_ref_hg38)):
+                if fasta_ref:
+                    self.caches[assembly] = NormalizationCache(cache_dir, assembly, fasta_ref)
         #: Normalizer to use for GRCh37.
-        self.normalizer_hg19 = AmbiguousDnaNormalizer(fasta_ref_hg19) if fasta_ref_hg19 else None
+        self.normalizer_hg19 = (
+            AmbiguousDnaNormalizer(fasta_ref_hg19, self.caches.get("GRCh37"))
+            if fasta_ref_hg19
+            else None
+        )
         #: Normalizer to use for GRCh38.
-        self.normalizer_hg38 = AmbiguousDnaNormalizer(fasta_ref_hg38) if fasta_ref_hg38 else None
+        self.normalizer_hg38 = (
+            AmbiguousDnaNormalizer(fasta_ref_hg38, self.caches.get("GRCh38"))
+            if fasta_ref_hg38
+            else None
+        )
+        #: Number of records by ``CATEGORY_*`` passed to ``normalize()``.
+        self.stats: typing.Counter[str] = collections.Counter()
+
+    def cache_info(self) -> dict[str, CacheInfo]:
+        """Return the FASTA cache statistics by assembly."""
+        result = {}
+        if self.normalizer_hg19:
+            result["GRCh37"] = self.normalizer_hg19.normalizer.fasta_ref.cache_info()
+        if self.normalizer_hg38:
+            result["GRCh38"] = self.normalizer_hg38.normalizer.fasta_ref.cache_info()
+        return result
+
+    def flush_cache(self):
+        """Write pending results to the persistent caches."""
+        for cache in self.caches.values():
+            cache.flush()
+
+    def close(self):
+        """Close the persistent caches, if any."""
+        for assembly, cache in self.caches.items():
+            logger.info(
+                "normalization cache for %s: %d hits, %d misses", assembly, cache.hits, cache.misses
+            )
+            cache.close()
+        self.caches = {}
 
     def normalize(self, va: VariationArchive) -> typing.List[VariationArchive]:
         """Normalize the VCF variant in ``va``.
@@ -213,26 +464,51 @@ class VariationArchiveNormalizer:
         3. match the resulting variants based on expanded non-IUPAC alt alleles
         4. for each matched pair, create a copy of the original ``va``, write
            the normalized VCF variant back to the copy
+
+        The outcome is counted in ``stats``, see ``normalize_with_category()``.
         """
+        result, category = self.normalize_with_category(va)
+        self.stats[category] += 1
+        return result
+
+    def normalize_with_category(
+        self, va: VariationArchive
+    ) -> typing.Tuple[typing.List[VariationArchive], str]:
+        """Same as ``normalize()`` but also return the ``CATEGORY_*`` of the outcome.
+
+        Variants that are already normalized (e.g., SNVs) are recognized from the
+        raw sequence location such that ``va`` is returned without creating models
+        or copies.
+        """
+        category = self._fast_path_category(va)
+        if category is not None:
+            return [va], category
+        wrong_ref_before = self._wrong_ref_count()
         # extract
-        vcf_hg19 = vcf_variant_from_variant_archive(va, "GRCh37")
-        vcf_hg38 = vcf_variant_from_variant_archive(va, "GRCh38")
+        vcf_hg19 = vcf_record_from_variant_archive(va, "GRCh37")
+        vcf_hg38 = vcf_record_from_variant_archive(va, "GRCh38")
         if vcf_hg19 is None and vcf_hg38 is None:
-            return [va]
+            return [va], CATEGORY_UNTOUCHED
         # normalize
         vcfs_hg19 = (
-            self.normalizer_hg19.normalize(vcf_hg19)
+            self.normalizer_hg19.normalize_record(vcf_hg19)
             if self.normalizer_hg19 and vcf_hg19
             else ([vcf_hg19] if vcf_hg19 is not None else [])
         )
         vcfs_hg38 = (
-            self.normalizer_hg38.normalize(vcf_hg38)
+            self.normalizer_hg38.normalize_record(vcf_hg38)
             if self.normalizer_hg38 and vcf_hg38
             else ([vcf_hg38] if vcf_hg38 is not None else [])
         )
+        if self._wrong_ref_count() != wrong_ref_before:
+            category = CATEGORY_WRONG_REF
+        elif len(vcfs_hg19) > 1 or len(vcfs_hg38) > 1:
+            category = CATEGORY_EXPANDED_IUPAC
+        else:
+            category = CATEGORY_NORMALIZED
         # short-circuit if nothing to normalize
         if vcfs_hg19 == [vcf_hg19] and vcfs_hg38 == [vcf_hg38]:
-            return [va]
+            return [va], (CATEGORY_UNTOUCHED if category == CATEGORY_NORMALIZED else category)
         # match
         matched_vcfs: dict[str, MatchedVcfVariants] = {}
         for vcf_variant in vcfs_hg19:
@@ -244,7 +520,40 @@ class VariationArchiveNormalizer:
                 matched_vcfs[vcf_variant.alt] = MatchedVcfVariants(hg38=vcf_variant)
         return [
             self._create_copy_with_variant(va, matched_vcf) for matched_vcf in matched_vcfs.values()
-        ]
+        ], category
+
+    def _fast_path_category(self, va: VariationArchive) -> typing.Optional[str]:
+        """Return the category if no normalizer changes ``va``, ``None`` if unsure."""
+        category = CATEGORY_UNTOUCHED
+        for normalizer, assembly in (
+            (self.normalizer_hg19, "GRCh37"),
+            (self.normalizer_hg38, "GRCh38"),
+        ):
+            if normalizer is None:
+                continue
+            sequence_location = vcf_sequence_location(
+                va, typing.cast(typing.Literal["GRCh37", "GRCh38"], assembly)
+            )
+            if sequence_location is None:
+                continue
+            is_normal = normalizer.normalizer.is_normal(
+                "chr" + clinvar_public.Chromosome.Name(sequence_location.chr)[len("CHROMOSOME_") :],
+                sequence_location.position_vcf,
+                sequence_location.reference_allele_vcf,
+                sequence_location.alternate_allele_vcf,
+            )
+            if is_normal is None:
+                return None
+            elif not is_normal:
+                category = CATEGORY_WRONG_REF
+        return category
+
+    def _wrong_ref_count(self) -> int:
+        return sum(
+            normalizer.normalizer.wrong_ref
+            for normalizer in (self.normalizer_hg19, self.normalizer_hg38)
+            if normalizer is not None
+        )
 
     def _create_copy_with_variant(
         self, va: VariationArchive, matched_vcf: MatchedVcfVariants
@@ -0,0 +1,211 @@
+"""Multi-process conversion of ClinVar XML to JSONL.
+
+A single reader splits the XML stream into the byte ranges of the individual
+``<VariationArchive>`` elements.  Batches of these chunks are then parsed,
+converted, and normalized in a pool of worker processes.  Results are
+collected in submission order such that the output is deterministic.
+"""
+
+import collections
+import multiprocessing
+import traceback
+import typing
+
+from clinvar_data.conversion import dict_to_pb, parsing
+from clinvar_data.conversion.normalizer import VariationArchiveNormalizer
+from clinvar_data.io import index, records
+
+#: Opening tag of a ``VariationArchive`` element (without the closing ``>`` or attributes).
+TAG_OPEN = b"<VariationArchive"
+#: Closing tag of a ``VariationArchive`` element.
+TAG_CLOSE = b"</VariationArchive>"
+#: Number of bytes to read from the input at once.
+READ_SIZE = 1 << 20
+#: Number of ``VariationArchive`` chunks to send to a worker at once.
+BATCH_SIZE = 64
+
+
+def iter_variation_archive_chunks(
+    inputf: typing.BinaryIO, read_size: int = READ_SIZE
+) -> typing.Iterator[bytes]:
+    """Split the ClinVar XML stream into ``<VariationArchive>`` chunks.
+
+    Each yielded chunk is a well-formed XML document consisting of exactly one
+    ``VariationArchive`` element.  Everything between the elements (XML header,
+    root element) is skipped.
+    """
+    buf = b""
+    pos = 0
+    while True:
+        start = buf.find(TAG_OPEN, pos)
+        # the opening tag must be followed by whitespace or ">"
+        while start != -1 and start + len(TAG_OPEN) < len(buf):
+            if buf[start + len(TAG_OPEN) : start + len(TAG_OPEN) + 1] in b" \t\r\n>":
+                break
+            start = buf.find(TAG_OPEN, start + 1)
+        end = buf.find(TAG_CLOSE, start) if start != -1 else -1
+        if start != -1 and end != -1:
+            end += len(TAG_CLOSE)
+            yield buf[start:end]
+            pos = end
+            continue
+        # need more data, drop the consumed prefix
+        keep_from = start if start != -1 else max(pos, len(buf) - len(TAG_OPEN))
+        buf = buf[keep_from:]
+        pos = 0
+        data = inputf.read(read_size)
+        if not data:
+            return
+        buf += data
+
+
+def iter_batches(
+    chunks: typing.Iterable[bytes], batch_size: int = BATCH_SIZE
+) -> typing.Iterator[list[bytes]]:
+    """Group chunks into lists of size ``batch_size`` (last one may be smaller)."""
+    batch: list[bytes] = []
+    for chunk in chunks:
+        batch.append(chunk)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class ChunkResult(typing.NamedTuple):
+    """Result of converting one ``VariationArchive`` chunk in a worker."""
+
+    #: Serialized normalized records (see ``records.serialize()``), ``None`` on error.
+    records: typing.Optional[list[typing.Union[str, bytes]]]
+    #: Error message with traceback and data if conversion failed.
+    error: typing.Optional[str]
+    #: Accessions to index per record (see ``index.record_keys()``), if requested.
+    keys: typing.Optional[list[list[index.Key]]] = None
+    #: Record states to index per record (see ``index.record_state()``), if requested.
+    states: typing.Optional[list[str]] = None
+    #: Normalization outcome (see ``normalizer.CATEGORIES``), ``None`` on error.
+    category: typing.Optional[str] = None
+
+
+#: Normalizer of the worker process, set up in ``init_worker``.
+_worker_normalizer: typing.Optional[VariationArchiveNormalizer] = None
+#: Parser backend of the worker process, set up in ``init_worker``.
+_worker_parser: str = parsing.PARSER_XMLTODICT
+#: Output format of the worker process, set up in ``init_worker``.
+_worker_output_format: str = records.FORMAT_JSONL
+#: Whether the worker process returns the accessions to index, set up in ``init_worker``.
+_worker_with_keys: bool = False
+
+
+def init_worker(
+    fasta_ref_hg19: typing.Optional[str],
+    fasta_ref_hg38: typing.Optional[str],
+    parser: str = parsing.PARSER_XMLTODICT,
+    output_format: str = records.FORMAT_JSONL,
+    with_keys: bool = False,
+    cache_dir: typing.Optional[str] = None,
+):
+    """Initialize worker process; the FASTA files are opened once per process."""
+    global _worker_normalizer, _worker_parser, _worker_output_format, _worker_with_keys
+    _worker_normalizer = VariationArchiveNormalizer(fasta_ref_hg19, fasta_ref_hg38, cache_dir)
+    _worker_parser = parser
+    _worker_output_format = output_format
+    _worker_with_keys = with_keys
+
+
+def convert_chunk(
+    chunk: bytes,
+    normalizer: VariationArchiveNormalizer,
+    parser: str = parsing.PARSER_XMLTODICT,
+    output_format: str = records.FORMAT_JSONL,
+    with_keys: bool = False,
+) -> ChunkResult:
+    """Parse, convert, and normalize a single ``VariationArchive`` chunk."""
+    json_va: typing.Any = None
+    try:
+        json_va = parsing.parse_chunk(chunk, parser)
+        data = dict_to_pb.ConvertVariationArchive.xmldict_data_to_pb(json_va)
+        normalized_data_list, category = normalizer.normalize_with_category(data)
+    except Exception:
+        return ChunkResult(
+            records=None,
+            error="\n".join(
+                [
+                    "Problem with data: exception and data follow",
+                    traceback.format_exc().rstrip(),
+                    str(json_va if json_va is not None else chunk),
+                ]
+            ),
+        )
+    return ChunkResult(
+        records=[
+            records.serialize(normalized_data, output_format)
+            for normalized_data in normalized_data_list
+        ],
+        error=None,
+        keys=(
+            [index.record_keys(normalized_data) for normalized_data in normalized_data_list]
+            if with_keys
+            else None
+        ),
+        states=(
+            [index.record_state(normalized_data) for normalized_data in normalized_data_list]
+            if with_keys
+            else None
+        ),
+        category=category,
+    )
+
+
+def convert_batch(batch: list[bytes]) -> list[ChunkResult]:
+    """Convert a batch of chunks in the worker process.
+
+    New normalization results are written to the cache after each batch as the
+    pool terminates the workers when done.
+    """
+    assert _worker_normalizer is not None
+    result = [
+        convert_chunk(
+            chunk, _worker_normalizer, _worker_parser, _worker_output_format, _worker_with_keys
+        )
+        for chunk in batch
+    ]
+    _worker_normalizer.flush_cache()
+    return result
+
+
+def run_parallel(
+    inputf: typing.BinaryIO,
+    jobs: int,
+    fasta_ref_hg19: typing.Optional[str] = None,
+    fasta_ref_hg38: typing.Optional[str] = None,
+    batch_size: int = BATCH_SIZE,
+    parser: str = parsing.PARSER_XMLTODICT,
+    output_format: str = records.FORMAT_JSONL,
+    with_keys: bool = False,
+    cache_dir: typing.Optional[str] = None,
+) -> typing.Iterator[ChunkResult]:
+    """Convert the records from ``inputf`` in ``jobs`` worker processes.
+
+    Yields the results in input order.  At most ``2 * jobs`` batches are in
+    flight at any time so memory stays bounded.  Closing the generator early
+    (e.g., when ``--max-records`` is reached) terminates the pool.
+
+    With ``cache_dir``, the workers share the persistent normalization cache.
+    """
+    if cache_dir:
+        # compute the FASTA checksums and invalidate the cache once before starting workers
+        VariationArchiveNormalizer(fasta_ref_hg19, fasta_ref_hg38, cache_dir).close()
+    with multiprocessing.Pool(
+        processes=jobs,
+        initializer=init_worker,
+        initargs=(fasta_ref_hg19, fasta_ref_hg38, parser, output_format, with_keys, cache_dir),
+    ) as pool:
+        pending: collections.deque = collections.deque()
+        for batch in iter_batches(iter_variation_archive_chunks(inputf), batch_size):
+            pending.append(pool.apply_async(convert_batch, (batch,)))
+            if len(pending) >= 2 * jobs:
+                yield from pending.popleft().get()
+        while pending:
+            yield from pending.popleft().get()
@@ -0,0 +1,188 @@
+"""Parser backends for streaming ``VariationArchive`` records out of ClinVar XML.
+
+All backends produce dicts of the same shape as ``xmltodict`` (attributes prefixed
+with ``@``, character data in ``#text``, repeated child elements as lists) so that
+the converters in ``dict_to_pb`` can be used unchanged.
+
+- ``xmltodict`` uses ``xmltodict.parse()`` in streaming mode.
+- ``iterparse`` uses ``xml.etree.ElementTree.iterparse()`` (expat with the C
+  accelerated tree builder) and frees each ``VariationArchive`` subtree right
+  after it has been handed out.
+"""
+
+import io
+import typing
+import xml.etree.ElementTree as ET
+
+import xmltodict
+
+#: Name of the ``xmltodict``-based parser backend.
+PARSER_XMLTODICT = "xmltodict"
+#: Name of the ``ElementTree.iterparse``-based parser backend.
+PARSER_ITERPARSE = "iterparse"
+#: Available parser backends.
+PARSERS = (PARSER_XMLTODICT, PARSER_ITERPARSE)
+
+#: Depth of the ``VariationArchive`` elements below the document root.
+ITEM_DEPTH = 2
+
+#: Root element to wrap chunks in for ``ElementTree``, which needs the ``xsi`` prefix
+#: declared that ClinVar declares on its root element only.
+CHUNK_ROOT = (
+    b'<ClinVarVariationRelease xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">',
+    b"</ClinVarVariationRelease>",
+)
+
+
+class _NamespaceNames:
+    """Helper to map ``{uri}local`` names from ``ElementTree`` back to ``prefix:local``.
+
+    Without namespace processing, ``xmltodict`` sees namespace declarations as plain
+    ``xmlns:prefix`` attributes and namespaced attributes as ``prefix:local``.
+    """
+
+    def __init__(self):
+        #: Mapping from namespace URI to prefix.
+        self.prefixes: dict[str, str] = {}
+
+    def declare(self, prefix: str, uri: str):
+        self.prefixes[uri] = prefix
+
+    def name(self, name: str) -> str:
+        if not name.startswith("{"):
+            return name
+        uri, local = name[1:].split("}", 1)
+        prefix = self.prefixes.get(uri)
+        return f"{prefix}:{local}" if prefix else local
+
+
+def element_to_xmldict(
+    elem: ET.Element, names: typing.Optional[_NamespaceNames] = None
+) -> typing.Any:
+    """Convert an ``ElementTree`` element into the value that ``xmltodict`` produces.
+
+    Returns ``None`` for empty elements, a string for text-only elements, and a dict
+    otherwise.
+    """
+    item: typing.Optional[dict[str, typing.Any]] = None
+    if elem.attrib:
+        if names is None:
+            item = {f"@{key}": value for key, value in elem.attrib.items()}
+        else:
+            item = {f"@{names.name(key)}": value for key, value in elem.attrib.items()}
+    data = elem.text or ""
+    for child in elem:
+        if child.tail:
+            data += child.tail
+        value = element_to_xmldict(child, names)
+        if item is None:
+            item = {}
+        key = child.tag if names is None else names.name(child.tag)
+        if key in item:
+            existing = item[key]
+            if isinstance(existing, list):
+                existing.append(value)
+            else:
+                item[key] = [existing, value]
+        else:
+            item[key] = value
+    text = data.strip() or None
+    if item is None:
+        return text
+    if text:
+        item["#text"] = text
+    return item
+
+
+def iterparse_xmldicts(inputf: typing.BinaryIO) -> typing.Iterator[dict[str, typing.Any]]:
+    """Yield ``{tag: value}`` dicts for each element at ``ITEM_DEPTH`` using ``iterparse``.
+
+    The subtree of each element is released after the dict has been built so that
+    memory use stays constant over the whole release.
+    """
+    names = _NamespaceNames()
+    pending_decls: list[tuple[str, str]] = []
+    root: typing.Optional[ET.Element] = None
+    depth = 0
+    for event, payload in ET.iterparse(inputf, events=("start-ns", "start", "end")):
+        if event == "start-ns":
+            prefix, uri = typing.cast(tuple[str, str], payload)
+            names.declare(prefix, uri)
+            pending_decls.append((prefix, uri))
+            continue
+        elem = typing.cast(ET.Element, payload)
+        if event == "start":
+            depth += 1
+            if depth == 1:
+                root = elem
+            if pending_decls:
+                # ``xmltodict`` reports namespace declarations as attributes
+                for prefix, uri in pending_decls:
+                    elem.attrib["xmlns:" + prefix if prefix else "xmlns"] = uri
+                pending_decls = []
+        else:
+            if depth == ITEM_DEPTH:
+                key = names.name(elem.tag)
+                value = element_to_xmldict(elem, names)
+                assert root is not None
+                root.clear()
+                yield {key: value}
+            depth -= 1
+
+
+def parse_xmltodict(
+    inputf: typing.BinaryIO, callback: typing.Callable[[dict[str, typing.Any]], bool]
+) -> bool:
+    """Stream ``{tag: value}`` dicts at ``ITEM_DEPTH`` to ``callback`` using ``xmltodict``.
+
+    Stops when ``callback`` returns ``False``.  Returns whether the whole input
+    has been consumed.
+    """
+
+    def handle_item(ctx: list, value: typing.Any) -> bool:
+        key, attrs = ctx[-1]
+        item = {f"@{k}": v for k, v in (attrs or {}).items()}
+        if isinstance(value, dict):
+            item.update(value)
+        return callback({key: item})
+
+    try:
+        xmltodict.parse(inputf, item_depth=ITEM_DEPTH, item_callback=handle_item)
+    except xmltodict.ParsingInterrupted:
+        return False
+    return True
+
+
+def parse_iterparse(
+    inputf: typing.BinaryIO, callback: typing.Callable[[dict[str, typing.Any]], bool]
+) -> bool:
+    """Same as ``parse_xmltodict()`` but using ``iterparse_xmldicts()``."""
+    for item in iterparse_xmldicts(inputf):
+        if not callback(item):
+            return False
+    return True
+
+
+def parse_stream(
+    inputf: typing.BinaryIO,
+    callback: typing.Callable[[dict[str, typing.Any]], bool],
+    parser: str = PARSER_XMLTODICT,
+) -> bool:
+    """Stream the records from ``inputf`` to ``callback`` using the given parser backend."""
+    if parser == PARSER_XMLTODICT:
+        return parse_xmltodict(inputf, callback)
+    elif parser == PARSER_ITERPARSE:
+        return parse_iterparse(inputf, callback)
+    else:
+        raise ValueError(f"Unknown parser {parser}, must be one of {PARSERS}")
+
+
+def parse_chunk(chunk: bytes, parser: str = PARSER_XMLTODICT) -> dict[str, typing.Any]:
+    """Parse a single-element XML document into a ``{tag: value}`` dict."""
+    if parser == PARSER_XMLTODICT:
+        return xmltodict.parse(chunk)
+    elif parser == PARSER_ITERPARSE:
+        (item,) = iterparse_xmldicts(io.BytesIO(CHUNK_ROOT[0] + chunk + CHUNK_ROOT[1]))
+        return item
+    else:
+        raise ValueError(f"Unknown parser {parser}, must be one of {PARSERS}")
@@ -0,0 +1,150 @@
+"""Opt-in profiling of the conversion from ClinVar XML.
+
+``ConverterProfile.installed()`` temporarily replaces the ``xmldict_data_to_pb()``
+methods of all ``Convert*`` classes in ``clinvar_data.conversion.dict_to_pb`` by
+wrappers that count calls and measure wall time, so there is no overhead unless
+profiling is enabled.  The phases around the converters (XML parsing, normalization,
+serialization) are measured with ``section()``.
+
+For each name, the total time includes the time of nested converters and sections,
+the own time excludes it.  The own times of all entries add up to the overall time.
+"""
+
+import collections
+import contextlib
+import json
+import time
+import typing
+
+from tabulate import tabulate
+
+from clinvar_data.conversion import dict_to_pb
+
+#: Section for parsing the XML, excluding the handling of the parsed records.
+SECTION_XML_PARSE = "xml_parse"
+#: Section for normalizing the converted records.
+SECTION_NORMALIZATION = "normalization"
+#: Section for serializing and writing the records.
+SECTION_SERIALIZATION = "serialization"
+
+
+#: Context manager doing nothing, returned by ``null_section()``.
+_NULL_CONTEXT = contextlib.nullcontext()
+
+
+def null_section(name: str) -> typing.ContextManager[None]:
+    """Replacement for ``ConverterProfile.section()`` when not profiling."""
+    _ = name
+    return _NULL_CONTEXT
+
+
+class ProfileEntry(typing.NamedTuple):
+    """Profile of one converter or section."""
+
+    #: Name of converter class or section.
+    name: str
+    #: Number of calls.
+    calls: int
+    #: Wall time in seconds, including nested converters and sections.
+    total: float
+    #: Wall time in seconds, excluding nested converters and sections.
+    own: float
+
+
+class ConverterProfile:
+    """Call counts and wall times of converters and sections."""
+
+    def __init__(self):
+        #: Number of calls by name.
+        self.calls: typing.Counter[str] = collections.Counter()
+        #: Total time by name.
+        self.total: typing.DefaultDict[str, float] = collections.defaultdict(float)
+        #: Own time by name.
+        self.own: typing.DefaultDict[str, float] = collections.defaultdict(float)
+        #: Time of the nested calls, for each active call.
+        self._nested: list[float] = []
+
+    def _record(self, name: str, start: float):
+        elapsed = time.perf_counter() - start
+        nested = self._nested.pop()
+        self.calls[name] += 1
+        self.total[name] += elapsed
+        self.own[name] += elapsed - nested
+        if self._nested:
+            self._nested[-1] += elapsed
+
+    @contextlib.contextmanager
+    def section(self, name: str) -> typing.Iterator[None]:
+        """Measure the enclosed code as ``name``."""
+        start = time.perf_counter()
+        self._nested.append(0.0)
+        try:
+            yield
+        finally:
+            self._record(name, start)
+
+    def wrap(self, name: str, func: typing.Callable) -> typing.Callable:
+        """Return ``func`` wrapped to be measured as ``name``."""
+
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            self._nested.append(0.0)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._record(name, start)
+
+        return wrapper
+
+    @contextlib.contextmanager
+    def installed(self) -> typing.Iterator["ConverterProfile"]:
+        """Measure the ``xmldict_data_to_pb()`` methods of all converters in the context."""
+        originals = {}
+        for name, cls in vars(dict_to_pb).items():
+            method = vars(cls).get("xmldict_data_to_pb") if isinstance(cls, type) else None
+            if isinstance(method, classmethod):
+                originals[cls] = method
+                cls.xmldict_data_to_pb = classmethod(self.wrap(name, method.__func__))
+            elif isinstance(method, staticmethod):
+                originals[cls] = method
+                cls.xmldict_data_to_pb = staticmethod(self.wrap(name, method.__func__))
+        try:
+            yield self
+        finally:
+            for cls, method in originals.items():
+                cls.xmldict_data_to_pb = method
+
+    def entries(self) -> list[ProfileEntry]:
+        """Return the entries sorted by decreasing own time."""
+        return sorted(
+            (
+                ProfileEntry(name, self.calls[name], self.total[name], self.own[name])
+                for name in self.calls
+            ),
+            key=lambda entry: (-entry.own, entry.name),
+        )
+
+    def format_table(self) -> str:
+        """Return the entries as a table with the share of the overall time."""
+        entries = self.entries()
+        overall = sum(entry.own for entry in entries) or 1.0
+        return tabulate(
+            [
+                (
+                    entry.name,
+                    entry.calls,
+                    entry.total,
+                    entry.own,
+                    100 * entry.own / overall,
+                )
+                for entry in entries
+            ],
+            headers=["name", "calls", "total [s]", "own [s]", "own [%]"],
+            floatfmt=("", "", ".3f", ".3f", ".1f"),
+        )
+
+    def write_json(self, path: str):
+        """Write the entries to ``path`` as JSON."""
+        with open(path, "wt") as outputf:
+            json.dump([entry._asdict() for entry in self.entries()], outputf, indent=2)
+            print(file=outputf)
@@ -0,0 +1,39 @@
+"""Conversion of the date strings in the ClinVar XML to protobuf timestamps.
+
+Nearly all dates are ``YYYY-MM-DD`` strings from a small set of distinct values, so
+these are converted without ``dateutil`` and the results are memoized.  Dates
+without time zone are interpreted as UTC independent of the ``TZ`` environment
+variable, dates with time zone are converted to UTC.
+"""
+
+import datetime
+import functools
+import re
+
+import dateutil.parser
+import google.protobuf.timestamp_pb2
+
+#: Maximal number of memoized conversions.
+CACHE_SIZE = 1 << 16
+#: Dates in ``YYYY-MM-DD`` format.
+_RE_DATE = re.compile(r"(\d{4})-(\d{2})-(\d{2})")
+#: Proleptic Gregorian ordinal of the Unix epoch.
+_EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def parse_seconds(value: str) -> int:
+    """Return the seconds since the Unix epoch of the date (and time) ``value``."""
+    match = _RE_DATE.fullmatch(value)
+    if match:
+        date = datetime.date(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+        return (date.toordinal() - _EPOCH_ORDINAL) * 86400
+    parsed = dateutil.parser.parse(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return int((parsed - datetime.datetime(1970, 1, 1)).total_seconds())
+
+
+def to_timestamp(value: str) -> google.protobuf.timestamp_pb2.Timestamp:
+    """Convert the date (and time) ``value`` to a protobuf timestamp."""
+    return google.protobuf.timestamp_pb2.Timestamp(seconds=parse_seconds(value))
@@ -2,13 +2,12 @@
 
 import contextlib
 import gzip
-import json
 import os
 import typing
 
-from google.protobuf.json_format import MessageToJson, ParseDict
-import tqdm
-
+from clinvar_data import reports
+from clinvar_data.extract_vars_parquet import ParquetRecordWriter
+from clinvar_data.io import json_codec
 from clinvar_data.pbs.clinvar_public import Allele, ClassifiedRecord, VariationArchive
 from clinvar_data.pbs.clinvar_public_pb2 import (
     AggregateClassificationSet,
@@ -21,19 +20,33 @@ from clinvar_data.pbs.extracted_vars import (
     VersionedAccession,
 )
 
+#: Output format writing one JSON record per line.
+FORMAT_JSONL = "jsonl"
+#: Output format writing columnar Parquet files, see ``clinvar_data.extract_vars_parquet``.
+FORMAT_PARQUET = "parquet"
+#: The supported output formats.
+OUTPUT_FORMATS = (FORMAT_JSONL, FORMAT_PARQUET)
+
 
 class OutputFilesHandler:
     """Helper for creating output paths."""
 
-    def __init__(self, output_dir: str, gzip_output: bool):
+    def __init__(self, output_dir: str, gzip_output: bool, output_format: str = FORMAT_JSONL):
         #: Output directory.
         self.output_dir = output_dir
-        #: Whether to gzip output.
+        #: Whether to gzip output (JSONL only).
         self.gzip_output = gzip_output
+        #: Output format, one of ``OUTPUT_FORMATS``.
+        self.output_format = output_format
         #: File suffix.
-        self.suffix = "jsonl.gz" if self.gzip_output else "jsonl"
+        if output_format == FORMAT_PARQUET:
+            self.suffix = "parquet"
+        else:
+            self.suffix = "jsonl.gz" if self.gzip_output else "jsonl"
         #: Mapping of assembly and variant size to file.
-        self.files: typing.Dict[typing.Tuple[str, str], typing.TextIO] = {}
+        self.files: typing.Dict[
+            typing.Tuple[str, str], typing.Union[typing.TextIO, ParquetRecordWriter]
+        ] = {}
 
     def get_file(self, stack: contextlib.ExitStack, assembly: str, variant_size: str):
         key = (assembly, variant_size)
@@ -41,7 +54,9 @@ class OutputFilesHandler:
             file_path = os.path.join(
                 self.output_dir, f"clinvar-variants-{assembly}-{variant_size}.{self.suffix}"
             )
-            if self.gzip_output:
+            if self.output_format == FORMAT_PARQUET:
+                self.files[key] = ParquetRecordWriter(file_path)
+            elif self.gzip_output:
                 self.files[key] = gzip.open(file_path, "wt")
             else:
                 self.files[key] = open(file_path, "wt")
@@ -75,6 +90,85 @@ class ConvertVariationType:
         return cls.CONVERT.get(string_value.lower(), VariationType.VARIATION_TYPE_OTHER)
 
 
+#: Fields of the aggregate classifications not kept for extracted variants.
+AGGREGATE_CLASSIFICATION_DROPPED = ("xrefs", "citations", "history_records", "conditions")
+#: Nested fields of the aggregate classification set that are thinned out.
+AGGREGATE_CLASSIFICATION_SET_NESTED_DROPPED = {
+    "germline_classification": AGGREGATE_CLASSIFICATION_DROPPED,
+    "somatic_clinical_impact": AGGREGATE_CLASSIFICATION_DROPPED,
+    "oncogenicity_classification": AGGREGATE_CLASSIFICATION_DROPPED,
+}
+#: Fields of the clinical assertions not kept for extracted variants.
+CLINICAL_ASSERTION_DROPPED = (
+    "clinvar_submission_id",
+    "additional_submitters",
+    "record_status",
+    "attributes",
+    "observed_ins",
+    "simple_allele",
+    "haplotype",
+    "genotype",
+    "trait_set",
+    "citations",
+    "study_name",
+    "study_description",
+    "comments",
+    "submission_names",
+    "date_created",
+    "date_last_updated",
+    "submission_date",
+    "id",
+    "fda_recognized_database",
+)
+#: Nested fields of the clinical assertions that are thinned out, with the dropped fields.
+CLINICAL_ASSERTION_NESTED_DROPPED = {
+    "clinvar_accession": ("submitter_identifiers",),
+    "classifications": ("comments",),
+}
+
+
+def _copy_fields(
+    source: typing.Any,
+    target: typing.Any,
+    dropped: typing.Container[str],
+    nested_dropped: typing.Mapping[str, typing.Container[str]],
+):
+    """Copy the set fields of ``source`` to ``target`` except for ``dropped`` ones.
+
+    Unlike ``CopyFrom()`` followed by ``ClearField()``, this does not copy the (often
+    large) dropped sub-messages in the first place.
+    """
+    for field, value in source.ListFields():
+        name = field.name
+        if name in dropped:
+            continue
+        elif name in nested_dropped:
+            getattr(target, name).SetInParent()
+            _copy_fields(value, getattr(target, name), nested_dropped[name], {})
+        elif isinstance(value, (bool, int, float, str, bytes)):
+            setattr(target, name, value)
+        else:
+            # messages and repeated fields, still empty in ``target``
+            getattr(target, name).MergeFrom(value)
+
+
+def thin_out_aggregate_classification_set_into(
+    classifications: AggregateClassificationSet, target: AggregateClassificationSet
+):
+    """Copy the fields of ``classifications`` kept for extracted variants to empty ``target``."""
+    target.SetInParent()
+    _copy_fields(classifications, target, (), AGGREGATE_CLASSIFICATION_SET_NESTED_DROPPED)
+
+
+def thin_out_clinical_assertion_into(
+    clinical_assertion: ClinicalAssertion, target: ClinicalAssertion
+):
+    """Copy the fields of ``clinical_assertion`` kept for extracted variants to empty ``target``."""
+    _copy_fields(
+        clinical_assertion, target, CLINICAL_ASSERTION_DROPPED, CLINICAL_ASSERTION_NESTED_DROPPED
+    )
+
+
 def thin_out_aggregate_classification_set(
     classifications: AggregateClassificationSet | None,
 ) -> AggregateClassificationSet | None:
@@ -83,16 +177,7 @@ def thin_out_aggregate_classification_set(
         return None
     else:
         result = AggregateClassificationSet()
-        result.CopyFrom(classifications)
-        if result.HasField("germline_classification"):
-            for key in ("xrefs", "citations", "history_records", "conditions"):
-                result.germline_classification.ClearField(key)
-        if result.HasField("somatic_clinical_impact"):
-            for key in ("xrefs", "citations", "history_records", "conditions"):
-                result.somatic_clinical_impact.ClearField(key)
-        if result.HasField("oncogenicity_classification"):
-            for key in ("xrefs", "citations", "history_records", "conditions"):
-                result.oncogenicity_classification.ClearField(key)
+        thin_out_aggregate_classification_set_into(classifications, result)
         return result
 
 
@@ -102,124 +187,102 @@ def thin_out_clinical_assertions(
     result = []
     for clinical_assertion in clinical_assertions:
         entry = ClinicalAssertion()
-        entry.CopyFrom(clinical_assertion)
-        for key in (
-            "clinvar_submission_id",
-            "additional_submitters",
-            "record_status",
-            "attributes",
-            "observed_ins",
-            "simple_allele",
-            "haplotype",
-            "genotype",
-            "trait_set",
-            "citations",
-            "study_name",
-            "study_description",
-            "comments",
-            "submission_names",
-            "date_created",
-            "date_last_updated",
-            "submission_date",
-            "id",
-            "fda_recognized_database",
-        ):
-            entry.ClearField(key)
-        if entry.HasField("clinvar_accession"):
-            entry.clinvar_accession.ClearField("submitter_identifiers")
-        if entry.HasField("classifications"):
-            entry.classifications.ClearField("comments")
+        thin_out_clinical_assertion_into(clinical_assertion, entry)
         result.append(entry)
     return result
 
 
-def run(path_input: str, output_dir: str, gzip_output: bool):
-    """Execute the variant extraction."""
-    os.makedirs(output_dir, exist_ok=True)
+class ExtractVarsAccumulator(reports.Accumulator):
+    """Write the extracted variants to files by assembly and variant size."""
 
-    if path_input.endswith(".gz"):
-        inputf = gzip.open(path_input, "rt")
-    else:
-        inputf = open(path_input, "rt")
+    def __init__(self, output_dir: str, gzip_output: bool, output_format: str = FORMAT_JSONL):
+        os.makedirs(output_dir, exist_ok=True)
+        #: Output files, created on first use.
+        self.output_files = OutputFilesHandler(output_dir, gzip_output, output_format)
+        #: Stack for closing the output files.
+        self.stack = contextlib.ExitStack()
 
-    output_files = OutputFilesHandler(output_dir, gzip_output)
+    def add(self, variation_archive: VariationArchive):  # noqa: C901
+        if not variation_archive.HasField("classified_record"):
+            return
+        classified_record: ClassifiedRecord = variation_archive.classified_record
+        if not variation_archive.classified_record.HasField("simple_allele"):
+            return
+        simple_allele: Allele = classified_record.simple_allele
 
-    with inputf, contextlib.ExitStack() as stack:
-        for line in tqdm.tqdm(inputf, desc="processing", unit=" JSONL records"):
-            line_json = json.loads(line)
-            variation_archive: VariationArchive = ParseDict(
-                js_dict=line_json, message=VariationArchive()
+        name: str = variation_archive.variation_name
+        variation_type: VariationType.ValueType = ConvertVariationType.from_string_value(
+            variation_archive.variation_type
+        )
+        accession: VersionedAccession = VersionedAccession(
+            accession=variation_archive.accession,
+            version=variation_archive.version,
+        )
+        rcvs: list[ExtractedRcvRecord] = [
+            ExtractedRcvRecord(
+                accession=VersionedAccession(
+                    accession=rcva.accession,
+                    version=rcva.version,
+                ),
+                title=rcva.title,
+                classifications=rcva.rcv_classifications,
             )
+            for rcva in classified_record.rcv_list.rcv_accessions
+        ]
+        hgnc_ids: list[str] = [
+            gene.hgnc_id
+            for gene in classified_record.simple_allele.genes
+            if gene.HasField("hgnc_id")
+        ]
+        if variation_type == VariationType.VARIATION_TYPE_OTHER:
+            return
+        # The thinned out data is built once per VCV and shared by the records of all
+        # sequence locations; only the sequence location is replaced before writing.
+        record = ExtractedVcvRecord(
+            accession=accession,
+            rcvs=rcvs,
+            name=name,
+            variation_type=variation_type,
+            hgnc_ids=hgnc_ids,
+        )
+        thin_out_aggregate_classification_set_into(
+            classified_record.classifications, record.classifications
+        )
+        for clinical_assertion in classified_record.clinical_assertions:
+            thin_out_clinical_assertion_into(clinical_assertion, record.clinical_assertions.add())
+        for location in simple_allele.locations or []:
+            for sequence_location in location.sequence_locations or []:
+                if sequence_location.assembly.lower() == "ncbi36":
+                    continue
+                record.sequence_location.CopyFrom(sequence_location)
 
-            if not variation_archive.HasField("classified_record"):
-                continue
-            classified_record: ClassifiedRecord = variation_archive.classified_record
-            if not variation_archive.classified_record.HasField("simple_allele"):
-                continue
-            simple_allele: Allele = classified_record.simple_allele
+                if (
+                    sequence_location.HasField("reference_allele")
+                    and len(sequence_location.reference_allele) < 50
+                    and sequence_location.HasField("alternate_allele")
+                    and len(sequence_location.alternate_allele) < 50
+                ) or (
+                    sequence_location.HasField("reference_allele_vcf")
+                    and len(sequence_location.reference_allele_vcf) < 50
+                    and sequence_location.HasField("alternate_allele_vcf")
+                    and len(sequence_location.alternate_allele_vcf) < 50
+                ):
+                    variant_size = "seqvars"
+                else:
+                    variant_size = "strucvars"
 
-            name: str = variation_archive.variation_name
-            variation_type: VariationType.ValueType = ConvertVariationType.from_string_value(
-                variation_archive.variation_type
-            )
-            accession: VersionedAccession = VersionedAccession(
-                accession=variation_archive.accession,
-                version=variation_archive.version,
-            )
-            rcvs: list[ExtractedRcvRecord] = [
-                ExtractedRcvRecord(
-                    accession=VersionedAccession(
-                        accession=rcva.accession,
-                        version=rcva.version,
-                    ),
-                    title=rcva.title,
-                    classifications=rcva.rcv_classifications,
+                dest = self.output_files.get_file(
+                    self.stack, sequence_location.assembly.lower(), variant_size
                 )
-                for rcva in classified_record.rcv_list.rcv_accessions
-            ]
-            hgnc_ids: list[str] = [
-                gene.hgnc_id
-                for gene in classified_record.simple_allele.genes
-                if gene.HasField("hgnc_id")
-            ]
-            for location in simple_allele.locations or []:
-                for sequence_location in location.sequence_locations or []:
-                    record = ExtractedVcvRecord(
-                        accession=accession,
-                        rcvs=rcvs,
-                        name=name,
-                        variation_type=variation_type,
-                        classifications=(
-                            thin_out_aggregate_classification_set(classified_record.classifications)
-                        ),
-                        clinical_assertions=(
-                            thin_out_clinical_assertions(classified_record.clinical_assertions)
-                        ),
-                        sequence_location=sequence_location,
-                        hgnc_ids=hgnc_ids,
-                    )
-
-                    if record.variation_type == VariationType.VARIATION_TYPE_OTHER:
-                        continue
-                    if sequence_location.assembly.lower() == "ncbi36":
-                        continue
-
-                    if (
-                        sequence_location.HasField("reference_allele")
-                        and len(sequence_location.reference_allele) < 50
-                        and sequence_location.HasField("alternate_allele")
-                        and len(sequence_location.alternate_allele) < 50
-                    ) or (
-                        sequence_location.HasField("reference_allele_vcf")
-                        and len(sequence_location.reference_allele_vcf) < 50
-                        and sequence_location.HasField("alternate_allele_vcf")
-                        and len(sequence_location.alternate_allele_vcf) < 50
-                    ):
-                        variant_size = "seqvars"
-                    else:
-                        variant_size = "strucvars"
-
-                    dest = output_files.get_file(
-                        stack, sequence_location.assembly.lower(), variant_size
-                    )
-                    print(MessageToJson(record, indent=None), file=dest)
+                if isinstance(dest, ParquetRecordWriter):
+                    dest.write(record)
+                else:
+                    print(json_codec.dumps(record), file=dest)
+
+    def close(self):
+        self.stack.close()
+
+
+def run(path_input: str, output_dir: str, gzip_output: bool, output_format: str = FORMAT_JSONL):
+    """Execute the variant extraction."""
+    reports.run(path_input, [ExtractVarsAccumulator(output_dir, gzip_output, output_format)])
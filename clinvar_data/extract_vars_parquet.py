@@ -0,0 +1,255 @@
+"""Columnar Parquet output of extracted variants.
+
+``ExtractedVcvRecord`` messages are flattened into typed columns: one column per field
+of the sequence location and of the aggregate classifications, and lists of structs
+for the RCV summaries and the thinned clinical assertions.  Repetitive strings such
+as assemblies, review statuses, and classifications are dictionary-encoded.  Records
+are buffered column-wise and written in record batches of ``BATCH_SIZE`` rows, one
+Parquet row group each, such that memory use stays bounded and readers can skip row
+groups based on their statistics.
+
+The optional ``pyarrow`` package is needed for writing (extra ``parquet``).
+"""
+
+import typing
+
+from clinvar_data.classifications import scv_classification
+from clinvar_data.pbs.clinvar_public import (
+    AggregateGermlineReviewStatus,
+    AggregateOncogenicityReviewStatus,
+    AggregateSomaticClinicalImpactReviewStatus,
+    Chromosome,
+    SubmitterReviewStatus,
+)
+from clinvar_data.pbs.clinvar_public_pb2 import Assertion
+from clinvar_data.pbs.extracted_vars import ExtractedVcvRecord, VariationType
+
+#: Number of rows per record batch (and row group).
+BATCH_SIZE = 10_000
+#: Compression of the Parquet files.
+COMPRESSION = "zstd"
+
+#: Integer fields of the sequence location, written with the same name.
+LOCATION_INT_FIELDS = (
+    "outer_start",
+    "inner_start",
+    "start",
+    "stop",
+    "inner_stop",
+    "outer_stop",
+    "display_start",
+    "display_stop",
+    "variant_length",
+    "position_vcf",
+)
+#: String fields of the sequence location, written with the same name.
+LOCATION_STR_FIELDS = (
+    "reference_allele",
+    "alternate_allele",
+    "reference_allele_vcf",
+    "alternate_allele_vcf",
+)
+#: Aggregate classifications with column prefix, field name, and review status enum.
+CLASSIFICATIONS: tuple[tuple[str, str, typing.Any], ...] = (
+    ("germline", "germline_classification", AggregateGermlineReviewStatus),
+    (
+        "somatic_clinical_impact",
+        "somatic_clinical_impact",
+        AggregateSomaticClinicalImpactReviewStatus,
+    ),
+    ("oncogenicity", "oncogenicity_classification", AggregateOncogenicityReviewStatus),
+)
+
+
+def _pyarrow() -> tuple[typing.Any, typing.Any]:
+    """Import and return the optional ``pyarrow`` and ``pyarrow.parquet`` modules."""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:  # pragma: no cover
+        raise ImportError(
+            "The pyarrow package is needed for writing Parquet files, "
+            "install it with: pip install 'clinvar-this[parquet]'"
+        ) from e
+    return pyarrow, pyarrow.parquet
+
+
+def schema() -> typing.Any:
+    """Return the ``pyarrow.Schema`` of the Parquet files."""
+    pa, _ = _pyarrow()
+    dict_str = pa.dictionary(pa.int32(), pa.string())
+    timestamp = pa.timestamp("ms", tz="UTC")
+    fields = [
+        ("accession", pa.string()),
+        ("version", pa.int32()),
+        ("name", pa.string()),
+        ("variation_type", dict_str),
+        ("assembly", dict_str),
+        ("chrom", dict_str),
+        ("sequence_accession", dict_str),
+    ]
+    fields += [(name, pa.uint32()) for name in LOCATION_INT_FIELDS]
+    fields += [(name, pa.string()) for name in LOCATION_STR_FIELDS]
+    fields.append(("hgnc_ids", pa.list_(dict_str)))
+    for prefix, _, _ in CLASSIFICATIONS:
+        fields += [
+            (f"{prefix}_classification", dict_str),
+            (f"{prefix}_review_status", dict_str),
+            (f"{prefix}_date_last_evaluated", timestamp),
+        ]
+    fields.append(
+        (
+            "rcvs",
+            pa.list_(
+                pa.struct(
+                    [
+                        ("accession", pa.string()),
+                        ("version", pa.int32()),
+                        ("title", pa.string()),
+                        ("germline_classification", dict_str),
+                        ("germline_review_status", dict_str),
+                        ("oncogenicity_classification", dict_str),
+                        ("oncogenicity_review_status", dict_str),
+                    ]
+                )
+            ),
+        )
+    )
+    fields.append(
+        (
+            "clinical_assertions",
+            pa.list_(
+                pa.struct(
+                    [
+                        ("accession", pa.string()),
+                        ("version", pa.int32()),
+                        ("assertion", dict_str),
+                        ("classification", dict_str),
+                        ("review_status", dict_str),
+                        ("date_last_evaluated", timestamp),
+                    ]
+                )
+            ),
+        )
+    )
+    return pa.schema(fields)
+
+
+def _optional(message: typing.Any, field: str) -> typing.Any:
+    return getattr(message, field) if message.HasField(field) else None
+
+
+def _millis(message: typing.Any, field: str) -> typing.Optional[int]:
+    # Parquet has no timestamps with seconds resolution
+    return getattr(message, field).seconds * 1000 if message.HasField(field) else None
+
+
+def record_row(record: ExtractedVcvRecord) -> dict[str, typing.Any]:
+    """Flatten ``record`` into a row with the columns of ``schema()``."""
+    location = record.sequence_location
+    row: dict[str, typing.Any] = {
+        "accession": record.accession.accession,
+        "version": record.accession.version,
+        "name": record.name,
+        "variation_type": VariationType.Name(record.variation_type),
+        "assembly": location.assembly,
+        "chrom": (
+            Chromosome.Name(location.chr)[len("CHROMOSOME_") :]
+            if location.chr != Chromosome.CHROMOSOME_UNSPECIFIED
+            else None
+        ),
+        "sequence_accession": _optional(location, "accession"),
+    }
+    for name in LOCATION_INT_FIELDS + LOCATION_STR_FIELDS:
+        row[name] = _optional(location, name)
+    row["hgnc_ids"] = list(record.hgnc_ids)
+    for prefix, field, review_status_enum in CLASSIFICATIONS:
+        if record.classifications.HasField(field):
+            classification = getattr(record.classifications, field)
+            row[f"{prefix}_classification"] = _optional(classification, "description")
+            row[f"{prefix}_review_status"] = review_status_enum.Name(classification.review_status)
+            row[f"{prefix}_date_last_evaluated"] = _millis(classification, "date_last_evaluated")
+        else:
+            row[f"{prefix}_classification"] = None
+            row[f"{prefix}_review_status"] = None
+            row[f"{prefix}_date_last_evaluated"] = None
+    row["rcvs"] = []
+    for rcv in record.rcvs:
+        rcv_row = {
+            "accession": rcv.accession.accession,
+            "version": rcv.accession.version,
+            "title": rcv.title,
+        }
+        for prefix, field, review_status_enum in (
+            ("germline", "germline_classification", AggregateGermlineReviewStatus),
+            ("oncogenicity", "oncogenicity_classification", AggregateOncogenicityReviewStatus),
+        ):
+            if rcv.classifications.HasField(field):
+                classification = getattr(rcv.classifications, field)
+                rcv_row[f"{prefix}_classification"] = classification.description.value
+                rcv_row[f"{prefix}_review_status"] = review_status_enum.Name(
+                    classification.review_status
+                )
+            else:
+                rcv_row[f"{prefix}_classification"] = None
+                rcv_row[f"{prefix}_review_status"] = None
+        row["rcvs"].append(rcv_row)
+    row["clinical_assertions"] = [
+        {
+            "accession": assertion.clinvar_accession.accession,
+            "version": assertion.clinvar_accession.version,
+            "assertion": Assertion.Name(assertion.assertion),
+            "classification": scv_classification(assertion),
+            "review_status": SubmitterReviewStatus.Name(assertion.classifications.review_status),
+            "date_last_evaluated": _millis(assertion.classifications, "date_last_evaluated"),
+        }
+        for assertion in record.clinical_assertions
+    ]
+    return row
+
+
+class ParquetRecordWriter:
+    """Write ``ExtractedVcvRecord`` messages to a Parquet file in record batches."""
+
+    def __init__(self, path: str, batch_size: int = BATCH_SIZE):
+        pa, pq = _pyarrow()
+        #: The ``pyarrow`` module.
+        self.pa = pa
+        #: Schema of the output.
+        self.schema = schema()
+        #: Number of rows per record batch.
+        self.batch_size = batch_size
+        #: Buffered rows by column.
+        self.columns: dict[str, list] = {name: [] for name in self.schema.names}
+        #: Number of buffered rows.
+        self.buffered = 0
+        #: The underlying Parquet writer.
+        self.writer = pq.ParquetWriter(path, self.schema, compression=COMPRESSION)
+
+    def write(self, record: ExtractedVcvRecord):
+        """Buffer ``record``, writing a record batch when ``batch_size`` rows are buffered."""
+        for name, value in record_row(record).items():
+            self.columns[name].append(value)
+        self.buffered += 1
+        if self.buffered >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Write the buffered rows as one record batch."""
+        if not self.buffered:
+            return
+        batch = self.pa.RecordBatch.from_pydict(self.columns, schema=self.schema)
+        self.writer.write_batch(batch)
+        self.columns = {name: [] for name in self.schema.names}
+        self.buffered = 0
+
+    def close(self):
+        """Flush and close the file."""
+        self.flush()
+        self.writer.close()
+
+    def __enter__(self) -> "ParquetRecordWriter":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -1,13 +1,13 @@
 """Generate a report for each gene with variant count per impact and pathogenicity"""
 
 import gzip
-import json
 import sys
 import typing
 
-from google.protobuf.json_format import MessageToDict, ParseDict
-import tqdm
+import numpy as np
 
+from clinvar_data import reports
+from clinvar_data.io import json_codec
 from clinvar_data.pbs.clinvar_public_pb2 import VariationArchive
 from clinvar_data.pbs.gene_impact import (
     ClinicalSignificance,
@@ -82,6 +82,24 @@ KeyImpactSig = typing.Tuple[GeneImpact.ValueType, ClinicalSignificance.ValueType
 #: Counter dictionary.
 PerGeneCounter = typing.Dict[KeyImpactSig, int]
 
+#: Number of gene impact values, the enum values are used as indices.
+NUM_IMPACTS = len(GeneImpact.DESCRIPTOR.values)
+#: Number of clinical significance values, the enum values are used as indices.
+NUM_SIGNIFICANCES = len(ClinicalSignificance.DESCRIPTOR.values)
+#: Number of buffered increments after which they are added to the counts.
+FLUSH_INTERVAL = 100_000
+#: Columns of ``GeneImpactCounts.ImpactCounts`` by clinical significance.
+COUNT_FIELDS = (
+    (ClinicalSignificance.CLINICAL_SIGNIFICANCE_BENIGN, "count_benign"),
+    (ClinicalSignificance.CLINICAL_SIGNIFICANCE_LIKELY_BENIGN, "count_likely_benign"),
+    (
+        ClinicalSignificance.CLINICAL_SIGNIFICANCE_UNCERTAIN_SIGNIFICANCE,
+        "count_uncertain_significance",
+    ),
+    (ClinicalSignificance.CLINICAL_SIGNIFICANCE_LIKELY_PATHOGENIC, "count_likely_pathogenic"),
+    (ClinicalSignificance.CLINICAL_SIGNIFICANCE_PATHOGENIC, "count_pathogenic"),
+)
+
 
 def zero_counts() -> PerGeneCounter:
     """Returns counter from gene impact and clinical significance to zero count."""
@@ -92,135 +110,259 @@ def zero_counts() -> PerGeneCounter:
     }
 
 
+class GeneImpactCounter:
+    """Counts per gene, impact, and clinical significance in a NumPy array.
+
+    HGNC IDs are mapped to rows of ``counts`` with the shape (genes, impacts,
+    significances) in order of appearance.  Increments are buffered as flat indices
+    and added in bulk by ``flush()``.  Merging partial counts adds whole rows.
+    """
+
+    def __init__(self):
+        #: HGNC IDs in order of their rows.
+        self.hgnc_ids: list[str] = []
+        #: Row by HGNC ID.
+        self.rows: dict[str, int] = {}
+        #: The counts, rows beyond ``len(hgnc_ids)`` are unused capacity.
+        self.counts = np.zeros((0, NUM_IMPACTS, NUM_SIGNIFICANCES), dtype=np.int64)
+        #: Buffered increments as flat indices into ``counts``.
+        self.pending: list[int] = []
+
+    def _row(self, hgnc_id: str) -> int:
+        row = self.rows.get(hgnc_id)
+        if row is None:
+            row = self.rows[hgnc_id] = len(self.hgnc_ids)
+            self.hgnc_ids.append(hgnc_id)
+        return row
+
+    def add(
+        self,
+        hgnc_id: str,
+        impact: GeneImpact.ValueType,
+        significance: ClinicalSignificance.ValueType,
+    ):
+        """Increment the count of ``impact`` and ``significance`` for ``hgnc_id``."""
+        self.pending.append(
+            (self._row(hgnc_id) * NUM_IMPACTS + impact) * NUM_SIGNIFICANCES + significance
+        )
+        if len(self.pending) >= FLUSH_INTERVAL:
+            self.flush()
+
+    def _reserve(self):
+        """Grow ``counts`` to hold a row for each HGNC ID."""
+        if len(self.hgnc_ids) > self.counts.shape[0]:
+            grown = np.zeros(
+                (max(len(self.hgnc_ids), 2 * self.counts.shape[0]), NUM_IMPACTS, NUM_SIGNIFICANCES),
+                dtype=np.int64,
+            )
+            grown[: self.counts.shape[0]] = self.counts
+            self.counts = grown
+
+    def flush(self):
+        """Add the buffered increments to ``counts``."""
+        self._reserve()
+        if not self.pending:
+            return
+        used = self.counts[: len(self.hgnc_ids)]
+        used += np.bincount(self.pending, minlength=used.size).reshape(used.shape)
+        self.pending = []
+
+    def merge(self, other: "GeneImpactCounter"):
+        """Add the counts of ``other``."""
+        other.flush()
+        rows = np.array([self._row(hgnc_id) for hgnc_id in other.hgnc_ids], dtype=np.int64)
+        self.flush()
+        # the rows are distinct, so fancy indexing adds each one once
+        self.counts[rows] += other.counts[: len(other.hgnc_ids)]
+
+    def to_dict(self) -> typing.Dict[str, PerGeneCounter]:
+        """Return the counts of the canonical clinical significances by HGNC ID."""
+        self.flush()
+        result = {}
+        for hgnc_id, gene_counts in zip(self.hgnc_ids, self.counts):
+            counts = zero_counts()
+            for impact, significance in counts:
+                counts[(impact, significance)] = int(gene_counts[impact, significance])
+            result[hgnc_id] = counts
+        return result
+
+    @classmethod
+    def from_dict(cls, counters: typing.Dict[str, PerGeneCounter]) -> "GeneImpactCounter":
+        """Create from counts by HGNC ID as returned by ``to_dict()``."""
+        result = cls()
+        for hgnc_id, counts in counters.items():
+            result._row(hgnc_id)
+            result.flush()
+            for (impact, significance), count in counts.items():
+                result.counts[result.rows[hgnc_id], impact, significance] += count
+        return result
+
+    def save_npz(self, path: str):
+        """Write the counts with HGNC IDs and the enum value names to an ``.npz`` file."""
+        self.flush()
+        np.savez_compressed(
+            path,
+            hgnc_ids=np.array(self.hgnc_ids, dtype=str),
+            counts=self.counts[: len(self.hgnc_ids)],
+            impacts=np.array([v.name for v in GeneImpact.DESCRIPTOR.values], dtype=str),
+            significances=np.array(
+                [v.name for v in ClinicalSignificance.DESCRIPTOR.values], dtype=str
+            ),
+        )
+
+    @classmethod
+    def load_npz(cls, path: str) -> "GeneImpactCounter":
+        """Read counts written by ``save_npz()``."""
+        result = cls()
+        with np.load(path) as data:
+            result.hgnc_ids = [str(hgnc_id) for hgnc_id in data["hgnc_ids"]]
+            result.counts = data["counts"]
+        result.rows = {hgnc_id: row for row, hgnc_id in enumerate(result.hgnc_ids)}
+        return result
+
+    def __getstate__(self):
+        # partial counts are pickled for merging after parallel processing
+        self.flush()
+        return self.__dict__
+
+
 def write_report(
-    counters: typing.Dict[str, PerGeneCounter],
+    counters: typing.Union[GeneImpactCounter, typing.Dict[str, PerGeneCounter]],
     path_output: str,
 ):
-    """Write report to output."""
+    """Write report to output, JSONL (optionally gzipped) or NPZ depending on suffix."""
+    if isinstance(counters, dict):
+        counters = GeneImpactCounter.from_dict(counters)
+    if path_output.endswith(".npz"):
+        counters.save_npz(path_output)
+        return
+    counters.flush()
 
     if path_output.endswith(".gz"):
         outputf = gzip.open(path_output, "wt")
     else:
         outputf = open(path_output, "wt")
 
+    canonical = list(CANONICAL_CLINSIG)
     with outputf:
-        for hgnc_id, counts in sorted(counters.items(), key=lambda x: int(x[0][5:])):
+        for hgnc_id in sorted(counters.hgnc_ids, key=lambda hgnc_id: int(hgnc_id[5:])):
+            gene_counts = counters.counts[counters.rows[hgnc_id]]
             record = GeneImpactCounts(hgnc_id=hgnc_id)
-            for v in GeneImpact.DESCRIPTOR.values:
-                if any([counts[(v.number, sig)] for sig in CANONICAL_CLINSIG]):
-                    record.impact_counts.append(
-                        GeneImpactCounts.ImpactCounts(
-                            gene_impact=v.number,
-                            count_benign=counts[
-                                (v.number, ClinicalSignificance.CLINICAL_SIGNIFICANCE_BENIGN)
-                            ],
-                            count_likely_benign=counts[
-                                (v.number, ClinicalSignificance.CLINICAL_SIGNIFICANCE_LIKELY_BENIGN)
-                            ],
-                            count_uncertain_significance=counts[
-                                (
-                                    v.number,
-                                    ClinicalSignificance.CLINICAL_SIGNIFICANCE_UNCERTAIN_SIGNIFICANCE,
-                                )
-                            ],
-                            count_likely_pathogenic=counts[
-                                (
-                                    v.number,
-                                    ClinicalSignificance.CLINICAL_SIGNIFICANCE_LIKELY_PATHOGENIC,
-                                )
-                            ],
-                            count_pathogenic=counts[
-                                (v.number, ClinicalSignificance.CLINICAL_SIGNIFICANCE_PATHOGENIC)
-                            ],
-                        )
+            for impact in np.flatnonzero(gene_counts[:, canonical].any(axis=1)):
+                record.impact_counts.append(
+                    GeneImpactCounts.ImpactCounts(
+                        gene_impact=int(impact),
+                        **{
+                            field: int(gene_counts[impact, significance])
+                            for significance, field in COUNT_FIELDS
+                        },
                     )
-            print(json.dumps(MessageToDict(record)), file=outputf)
-
-
-def generate_counts(path_input: str) -> dict:  # noqa: C901
-    """Count occurrences of each impact for each gene."""
-    counts: dict[str, dict[KeyImpactSig, int]] = {}
-
-    if path_input.endswith(".gz"):
-        inputf = gzip.open(path_input, "rt")
-    else:
-        inputf = open(path_input, "rt")
-
-    with inputf:
-        for line in tqdm.tqdm(inputf, desc="processing", unit=" JSONL records"):
-            line_json = json.loads(line)
-            va: VariationArchive = ParseDict(line_json, message=VariationArchive())
-
-            # Obtain variant name, will start with submitted transcript.
-            if not va.HasField("classified_record"):
-                continue
-            elif not va.classified_record.HasField("simple_allele"):
-                continue
-            variant_name: str = va.classified_record.simple_allele.name
-
-            # Obtain germline classification description or skip record if has none.
-            if not va.classified_record.HasField("classifications"):
-                continue
-            elif not va.classified_record.classifications.HasField("germline_classification"):
-                continue
-            elif not va.classified_record.classifications.germline_classification.HasField(
-                "description"
-            ):
-                continue
-            else:
-                description: str = (
-                    va.classified_record.classifications.germline_classification.description
-                )
-                pathogenicity: ClinicalSignificance.ValueType = (
-                    ConvertClinicalSignificance.from_str(description)
                 )
-
-            # Obtain molecular consequence on transcript of variant name, skip if none.
-            if not va.classified_record.simple_allele.hgvs_expressions:
-                continue
-            else:
-                csq: str | None = None
-                for expression in va.classified_record.simple_allele.hgvs_expressions:
-                    if expression.HasField(
-                        "nucleotide_expression"
-                    ) and expression.nucleotide_expression.HasField("sequence_accession"):
-                        sequence_accession: str = (
-                            expression.nucleotide_expression.sequence_accession
-                        )
-                        if variant_name.startswith(sequence_accession):
-                            for molecular_consequences in expression.molecular_consequences:
-                                if molecular_consequences.type in ConvertGeneImpact.CONVERT:
-                                    csq = molecular_consequences.type
-                if not csq:
-                    print(
-                        f"Skipping variant {variant_name} due to no molecular consequence",
-                        file=sys.stderr,
-                    )
-                    continue
-
-            # Obtain gene HGNC ID
-            hgnc_id: str | None = None
-            for gene in va.classified_record.simple_allele.genes:
-                if not gene.HasField("hgnc_id"):
-                    continue
-                else:
-                    hgnc_id = gene.hgnc_id
-                    break
-            if not hgnc_id:
+            print(json_codec.dumps(record), file=outputf)
+
+
+class GeneImpactAccumulator(reports.Accumulator):
+    """Count occurrences of each impact for each gene; write report in ``finish()``."""
+
+    mergeable = True
+    fields = (
+        "classified_record.classifications.germline_classification.description",
+        "classified_record.simple_allele.name",
+        "classified_record.simple_allele.hgvs_expressions.nucleotide_expression.sequence_accession",
+        "classified_record.simple_allele.hgvs_expressions.molecular_consequences.type",
+        "classified_record.simple_allele.genes.hgnc_id",
+    )
+
+    def __init__(self, path_output: typing.Optional[str] = None):
+        #: Path to write the report to, if any.
+        self.path_output = path_output
+        #: The counts.
+        self.counter = GeneImpactCounter()
+
+    @property
+    def counts(self) -> typing.Dict[str, PerGeneCounter]:
+        """Counters by HGNC ID."""
+        return self.counter.to_dict()
+
+    def add(self, va: VariationArchive):  # noqa: C901
+        # Obtain variant name, will start with submitted transcript.
+        if not va.HasField("classified_record"):
+            return
+        elif not va.classified_record.HasField("simple_allele"):
+            return
+        variant_name: str = va.classified_record.simple_allele.name
+
+        # Obtain germline classification description or skip record if has none.
+        if not va.classified_record.HasField("classifications"):
+            return
+        elif not va.classified_record.classifications.HasField("germline_classification"):
+            return
+        elif not va.classified_record.classifications.germline_classification.HasField(
+            "description"
+        ):
+            return
+        else:
+            description: str = (
+                va.classified_record.classifications.germline_classification.description
+            )
+            pathogenicity: ClinicalSignificance.ValueType = ConvertClinicalSignificance.from_str(
+                description
+            )
+
+        # Obtain molecular consequence on transcript of variant name, skip if none.
+        if not va.classified_record.simple_allele.hgvs_expressions:
+            return
+        else:
+            csq: str | None = None
+            for expression in va.classified_record.simple_allele.hgvs_expressions:
+                if expression.HasField(
+                    "nucleotide_expression"
+                ) and expression.nucleotide_expression.HasField("sequence_accession"):
+                    sequence_accession: str = expression.nucleotide_expression.sequence_accession
+                    if variant_name.startswith(sequence_accession):
+                        for molecular_consequences in expression.molecular_consequences:
+                            if molecular_consequences.type in ConvertGeneImpact.CONVERT:
+                                csq = molecular_consequences.type
+            if not csq:
                 print(
-                    f"Skipping variant {variant_name} due to no HGNC ID",
+                    f"Skipping variant {variant_name} due to no molecular consequence",
                     file=sys.stderr,
                 )
+                return
+
+        # Obtain gene HGNC ID
+        hgnc_id: str | None = None
+        for gene in va.classified_record.simple_allele.genes:
+            if not gene.HasField("hgnc_id"):
                 continue
+            else:
+                hgnc_id = gene.hgnc_id
+                break
+        if not hgnc_id:
+            print(
+                f"Skipping variant {variant_name} due to no HGNC ID",
+                file=sys.stderr,
+            )
+            return
 
-            if hgnc_id not in counts:
-                counts[hgnc_id] = zero_counts()
+        self.counter.add(hgnc_id, ConvertGeneImpact.from_str(csq), pathogenicity)
 
-            counts[hgnc_id][(ConvertGeneImpact.from_str(csq), pathogenicity)] += 1
-    return counts
+    def merge(self, other: reports.Accumulator):
+        assert isinstance(other, GeneImpactAccumulator)
+        self.counter.merge(other.counter)
+
+    def finish(self):
+        if self.path_output is not None:
+            write_report(self.counter, self.path_output)
+
+
+def generate_counts(path_input: str, processes: int = 1) -> dict:
+    """Count occurrences of each impact for each gene."""
+    accumulator = GeneImpactAccumulator()
+    reports.run(path_input, [accumulator], processes=processes)
+    return accumulator.counts
 
 
-def run_report(path_input: str, path_output: str):
+def run_report(path_input: str, path_output: str, processes: int = 1):
     """Generate the report from the given input to output path."""
-    counts = generate_counts(path_input)
-    write_report(counts, path_output)
+    reports.run(path_input, [GeneImpactAccumulator(path_output)], processes=processes)
@@ -0,0 +1 @@
+"""Reading and writing of converted ClinVar records"""
@@ -0,0 +1,206 @@
+"""Reading and writing of BGZF (blocked gzip) files.
+
+BGZF files are concatenations of gzip members of at most 64kb each whose compressed
+size is stored in the ``BC`` extra field.  This allows to jump to block starts and
+to decompress parts of the file independently of each other.  Positions in the
+uncompressed stream are given as virtual offsets ``block_offset << 16 | within_block``.
+"""
+
+import io
+import struct
+import typing
+import zlib
+
+#: Magic bytes of a gzip member with the ``FEXTRA`` flag set.
+MAGIC = b"\x1f\x8b\x08\x04"
+#: Length of the fixed part of the gzip header (up to and including ``XLEN``).
+HEADER_LEN = 12
+#: Maximal number of uncompressed bytes per block (same as htslib).
+BLOCK_DATA_SIZE = 0xFF00
+#: Empty block that marks the end of a BGZF file.
+EOF_BLOCK = bytes.fromhex("1f8b08040000000000ff0600424302001b0003000000000000000000")
+
+
+def is_bgzf(path: str) -> bool:
+    """Return whether the file at ``path`` starts with a BGZF block."""
+    with open(path, "rb") as inputf:
+        header = inputf.read(HEADER_LEN)
+        if len(header) < HEADER_LEN or not header.startswith(MAGIC):
+            return False
+        (xlen,) = struct.unpack("<H", header[10:12])
+        return _block_size(inputf.read(xlen)) is not None
+
+
+def _block_size(extra: bytes) -> typing.Optional[int]:
+    """Return the total block size from the ``BC`` subfield of ``extra``, if any."""
+    pos = 0
+    while pos + 4 <= len(extra):
+        si1, si2, slen = (
+            extra[pos],
+            extra[pos + 1],
+            struct.unpack("<H", extra[pos + 2 : pos + 4])[0],
+        )
+        if si1 == 66 and si2 == 67 and slen == 2:
+            return struct.unpack("<H", extra[pos + 4 : pos + 6])[0] + 1
+        pos += 4 + slen
+    return None
+
+
+def _read_block(inputf: typing.BinaryIO) -> typing.Optional[tuple[bytes, bytes]]:
+    """Read the next block and return its header and the rest; ``None`` at EOF."""
+    header = inputf.read(HEADER_LEN)
+    if not header:
+        return None
+    if len(header) < HEADER_LEN or not header.startswith(MAGIC):
+        raise ValueError("Not a BGZF block")
+    (xlen,) = struct.unpack("<H", header[10:12])
+    extra = inputf.read(xlen)
+    block_size = _block_size(extra)
+    if block_size is None:
+        raise ValueError("BGZF block without BC field")
+    rest = inputf.read(block_size - HEADER_LEN - xlen)
+    if len(rest) != block_size - HEADER_LEN - xlen:
+        raise EOFError("Truncated BGZF block")
+    return header + extra, rest
+
+
+def iter_block_offsets(inputf: typing.BinaryIO) -> typing.Iterator[int]:
+    """Yield the file offsets of all blocks without decompressing them."""
+    while True:
+        offset = inputf.tell()
+        block = _read_block(inputf)
+        if block is None:
+            return
+        yield offset
+
+
+def iter_blocks(inputf: typing.BinaryIO) -> typing.Iterator[tuple[int, bytes]]:
+    """Yield ``(offset, data)`` with the decompressed data of each block from the current position."""
+    while True:
+        offset = inputf.tell()
+        block = _read_block(inputf)
+        if block is None:
+            return
+        # the last 8 bytes are CRC32 and ISIZE
+        yield offset, zlib.decompress(block[1][:-8], -15)
+
+
+def read_at(inputf: typing.BinaryIO, virtual_offset: int, length: int) -> bytes:
+    """Read ``length`` uncompressed bytes starting at ``virtual_offset``."""
+    inputf.seek(virtual_offset >> 16)
+    within = virtual_offset & 0xFFFF
+    result = bytearray()
+    for _, data in iter_blocks(inputf):
+        result += data[within:]
+        within = 0
+        if len(result) >= length:
+            break
+    if len(result) < length:
+        raise EOFError("Unexpected end of BGZF file")
+    return bytes(result[:length])
+
+
+class BgzfReader:
+    """Random access to the BGZF file ``raw`` by virtual offset.
+
+    The most recently decompressed block is kept such that reading many records
+    in file order decompresses each block only once.
+    """
+
+    def __init__(self, raw: typing.BinaryIO):
+        #: Underlying file.
+        self.raw = raw
+        #: File offset of the current block, ``-1`` if none.
+        self.block_offset = -1
+        #: Uncompressed data of the current block.
+        self.block_data = b""
+        #: File offset of the block following the current one.
+        self.next_offset = 0
+
+    def _load(self, offset: int):
+        if offset == self.block_offset:
+            return
+        self.raw.seek(offset)
+        block = _read_block(self.raw)
+        if block is None:
+            raise EOFError("Unexpected end of BGZF file")
+        self.block_offset = offset
+        self.block_data = zlib.decompress(block[1][:-8], -15)
+        self.next_offset = self.raw.tell()
+
+    def read_at(self, virtual_offset: int, length: int) -> bytes:
+        """Read ``length`` uncompressed bytes starting at ``virtual_offset``."""
+        self._load(virtual_offset >> 16)
+        within = virtual_offset & 0xFFFF
+        result = self.block_data[within : within + length]
+        while len(result) < length:
+            self._load(self.next_offset)
+            result += self.block_data[: length - len(result)]
+        return result
+
+    def close(self):
+        self.raw.close()
+
+    def __enter__(self) -> "BgzfReader":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def compress_block(data: bytes, level: int = 6) -> bytes:
+    """Compress ``data`` (at most ``BLOCK_DATA_SIZE`` bytes) into a BGZF block."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    cdata = compressor.compress(data) + compressor.flush()
+    # header with BC subfield (18 bytes), compressed data, CRC32 and ISIZE
+    header = MAGIC + b"\x00\x00\x00\x00\x00\xff\x06\x00BC\x02\x00"
+    header += struct.pack("<H", len(header) + 2 + len(cdata) + 8 - 1)
+    return header + cdata + struct.pack("<II", zlib.crc32(data), len(data))
+
+
+class BgzfWriter(io.BufferedIOBase):
+    """Binary file object writing BGZF to the underlying file ``raw``.
+
+    ``tell()`` returns the virtual offset of the next byte to be written.
+    """
+
+    def __init__(self, raw: typing.BinaryIO, level: int = 6):
+        #: Underlying file.
+        self.raw = raw
+        #: Compression level.
+        self.level = level
+        #: Uncompressed data of the current block.
+        self.buffer = bytearray()
+        #: File offset of the current block.
+        self.block_offset = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:  # type: ignore[override]
+        self.buffer += data
+        while len(self.buffer) >= BLOCK_DATA_SIZE:
+            self._write_block(bytes(self.buffer[:BLOCK_DATA_SIZE]))
+            del self.buffer[:BLOCK_DATA_SIZE]
+        return len(data)
+
+    def _write_block(self, data: bytes):
+        block = compress_block(data, self.level)
+        self.raw.write(block)
+        self.block_offset += len(block)
+
+    def tell(self) -> int:
+        return (self.block_offset << 16) | len(self.buffer)
+
+    def flush(self):
+        """Write out the current block (if any) such that the next write starts a new one."""
+        if self.buffer:
+            self._write_block(bytes(self.buffer))
+            self.buffer.clear()
+        self.raw.flush()
+
+    def close(self):
+        if not self.closed:
+            super().close()  # calls flush()
+            self.raw.write(EOF_BLOCK)
+            self.raw.close()
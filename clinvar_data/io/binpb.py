@@ -0,0 +1,66 @@
+"""Length-delimited binary protobuf streams.
+
+Each record is written as its serialized size encoded as a base-128 varint
+followed by the serialized message.  This is the same framing as used by
+``writeDelimitedTo()``/``parseDelimitedFrom()`` of the Java and C++ protobuf
+libraries.
+"""
+
+import typing
+
+from google.protobuf.message import Message
+
+
+def encode_varint(value: int) -> bytes:
+    """Encode non-negative ``value`` as base-128 varint."""
+    result = bytearray()
+    while True:
+        bits = value & 0x7F
+        value >>= 7
+        if value:
+            result.append(bits | 0x80)
+        else:
+            result.append(bits)
+            return bytes(result)
+
+
+def read_varint(inputf: typing.BinaryIO) -> typing.Optional[int]:
+    """Read a base-128 varint from ``inputf``, return ``None`` on clean end of file."""
+    result = 0
+    shift = 0
+    while True:
+        byte = inputf.read(1)
+        if not byte:
+            if shift == 0:
+                return None
+            raise EOFError("Unexpected end of file in varint")
+        value = byte[0]
+        result |= (value & 0x7F) << shift
+        if not value & 0x80:
+            return result
+        shift += 7
+        if shift >= 64:
+            raise ValueError("Varint too long")
+
+
+def write_delimited(outputf: typing.BinaryIO, data: bytes):
+    """Write the serialized message ``data`` to ``outputf`` with length prefix."""
+    outputf.write(encode_varint(len(data)))
+    outputf.write(data)
+
+
+def write_message(outputf: typing.BinaryIO, message: Message):
+    """Serialize ``message`` and write it to ``outputf`` with length prefix."""
+    write_delimited(outputf, message.SerializeToString())
+
+
+def iter_delimited(inputf: typing.BinaryIO) -> typing.Iterator[bytes]:
+    """Yield the serialized messages from a length-delimited stream."""
+    while True:
+        size = read_varint(inputf)
+        if size is None:
+            return
+        data = inputf.read(size)
+        if len(data) != size:
+            raise EOFError(f"Unexpected end of file, expected {size} bytes, got {len(data)}")
+        yield data
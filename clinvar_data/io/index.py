@@ -0,0 +1,194 @@
+"""Sidecar index for BGZF compressed record files.
+
+The index is a SQLite database next to the data file (with ``INDEX_SUFFIX`` appended)
+that maps the VCV accession of each record as well as the RCV and SCV accessions it
+contains to the virtual offset and length of the serialized record.  Lookups by
+accession or by VCV use the B-tree indexes of the database and read only a few pages,
+see ``IndexReader`` and ``records.fetch_records()``.
+
+The row of the VCV also records the state of the record (record type and date of
+last update, see ``record_state()``) such that changed records can be detected
+without reading them, see ``clinvar_data.conversion.incremental``.
+"""
+
+import os
+import sqlite3
+import typing
+
+from clinvar_data.pbs.clinvar_public_pb2 import VariationArchive
+
+#: Suffix of index files.
+INDEX_SUFFIX = ".idx"
+#: Column names of the index.
+HEADER = ("accession", "version", "vcv", "virtual_offset", "length", "state")
+#: Number of pending entries after which they are written to the database.
+FLUSH_INTERVAL = 10_000
+#: Magic bytes at the start of SQLite database files.
+SQLITE_MAGIC = b"SQLite format 3\x00"
+
+#: Statements for creating the table, the rowid keeps the file order.
+SCHEMA = (
+    """CREATE TABLE entries (
+        accession TEXT NOT NULL,
+        version INTEGER NOT NULL,
+        vcv TEXT NOT NULL,
+        virtual_offset INTEGER NOT NULL,
+        length INTEGER NOT NULL,
+        state TEXT
+    )""",
+)
+#: Statements for creating the lookup indexes, run after all entries have been written.
+SCHEMA_INDEXES = (
+    "CREATE INDEX entries_accession ON entries (accession)",
+    "CREATE INDEX entries_vcv ON entries (vcv)",
+)
+
+#: Accession and version.
+Key = tuple[str, int]
+
+
+class IndexEntry(typing.NamedTuple):
+    """One row of the index."""
+
+    #: VCV, RCV, or SCV accession.
+    accession: str
+    #: Version of the accession.
+    version: int
+    #: Accession of the VCV containing the accession.
+    vcv: str
+    #: Virtual offset of the serialized record.
+    virtual_offset: int
+    #: Length of the serialized record in bytes.
+    length: int
+    #: State of the record (see ``record_state()``), only for the VCV.
+    state: typing.Optional[str] = None
+
+
+def record_keys(va: VariationArchive) -> list[Key]:
+    """Return the accessions to index for ``va``, starting with the VCV."""
+    result = [(va.accession, va.version)]
+    if va.HasField("classified_record"):
+        for rcv in va.classified_record.rcv_list.rcv_accessions:
+            result.append((rcv.accession, rcv.version))
+        for assertion in va.classified_record.clinical_assertions:
+            result.append(
+                (assertion.clinvar_accession.accession, assertion.clinvar_accession.version)
+            )
+    return result
+
+
+def record_state(va: VariationArchive) -> str:
+    """Return the state of ``va`` that changes with updates besides the version."""
+    record_type = VariationArchive.RecordType.Name(va.record_type)
+    return f"{record_type}@{va.date_last_updated.seconds}"
+
+
+class IndexWriter:
+    """Write index entries to ``path`` as records are written.
+
+    An existing file at ``path`` is replaced.  The lookup indexes are created on
+    ``close()``.
+    """
+
+    def __init__(self, path: str):
+        #: Path to the index file.
+        self.path = path
+        if os.path.exists(path):
+            os.remove(path)
+        #: Connection to the database.
+        self.conn = sqlite3.connect(path)
+        # the file is only valid after close() anyway
+        self.conn.execute("PRAGMA journal_mode=OFF")
+        self.conn.execute("PRAGMA synchronous=OFF")
+        for statement in SCHEMA:
+            self.conn.execute(statement)
+        #: Entries not yet written to the database.
+        self.pending: list[tuple] = []
+
+    def add(
+        self,
+        keys: typing.Sequence[Key],
+        virtual_offset: int,
+        length: int,
+        state: typing.Optional[str] = None,
+    ):
+        """Add entries for all ``keys`` (the first is the VCV) of one record."""
+        vcv = keys[0][0]
+        for i, (accession, version) in enumerate(keys):
+            self.pending.append(
+                (accession, version, vcv, virtual_offset, length, state if i == 0 else None)
+            )
+        if len(self.pending) >= FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self):
+        """Write the pending entries to the database."""
+        self.conn.executemany("INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?)", self.pending)
+        self.pending = []
+
+    def close(self):
+        self.flush()
+        for statement in SCHEMA_INDEXES:
+            self.conn.execute(statement)
+        self.conn.commit()
+        self.conn.close()
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    """Open the index at ``path`` read-only, raising ``ValueError`` for other files."""
+    with open(path, "rb") as inputf:
+        magic = inputf.read(len(SQLITE_MAGIC))
+    if magic != SQLITE_MAGIC:
+        raise ValueError(f"Not an index written by RecordWriter: {path}")
+    return sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+
+
+class IndexReader:
+    """Look up entries in the index at ``path``."""
+
+    def __init__(self, path: str):
+        #: Path to the index file.
+        self.path = path
+        #: Connection to the database.
+        self.conn = _connect(path)
+
+    def _query(self, where: str, args: tuple) -> list[IndexEntry]:
+        rows = self.conn.execute(
+            f"SELECT {', '.join(HEADER)} FROM entries {where} ORDER BY rowid", args
+        )
+        return [IndexEntry(*row) for row in rows]
+
+    def lookup(self, accession: str) -> list[IndexEntry]:
+        """Return the entries of ``accession`` (VCV, RCV, or SCV) in file order."""
+        return self._query("WHERE accession = ?", (accession,))
+
+    def vcv_entries(self, vcv: str) -> list[IndexEntry]:
+        """Return the entries of all accessions in the records of ``vcv`` in file order."""
+        return self._query("WHERE vcv = ?", (vcv,))
+
+    def iter_vcvs(self) -> typing.Iterator[Key]:
+        """Yield the accession and version of each VCV once, ordered by accession."""
+        yield from self.conn.execute(
+            "SELECT DISTINCT accession, version FROM entries WHERE accession = vcv "
+            "ORDER BY accession"
+        )
+
+    def iter_entries(self) -> typing.Iterator[IndexEntry]:
+        """Yield all entries in file order."""
+        for row in self.conn.execute(f"SELECT {', '.join(HEADER)} FROM entries ORDER BY rowid"):
+            yield IndexEntry(*row)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self) -> "IndexReader":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def iter_entries(path: str) -> typing.Iterator[IndexEntry]:
+    """Yield the entries of the index at ``path`` in file order."""
+    with IndexReader(path) as reader:
+        yield from reader.iter_entries()
@@ -0,0 +1,404 @@
+"""Fast conversion of protobuf messages to and from JSON.
+
+``MessageToDict()`` looks up the JSON name and the conversion of every field through
+the descriptors again for each message.  ``message_to_dict()`` gives the same result
+(for the default options) but compiles the conversion of each field once per message
+type.  ``dumps()`` serializes the result with ``json.dumps()`` such that the output
+is byte-identical to ``json.dumps(MessageToDict(message))`` and to
+``MessageToJson(message, indent=None)``.  ``orjson`` is deliberately not used for
+encoding: it writes no spaces after separators, does not escape non-ASCII
+characters, and formats floats differently (e.g., ``0.00001`` instead of
+``1e-05``), and restoring the layout of ``json.dumps()`` from its output is slower
+than ``json.dumps()`` itself.
+
+Well-known types other than ``Timestamp``, ``Duration``, and ``FieldMask`` are
+delegated to ``MessageToDict()``.
+
+In the other direction, ``parse_dict()`` gives the same result as ``ParseDict()``
+(for the default options) with the field lookups and value checks compiled once per
+message type, too.  Values of the types written by ``dumps()`` are set directly;
+everything else (e.g., ``null``, integers given as floats, enums given as numbers, or
+invalid values) is passed to ``ParseDict()`` field by field, such that the same
+values are accepted and the same ``ParseError`` is raised otherwise.  Messages with
+``oneof`` fields and well-known types other than ``Timestamp`` are always passed to
+``ParseDict()``.  ``loads()`` decodes JSON with the optional ``orjson`` package
+(extra ``fast-json``) if it is installed, and with ``json.loads()`` otherwise.
+"""
+
+import base64
+import functools
+import json
+import math
+import typing
+
+from google.protobuf.descriptor import Descriptor, FieldDescriptor
+from google.protobuf.internal import type_checkers
+from google.protobuf.json_format import MessageToDict, ParseDict, SerializeToJsonError
+from google.protobuf.message import Message
+from google.protobuf.timestamp_pb2 import Timestamp
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore[assignment]
+
+#: Conversion of a field value, ``None`` if the value is used as is.
+Converter = typing.Optional[typing.Callable[[typing.Any], typing.Any]]
+
+#: Well-known types that are converted with their ``ToJsonString()`` method.
+_JSON_STRING_TYPES = (
+    "google.protobuf.Timestamp",
+    "google.protobuf.Duration",
+    "google.protobuf.FieldMask",
+)
+#: Compiled conversions of messages by descriptor.
+_MESSAGE_CONVERTERS: dict[Descriptor, typing.Callable[[Message], typing.Any]] = {}
+
+
+def _is_repeated(field: FieldDescriptor) -> bool:
+    is_repeated = getattr(field, "is_repeated", None)  # protobuf >= 5.29
+    if is_repeated is not None:
+        return is_repeated
+    return field.label == FieldDescriptor.LABEL_REPEATED
+
+
+def _convert_float(value: float) -> typing.Any:
+    if math.isinf(value):
+        return "-Infinity" if value < 0.0 else "Infinity"
+    elif math.isnan(value):
+        return "NaN"
+    return value
+
+
+def _convert_short_float(value: float) -> typing.Any:
+    if math.isinf(value) or math.isnan(value):
+        return _convert_float(value)
+    return type_checkers.ToShortestFloat(value)
+
+
+def _enum_converter(field: FieldDescriptor) -> Converter:
+    if field.enum_type.full_name == "google.protobuf.NullValue":
+        return lambda value: None
+    names = {number: value.name for number, value in field.enum_type.values_by_number.items()}
+    is_closed = getattr(field.enum_type, "is_closed", False)
+
+    def convert(value: int) -> typing.Any:
+        name = names.get(value)
+        if name is not None:
+            return name
+        elif is_closed:
+            raise SerializeToJsonError(
+                "Enum field contains an integer value which can not mapped to an enum value."
+            )
+        return value
+
+    return convert
+
+
+def _value_converter(field: FieldDescriptor) -> Converter:
+    """Return the conversion of a single value of ``field``."""
+    cpp_type = field.cpp_type
+    if cpp_type == FieldDescriptor.CPPTYPE_MESSAGE:
+        return message_converter(field.message_type)
+    elif cpp_type == FieldDescriptor.CPPTYPE_ENUM:
+        return _enum_converter(field)
+    elif field.type == FieldDescriptor.TYPE_BYTES:
+        return lambda value: base64.b64encode(value).decode("utf-8")
+    elif cpp_type in (FieldDescriptor.CPPTYPE_INT64, FieldDescriptor.CPPTYPE_UINT64):
+        return str
+    elif cpp_type == FieldDescriptor.CPPTYPE_DOUBLE:
+        return _convert_float
+    elif cpp_type == FieldDescriptor.CPPTYPE_FLOAT:
+        return _convert_short_float
+    return None
+
+
+def _map_key(key: typing.Any) -> str:
+    if isinstance(key, bool):
+        return "true" if key else "false"
+    return str(key)
+
+
+def _compile_field(field: FieldDescriptor) -> tuple[str, Converter]:
+    """Return the JSON name and the conversion of the values of ``field``."""
+    name = f"[{field.full_name}]" if field.is_extension else field.json_name
+    if field.message_type is not None and field.message_type.GetOptions().map_entry:
+        convert_value = _value_converter(field.message_type.fields_by_name["value"])
+        if convert_value is None:
+            return name, lambda value: {_map_key(key): value[key] for key in value}
+        return name, lambda value: {_map_key(key): convert_value(value[key]) for key in value}
+    convert = _value_converter(field)
+    if _is_repeated(field):
+        if convert is None:
+            return name, list
+        return name, lambda values: [convert(value) for value in values]
+    return name, convert
+
+
+class _CompiledFields(dict):
+    """Compiled fields of a message type, compiled on first use.
+
+    This also supports recursive message types.
+    """
+
+    def __missing__(self, field: FieldDescriptor) -> tuple[str, Converter]:
+        compiled = self[field] = _compile_field(field)
+        return compiled
+
+
+def _compile_message(descriptor: Descriptor) -> typing.Callable[[Message], typing.Any]:
+    if descriptor.full_name in _JSON_STRING_TYPES:
+        return lambda message: message.ToJsonString()
+    elif descriptor.full_name.startswith("google.protobuf."):
+        return MessageToDict
+    fields = _CompiledFields()
+
+    def convert(message: Message) -> dict[str, typing.Any]:
+        result = {}
+        for field, value in message.ListFields():
+            name, convert_value = fields[field]
+            result[name] = value if convert_value is None else convert_value(value)
+        return result
+
+    return convert
+
+
+def message_converter(descriptor: Descriptor) -> typing.Callable[[Message], typing.Any]:
+    """Return the (cached) conversion to JSON objects of messages with ``descriptor``."""
+    converter = _MESSAGE_CONVERTERS.get(descriptor)
+    if converter is None:
+        converter = _MESSAGE_CONVERTERS[descriptor] = _compile_message(descriptor)
+    return converter
+
+
+def message_to_dict(message: Message) -> typing.Any:
+    """Convert ``message`` to a JSON object, same as ``MessageToDict(message)``."""
+    return message_converter(message.DESCRIPTOR)(message)
+
+
+def dumps(message: Message) -> str:
+    """Serialize ``message`` to JSON, same as ``json.dumps(MessageToDict(message))``.
+
+    Always uses ``json.dumps()``, not ``orjson``, see the module documentation.
+    """
+    return json.dumps(message_to_dict(message))
+
+
+#: Decoding of JSON strings or bytes, with ``orjson`` if available.
+json_loads: typing.Callable[[typing.Union[str, bytes]], typing.Any] = (
+    orjson.loads if orjson is not None else json.loads
+)
+
+#: Type variable for messages.
+MessageT = typing.TypeVar("MessageT", bound=Message)
+#: Parsing of a JSON value into a message.
+MessageParser = typing.Callable[[typing.Any, Message], None]
+#: Parsing of the JSON value of a field with the given key into a message.
+FieldParser = typing.Callable[[Message, str, typing.Any], None]
+
+#: Returned by scalar conversions for values that are left to ``ParseDict()``.
+_UNHANDLED = object()
+#: Maximal number of memoized timestamps.
+TIMESTAMP_CACHE_SIZE = 1 << 16
+#: Compiled parsers of messages by descriptor.
+_MESSAGE_PARSERS: dict[Descriptor, MessageParser] = {}
+
+
+def _parse_field_fallback(message: Message, key: str, value: typing.Any):
+    ParseDict({key: value}, message)
+
+
+def _parse_message_fallback(value: typing.Any, message: Message):
+    ParseDict(value, message)
+
+
+@functools.lru_cache(maxsize=TIMESTAMP_CACHE_SIZE)
+def _timestamp(value: str) -> tuple[int, int]:
+    timestamp = Timestamp()
+    timestamp.FromJsonString(value)
+    return timestamp.seconds, timestamp.nanos
+
+
+def _parse_timestamp(value: typing.Any, message: Message):
+    try:
+        seconds, nanos = _timestamp(value)
+    except (TypeError, ValueError):
+        ParseDict(value, message)
+        return
+    message.seconds = seconds  # type: ignore[attr-defined]
+    message.nanos = nanos  # type: ignore[attr-defined]
+
+
+def _convert_int(value: typing.Any) -> typing.Any:
+    if type(value) is int:
+        return value
+    elif type(value) is str and value.isascii() and value.isdigit():
+        return int(value)
+    return _UNHANDLED
+
+
+def _convert_double(value: typing.Any) -> typing.Any:
+    if type(value) is float and math.isfinite(value):
+        return value
+    elif type(value) is int and abs(value) < 2**53:
+        return float(value)
+    return _UNHANDLED
+
+
+def _checker(value_type: type) -> typing.Callable[[typing.Any], typing.Any]:
+    return lambda value: value if type(value) is value_type else _UNHANDLED
+
+
+def _scalar_converter(field: FieldDescriptor) -> typing.Callable[[typing.Any], typing.Any]:
+    """Return the conversion of JSON values of ``field`` that need no checks by ``ParseDict()``."""
+    cpp_type = field.cpp_type
+    if cpp_type in (
+        FieldDescriptor.CPPTYPE_INT32,
+        FieldDescriptor.CPPTYPE_INT64,
+        FieldDescriptor.CPPTYPE_UINT32,
+        FieldDescriptor.CPPTYPE_UINT64,
+    ):
+        return _convert_int
+    elif cpp_type == FieldDescriptor.CPPTYPE_DOUBLE:
+        return _convert_double
+    elif cpp_type == FieldDescriptor.CPPTYPE_BOOL:
+        return _checker(bool)
+    elif cpp_type == FieldDescriptor.CPPTYPE_STRING and field.type != FieldDescriptor.TYPE_BYTES:
+        return _checker(str)
+    elif cpp_type == FieldDescriptor.CPPTYPE_ENUM:
+        numbers = {value.name: value.number for value in field.enum_type.values}
+        return lambda value: numbers.get(value, _UNHANDLED) if type(value) is str else _UNHANDLED
+    return lambda value: _UNHANDLED
+
+
+def _message_field_parser(field: FieldDescriptor) -> FieldParser:
+    name = field.name
+    parse_message = message_parser(field.message_type)
+    if parse_message is _parse_timestamp:
+        expected: type = str
+    elif parse_message is not _parse_message_fallback:
+        expected = dict
+    else:
+        return _parse_field_fallback
+    if _is_repeated(field):
+
+        def parse_messages(message: Message, key: str, value: typing.Any):
+            if type(value) is not list or any(type(item) is not expected for item in value):
+                return _parse_field_fallback(message, key, value)
+            message.ClearField(name)
+            container = getattr(message, name)
+            for item in value:
+                parse_message(item, container.add())
+
+        return parse_messages
+
+    def parse_sub_message(message: Message, key: str, value: typing.Any):
+        if type(value) is not expected:
+            return _parse_field_fallback(message, key, value)
+        sub_message = getattr(message, name)
+        sub_message.SetInParent()
+        parse_message(value, sub_message)
+
+    return parse_sub_message
+
+
+def _scalar_field_parser(field: FieldDescriptor) -> FieldParser:
+    name = field.name
+    convert = _scalar_converter(field)
+    if _is_repeated(field):
+
+        def parse_scalars(message: Message, key: str, value: typing.Any):
+            if type(value) is list:
+                converted = [convert(item) for item in value]
+                if _UNHANDLED not in converted:
+                    message.ClearField(name)
+                    try:
+                        getattr(message, name).extend(converted)
+                        return
+                    except (TypeError, ValueError):
+                        pass  # e.g., out of range
+            _parse_field_fallback(message, key, value)
+
+        return parse_scalars
+
+    def parse_scalar(message: Message, key: str, value: typing.Any):
+        converted = convert(value)
+        if converted is not _UNHANDLED:
+            try:
+                setattr(message, name, converted)
+                return
+            except (TypeError, ValueError):
+                pass  # e.g., out of range or unpaired surrogate
+        _parse_field_fallback(message, key, value)
+
+    return parse_scalar
+
+
+def _compile_field_parser(field: FieldDescriptor) -> FieldParser:
+    """Return the parser of the JSON values of ``field``."""
+    if field.message_type is None:
+        return _scalar_field_parser(field)
+    elif field.message_type.GetOptions().map_entry:
+        return _parse_field_fallback
+    else:
+        return _message_field_parser(field)
+
+
+class _CompiledFieldParsers(dict):
+    """Compiled field parsers of a message type by JSON key, compiled on first use."""
+
+    def __init__(self, descriptor: Descriptor):
+        super().__init__()
+        #: Fields by JSON name and by name, in the order of lookup by ``ParseDict()``.
+        self.fields = {field.name: field for field in descriptor.fields}
+        self.fields.update((field.json_name, field) for field in descriptor.fields)
+
+    def __missing__(self, key: str) -> FieldParser:
+        field = self.fields.get(key)
+        if field is None:
+            return _parse_field_fallback  # unknown, let ``ParseDict()`` raise
+        compiled = self[key] = _compile_field_parser(field)
+        return compiled
+
+
+def _has_oneofs(descriptor: Descriptor) -> bool:
+    """Return whether ``descriptor`` has ``oneof`` fields (not counting proto3 ``optional``)."""
+    return any(
+        len(oneof.fields) != 1 or oneof.name != f"_{oneof.fields[0].name}"
+        for oneof in descriptor.oneofs
+    )
+
+
+def _compile_message_parser(descriptor: Descriptor) -> MessageParser:
+    if descriptor.full_name == "google.protobuf.Timestamp":
+        return _parse_timestamp
+    elif descriptor.full_name.startswith("google.protobuf.") or _has_oneofs(descriptor):
+        return _parse_message_fallback
+    fields = _CompiledFieldParsers(descriptor)
+
+    def parse(value: typing.Any, message: Message):
+        if type(value) is not dict:
+            return _parse_message_fallback(value, message)
+        for key, field_value in value.items():
+            fields[key](message, key, field_value)
+
+    return parse
+
+
+def message_parser(descriptor: Descriptor) -> MessageParser:
+    """Return the (cached) parser of JSON objects into messages with ``descriptor``."""
+    parser = _MESSAGE_PARSERS.get(descriptor)
+    if parser is None:
+        parser = _MESSAGE_PARSERS[descriptor] = _compile_message_parser(descriptor)
+    return parser
+
+
+def parse_dict(value: typing.Any, message: MessageT) -> MessageT:
+    """Parse the JSON object ``value`` into ``message``, same as ``ParseDict(value, message)``."""
+    message_parser(message.DESCRIPTOR)(value, message)
+    return message
+
+
+def loads(data: typing.Union[str, bytes], message: MessageT) -> MessageT:
+    """Parse the JSON ``data`` into ``message``, same as ``ParseDict(json.loads(data), message)``."""
+    return parse_dict(json_loads(data), message)
@@ -0,0 +1,65 @@
+"""Partial parsing of JSON records restricted to a set of fields.
+
+Most of the time of reading JSON lines records goes to creating the
+messages for all SCVs with their citations, trait sets, and observations.  Consumers
+that only need a few fields can declare them as dotted paths of proto field names,
+e.g., ``"classified_record.simple_allele.genes"``.  ``compile_projection()`` checks
+the paths against the message descriptor and ``prune()`` removes everything else
+from the decoded JSON before it is parsed.
+
+The selected fields are parsed as usual, in particular sub-messages on the paths are
+present (see ``HasField()``) exactly if they are present in the full record.
+"""
+
+import typing
+
+from google.protobuf.descriptor import Descriptor
+
+#: A compiled projection, maps JSON keys to the projection of the sub-message or to
+#: ``None`` if the field is kept as a whole.
+Projection = dict[str, typing.Optional["Projection"]]
+
+
+def _insert(descriptor: Descriptor, projection: Projection, names: list[str], path: str):
+    field = descriptor.fields_by_name.get(names[0])
+    if field is None:
+        raise ValueError(f"Unknown field {names[0]} of {descriptor.full_name} in {path}")
+    keys = {field.json_name, field.name}
+    if len(names) == 1 or any(key in projection and projection[key] is None for key in keys):
+        for key in keys:
+            projection[key] = None
+        return
+    if field.message_type is None:
+        raise ValueError(f"Field {field.name} in {path} has no sub-fields")
+    sub = projection.get(field.json_name) or {}
+    _insert(field.message_type, sub, names[1:], path)
+    for key in keys:
+        projection[key] = sub
+
+
+def compile_projection(descriptor: Descriptor, paths: typing.Iterable[str]) -> Projection:
+    """Compile the dotted field ``paths`` relative to the message ``descriptor``.
+
+    Repeated fields are projected element-wise.  A path to a field also selects all
+    paths below it.
+    """
+    projection: Projection = {}
+    for path in paths:
+        _insert(descriptor, projection, path.split("."), path)
+    return projection
+
+
+def prune(data: dict[str, typing.Any], projection: Projection) -> dict[str, typing.Any]:
+    """Return the parts of the decoded JSON message ``data`` selected by ``projection``."""
+    result = {}
+    for key, sub in projection.items():
+        value = data.get(key)
+        if value is None:
+            continue
+        elif sub is None:
+            result[key] = value
+        elif isinstance(value, list):
+            result[key] = [prune(item, sub) for item in value]
+        else:
+            result[key] = prune(value, sub)
+    return result
@@ -0,0 +1,95 @@
+"""Splitting of JSONL files into line-aligned ranges for parallel processing.
+
+Uncompressed files are split at arbitrary byte offsets, BGZF files at block offsets.
+A line belongs to the range that contains the newline *preceding* it (the first line
+belongs to the first range), so each line is read by exactly one range even if it
+crosses range boundaries.
+"""
+
+import os
+import typing
+
+from clinvar_data.io import bgzf, records
+
+#: Number of bytes to read from uncompressed files at once.
+READ_SIZE = 1 << 20
+
+
+def is_splittable(path: str) -> bool:
+    """Return whether ``path`` is a JSONL file that can be split into ranges."""
+    if path == "-" or records.format_for_path(path) != records.FORMAT_JSONL:
+        return False
+    elif path.endswith(records.SUFFIXES_GZIP):
+        return bgzf.is_bgzf(path)
+    else:
+        return not path.endswith(records.SUFFIX_ZSTD)
+
+
+def split(path: str, count: int) -> list[tuple[int, int]]:
+    """Split the file at ``path`` into at most ``count`` ranges ``(start, end)``."""
+    size = os.path.getsize(path)
+    if path.endswith(records.SUFFIXES_GZIP):
+        with open(path, "rb") as inputf:
+            offsets = list(bgzf.iter_block_offsets(inputf))
+        step = max(1, len(offsets) // count)
+        starts = offsets[::step][:count]
+    else:
+        step = max(1, size // count)
+        starts = list(range(0, size, step))[:count] or [0]
+    return list(zip(starts, starts[1:] + [size]))
+
+
+def _iter_plain_chunks(
+    inputf: typing.BinaryIO, start: int, end: int
+) -> typing.Iterator[tuple[int, bytes]]:
+    """Yield ``(offset, data)`` chunks from ``start`` such that no chunk crosses ``end``."""
+    inputf.seek(start)
+    offset = start
+    while True:
+        size = min(READ_SIZE, end - offset) if offset < end else READ_SIZE
+        data = inputf.read(size)
+        if not data:
+            return
+        yield offset, data
+        offset += len(data)
+
+
+def iter_lines(path: str, start: int, end: int) -> typing.Iterator[str]:
+    """Yield the lines (without trailing newline) belonging to the range ``[start, end)``."""
+    with open(path, "rb") as inputf:
+        chunks: typing.Iterator[tuple[int, bytes]]
+        if path.endswith(records.SUFFIXES_GZIP):
+            inputf.seek(start)
+            chunks = bgzf.iter_blocks(inputf)
+        else:
+            chunks = _iter_plain_chunks(inputf, start, end)
+
+        buf = b""
+        started = start == 0
+        for offset, data in chunks:
+            if not started:
+                # skip the line owned by the previous range
+                pos = data.find(b"\n")
+                if pos == -1:
+                    if offset >= end:
+                        return
+                    continue
+                elif offset >= end:
+                    return
+                data = data[pos + 1 :]
+                started = True
+            if offset >= end:
+                # complete the line started after our last newline, then stop
+                pos = data.find(b"\n")
+                if pos == -1:
+                    buf += data
+                    continue
+                yield (buf + data[:pos]).decode("utf-8")
+                return
+            buf += data
+            lines = buf.split(b"\n")
+            buf = lines.pop()
+            for line in lines:
+                yield line.decode("utf-8")
+        if buf:
+            yield buf.decode("utf-8")
@@ -0,0 +1,265 @@
+"""Format-agnostic reading and writing of ``VariationArchive`` record streams.
+
+The format is derived from the file name:
+
+- ``*.binpb``, ``*.binpb.gz``, ``*.binpb.zst`` -- length-delimited binary protobuf,
+  see ``clinvar_data.io.binpb``
+- everything else -- JSON lines with one record per line
+
+Files ending in ``.gz`` (or ``.bgz``) are gzip compressed, files ending in ``.zst``
+are Zstandard compressed.  The latter needs the optional ``zstandard`` package
+(extra ``zstd``).
+Files ending in ``.bgz`` are written in BGZF format, and ``RecordWriter`` writes an
+index next to them that allows to fetch single records, see ``clinvar_data.io.index``.
+"""
+
+import gzip
+import io
+import typing
+
+import click
+from google.protobuf.message import Message
+
+from clinvar_data.io import bgzf, binpb, index, json_codec
+from clinvar_data.io import projection as projection_
+from clinvar_data.pbs.clinvar_public_pb2 import VariationArchive
+
+#: JSON lines format.
+FORMAT_JSONL = "jsonl"
+#: Length-delimited binary protobuf format.
+FORMAT_BINPB = "binpb"
+
+#: Suffixes for gzip compression.
+SUFFIXES_GZIP = (".gz", ".bgz")
+#: Suffix for BGZF compression (written with index).
+SUFFIX_BGZF = ".bgz"
+#: Suffix for Zstandard compression.
+SUFFIX_ZSTD = ".zst"
+
+#: Type variable for messages.
+MessageT = typing.TypeVar("MessageT", bound=Message)
+
+
+def strip_compression_suffix(path: str) -> str:
+    """Remove the compression suffix from ``path``, if any."""
+    for suffix in SUFFIXES_GZIP + (SUFFIX_ZSTD,):
+        if path.endswith(suffix):
+            return path[: -len(suffix)]
+    return path
+
+
+def format_for_path(path: str) -> str:
+    """Return the record format to use for ``path``."""
+    if strip_compression_suffix(path).endswith(".binpb"):
+        return FORMAT_BINPB
+    else:
+        return FORMAT_JSONL
+
+
+def _zstandard() -> typing.Any:
+    """Import and return the optional ``zstandard`` module."""
+    try:
+        import zstandard
+    except ImportError as e:  # pragma: no cover
+        raise ImportError(
+            "The zstandard package is needed for reading/writing .zst files, "
+            "install it with: pip install 'clinvar-this[zstd]'"
+        ) from e
+    return zstandard
+
+
+def open_binary(path: str, mode: str, use_click: bool = False) -> typing.BinaryIO:
+    """Open ``path`` in binary mode ``"rb"`` or ``"wb"``, handling compression."""
+    assert mode in ("rb", "wb")
+    if path.endswith(SUFFIX_BGZF) and mode == "wb":
+        return bgzf.BgzfWriter(open(path, "wb"))
+    elif path.endswith(SUFFIXES_GZIP):
+        return typing.cast(typing.BinaryIO, gzip.open(path, mode))
+    elif path.endswith(SUFFIX_ZSTD):
+        zstandard = _zstandard()
+        if mode == "rb":
+            reader = zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+            return typing.cast(typing.BinaryIO, io.BufferedReader(reader))
+        else:
+            return zstandard.ZstdCompressor().stream_writer(open(path, "wb"), closefd=True)
+    elif use_click:
+        return typing.cast(typing.BinaryIO, click.open_file(path, mode))
+    else:
+        return open(path, mode)
+
+
+def open_text(path: str, mode: str, use_click: bool = False) -> typing.TextIO:
+    """Open ``path`` in text mode ``"rt"`` or ``"wt"``, handling compression."""
+    assert mode in ("rt", "wt")
+    if path.endswith(SUFFIX_BGZF) and mode == "wt":
+        return io.TextIOWrapper(open_binary(path, "wb"), encoding="utf-8")
+    elif path.endswith(SUFFIXES_GZIP):
+        return typing.cast(typing.TextIO, gzip.open(path, mode))
+    elif path.endswith(SUFFIX_ZSTD):
+        return io.TextIOWrapper(open_binary(path, mode.replace("t", "b")), encoding="utf-8")
+    elif use_click:
+        return typing.cast(typing.TextIO, click.open_file(path, mode))
+    else:
+        return open(path, mode)
+
+
+def serialize(message: Message, fmt: str) -> typing.Union[str, bytes]:
+    """Serialize ``message`` for writing in the format ``fmt``."""
+    if fmt == FORMAT_BINPB:
+        return message.SerializeToString()
+    else:
+        return json_codec.dumps(message)
+
+
+def parse(
+    data: typing.Union[str, bytes],
+    message: MessageT,
+    projection: typing.Optional[projection_.Projection] = None,
+) -> MessageT:
+    """Parse a record as returned by ``iter_serialized()`` into ``message``.
+
+    JSON records are parsed with ``clinvar_data.io.json_codec``.  With ``projection``
+    (see ``clinvar_data.io.projection``), only the selected fields of JSON records are
+    parsed.  Binary records are always parsed completely as the (native) protobuf
+    parser is faster than skipping fields in Python.
+    """
+    if isinstance(data, bytes):
+        message.ParseFromString(data)
+        return message
+    elif projection is not None:
+        return json_codec.parse_dict(
+            projection_.prune(json_codec.json_loads(data), projection), message
+        )
+    else:
+        return json_codec.loads(data, message)
+
+
+class RecordWriter:
+    """Write a stream of records to a file in the format derived from its name.
+
+    For ``*.bgz`` files, an index is written as well.
+    """
+
+    def __init__(self, path: str, use_click: bool = False, fmt: typing.Optional[str] = None):
+        #: Path to the output file.
+        self.path = path
+        #: The format to write.
+        self.fmt = fmt or format_for_path(path)
+        #: Index writer for BGZF output.
+        self.index: typing.Optional[index.IndexWriter] = None
+        self.outputf: typing.Union[typing.BinaryIO, typing.TextIO]
+        if path.endswith(SUFFIX_BGZF):
+            self.outputf = open_binary(path, "wb")
+            self.index = index.IndexWriter(path + index.INDEX_SUFFIX)
+        elif self.fmt == FORMAT_BINPB:
+            self.outputf = open_binary(path, "wb", use_click)
+        else:
+            self.outputf = open_text(path, "wt", use_click)
+
+    def write(self, message: Message):
+        """Serialize and write ``message``."""
+        keys = state = None
+        if self.index is not None:
+            keys = index.record_keys(typing.cast(VariationArchive, message))
+            state = index.record_state(typing.cast(VariationArchive, message))
+        self.write_serialized(serialize(message, self.fmt), keys, state)
+
+    def write_serialized(
+        self,
+        data: typing.Union[str, bytes],
+        keys: typing.Optional[typing.Sequence[index.Key]] = None,
+        state: typing.Optional[str] = None,
+    ):
+        """Write a record that has already been serialized with ``serialize()``.
+
+        ``keys`` are the accessions to index (see ``index.record_keys()``), required if
+        an index is written.  ``state`` is the record state to index (see
+        ``index.record_state()``).
+        """
+        if self.index is not None:
+            if keys is None:
+                raise ValueError("Keys are required when writing an index")
+            self._write_indexed(data, keys, state)
+        elif isinstance(data, bytes):
+            binpb.write_delimited(typing.cast(typing.BinaryIO, self.outputf), data)
+        else:
+            print(data, file=typing.cast(typing.TextIO, self.outputf))
+
+    def _write_indexed(
+        self,
+        data: typing.Union[str, bytes],
+        keys: typing.Sequence[index.Key],
+        state: typing.Optional[str],
+    ):
+        outputf = typing.cast(bgzf.BgzfWriter, self.outputf)
+        if isinstance(data, bytes):
+            outputf.write(binpb.encode_varint(len(data)))
+            payload = data
+        else:
+            payload = data.encode("utf-8")
+        virtual_offset = outputf.tell()
+        outputf.write(payload)
+        if isinstance(data, str):
+            outputf.write(b"\n")
+        typing.cast(index.IndexWriter, self.index).add(keys, virtual_offset, len(payload), state)
+
+    def close(self):
+        self.outputf.close()
+        if self.index is not None:
+            self.index.close()
+
+    def __enter__(self) -> "RecordWriter":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def iter_serialized(path: str) -> typing.Iterator[typing.Union[str, bytes]]:
+    """Yield the serialized records (JSON lines or binary messages) from ``path``."""
+    if format_for_path(path) == FORMAT_BINPB:
+        with open_binary(path, "rb") as inputf:
+            yield from binpb.iter_delimited(inputf)
+    else:
+        with open_text(path, "rt") as inputf:
+            yield from inputf
+
+
+def iter_records(
+    path: str,
+    message_type: typing.Type[MessageT] = VariationArchive,  # type: ignore[assignment]
+    projection: typing.Optional[projection_.Projection] = None,
+) -> typing.Iterator[MessageT]:
+    """Yield the records from ``path`` as messages of type ``message_type``."""
+    for data in iter_serialized(path):
+        yield parse(data, message_type(), projection)
+
+
+def iter_variation_archives(
+    path: str, projection: typing.Optional[projection_.Projection] = None
+) -> typing.Iterator[VariationArchive]:
+    """Yield the ``VariationArchive`` records from ``path``, see ``parse()`` for ``projection``."""
+    return iter_records(path, VariationArchive, projection)
+
+
+def fetch_records(
+    path: str,
+    accession: str,
+    index_reader: typing.Optional[index.IndexReader] = None,
+) -> list[VariationArchive]:
+    """Fetch the records containing ``accession`` (VCV, RCV, or SCV) from BGZF file ``path``.
+
+    Pass an ``index.IndexReader`` for the index of ``path`` as ``index_reader`` when
+    fetching many records.
+    """
+    if index_reader is None:
+        with index.IndexReader(path + index.INDEX_SUFFIX) as index_reader:
+            return fetch_records(path, accession, index_reader)
+    fmt = format_for_path(path)
+    result = []
+    with open(path, "rb") as inputf:
+        for entry in index_reader.lookup(accession):
+            payload = bgzf.read_at(inputf, entry.virtual_offset, entry.length)
+            data = payload if fmt == FORMAT_BINPB else payload.decode("utf-8")
+            result.append(parse(data, VariationArchive()))
+    return result
@@ -0,0 +1,3 @@
+"""Facade module that just re-exports everything in the protobuf generated file."""
+
+from clinvar_data.pbs.release_diff_pb2 import *  # noqa: F401, F403
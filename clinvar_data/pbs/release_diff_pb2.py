@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# source: clinvar_data/pbs/release_diff.proto
+"""Generated protocol buffer code."""
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import symbol_database as _symbol_database
+from google.protobuf.internal import builder as _builder
+
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+from clinvar_data.pbs import (
+    extracted_vars_pb2 as clinvar__data_dot_pbs_dot_extracted__vars__pb2,
+)
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(
+    b'\n#clinvar_data/pbs/release_diff.proto\x12\x1d\x63linvar_data.pbs.release_diff\x1a%clinvar_data/pbs/extracted_vars.proto"\xa7\x02\n\x14\x43lassificationChange\x12?\n\x04kind\x18\x01 \x01(\x0e\x32\x31.clinvar_data.pbs.release_diff.ClassificationKind\x12\x1c\n\x0fold_description\x18\x02 \x01(\tH\x00\x88\x01\x01\x12\x1c\n\x0fnew_description\x18\x03 \x01(\tH\x01\x88\x01\x01\x12\x1e\n\x11old_review_status\x18\x04 \x01(\tH\x02\x88\x01\x01\x12\x1e\n\x11new_review_status\x18\x05 \x01(\tH\x03\x88\x01\x01\x42\x12\n\x10_old_descriptionB\x12\n\x10_new_descriptionB\x14\n\x12_old_review_statusB\x14\n\x12_new_review_status"\xed\x03\n\tScvChange\x12>\n\x0b\x63hange_type\x18\x01 \x01(\x0e\x32).clinvar_data.pbs.release_diff.ChangeType\x12O\n\rold_accession\x18\x02 \x01(\x0b\x32\x33.clinvar_data.pbs.extracted_vars.VersionedAccessionH\x00\x88\x01\x01\x12O\n\rnew_accession\x18\x03 \x01(\x0b\x32\x33.clinvar_data.pbs.extracted_vars.VersionedAccessionH\x01\x88\x01\x01\x12\x1f\n\x12old_classification\x18\x04 \x01(\tH\x02\x88\x01\x01\x12\x1f\n\x12new_classification\x18\x05 \x01(\tH\x03\x88\x01\x01\x12\x1e\n\x11old_review_status\x18\x06 \x01(\tH\x04\x88\x01\x01\x12\x1e\n\x11new_review_status\x18\x07 \x01(\tH\x05\x88\x01\x01\x42\x10\n\x0e_old_accessionB\x10\n\x0e_new_accessionB\x15\n\x13_old_classificationB\x15\n\x13_new_classificationB\x14\n\x12_old_review_statusB\x14\n\x12_new_review_status"\xa5\x03\n\tVcvChange\x12>\n\x0b\x63hange_type\x18\x01 \x01(\x0e\x32).clinvar_data.pbs.release_diff.ChangeType\x12O\n\rold_accession\x18\x02 \x01(\x0b\x32\x33.clinvar_data.pbs.extracted_vars.VersionedAccessionH\x00\x88\x01\x01\x12O\n\rnew_accession\x18\x03 \x01(\x0b\x32\x33.clinvar_data.pbs.extracted_vars.VersionedAccessionH\x01\x88\x01\x01\x12S\n\x16\x63lassification_changes\x18\x04 \x03(\x0b\x32\x33.clinvar_data.pbs.release_diff.ClassificationChange\x12=\n\x0bscv_changes\x18\x05 \x03(\x0b\x32(.clinvar_data.pbs.release_diff.ScvChangeB\x10\n\x0e_old_accessionB\x10\n\x0e_new_accession*r\n\nChangeType\x12\x1b\n\x17\x43HANGE_TYPE_UNSPECIFIED\x10\x00\x12\x15\n\x11\x43HANGE_TYPE_ADDED\x10\x01\x12\x17\n\x13\x43HANGE_TYPE_REMOVED\x10\x02\x12\x17\n\x13\x43HANGE_TYPE_UPDATED\x10\x03*\xb2\x01\n\x12\x43lassificationKind\x12#\n\x1f\x43LASSIFICATION_KIND_UNSPECIFIED\x10\x00\x12 \n\x1c\x43LASSIFICATION_KIND_GERMLINE\x10\x01\x12/\n+CLASSIFICATION_KIND_SOMATIC_CLINICAL_IMPACT\x10\x02\x12$\n CLASSIFICATION_KIND_ONCOGENICITY\x10\x03\x62\x06proto3'
+)
+
+_globals = globals()
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, "clinvar_data.pbs.release_diff_pb2", _globals)
+if _descriptor._USE_C_DESCRIPTORS == False:
+    DESCRIPTOR._options = None
+    _globals["_CHANGETYPE"]._serialized_start = 1327
+    _globals["_CHANGETYPE"]._serialized_end = 1441
+    _globals["_CLASSIFICATIONKIND"]._serialized_start = 1444
+    _globals["_CLASSIFICATIONKIND"]._serialized_end = 1622
+    _globals["_CLASSIFICATIONCHANGE"]._serialized_start = 110
+    _globals["_CLASSIFICATIONCHANGE"]._serialized_end = 405
+    _globals["_SCVCHANGE"]._serialized_start = 408
+    _globals["_SCVCHANGE"]._serialized_end = 901
+    _globals["_VCVCHANGE"]._serialized_start = 904
+    _globals["_VCVCHANGE"]._serialized_end = 1325
+# @@protoc_insertion_point(module_scope)
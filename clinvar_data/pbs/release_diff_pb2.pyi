@@ -0,0 +1,394 @@
+"""
+@generated by mypy-protobuf.  Do not edit manually!
+isort:skip_file
+Protocol buffers for the changes between two ClinVar releases."""
+
+import builtins
+import clinvar_data.pbs.extracted_vars_pb2
+import collections.abc
+import google.protobuf.descriptor
+import google.protobuf.internal.containers
+import google.protobuf.internal.enum_type_wrapper
+import google.protobuf.message
+import sys
+import typing
+
+if sys.version_info >= (3, 10):
+    import typing as typing_extensions
+else:
+    import typing_extensions
+
+DESCRIPTOR: google.protobuf.descriptor.FileDescriptor
+
+class _ChangeType:
+    ValueType = typing.NewType("ValueType", builtins.int)
+    V: typing_extensions.TypeAlias = ValueType
+
+class _ChangeTypeEnumTypeWrapper(
+    google.protobuf.internal.enum_type_wrapper._EnumTypeWrapper[_ChangeType.ValueType],
+    builtins.type,
+):
+    DESCRIPTOR: google.protobuf.descriptor.EnumDescriptor
+    CHANGE_TYPE_UNSPECIFIED: _ChangeType.ValueType  # 0
+    """unspecified change type"""
+    CHANGE_TYPE_ADDED: _ChangeType.ValueType  # 1
+    """Record only present in the new release."""
+    CHANGE_TYPE_REMOVED: _ChangeType.ValueType  # 2
+    """Record only present in the old release."""
+    CHANGE_TYPE_UPDATED: _ChangeType.ValueType  # 3
+    """Record present in both releases but changed."""
+
+class ChangeType(_ChangeType, metaclass=_ChangeTypeEnumTypeWrapper):
+    """Enumeration for the type of change of a record."""
+
+CHANGE_TYPE_UNSPECIFIED: ChangeType.ValueType  # 0
+"""unspecified change type"""
+CHANGE_TYPE_ADDED: ChangeType.ValueType  # 1
+"""Record only present in the new release."""
+CHANGE_TYPE_REMOVED: ChangeType.ValueType  # 2
+"""Record only present in the old release."""
+CHANGE_TYPE_UPDATED: ChangeType.ValueType  # 3
+"""Record present in both releases but changed."""
+global___ChangeType = ChangeType
+
+class _ClassificationKind:
+    ValueType = typing.NewType("ValueType", builtins.int)
+    V: typing_extensions.TypeAlias = ValueType
+
+class _ClassificationKindEnumTypeWrapper(
+    google.protobuf.internal.enum_type_wrapper._EnumTypeWrapper[_ClassificationKind.ValueType],
+    builtins.type,
+):
+    DESCRIPTOR: google.protobuf.descriptor.EnumDescriptor
+    CLASSIFICATION_KIND_UNSPECIFIED: _ClassificationKind.ValueType  # 0
+    """unspecified classification kind"""
+    CLASSIFICATION_KIND_GERMLINE: _ClassificationKind.ValueType  # 1
+    """Corresponds to the germline classification."""
+    CLASSIFICATION_KIND_SOMATIC_CLINICAL_IMPACT: _ClassificationKind.ValueType  # 2
+    """Corresponds to the somatic clinical impact."""
+    CLASSIFICATION_KIND_ONCOGENICITY: _ClassificationKind.ValueType  # 3
+    """Corresponds to the oncogenicity classification."""
+
+class ClassificationKind(_ClassificationKind, metaclass=_ClassificationKindEnumTypeWrapper):
+    """Enumeration for the kind of aggregate classification."""
+
+CLASSIFICATION_KIND_UNSPECIFIED: ClassificationKind.ValueType  # 0
+"""unspecified classification kind"""
+CLASSIFICATION_KIND_GERMLINE: ClassificationKind.ValueType  # 1
+"""Corresponds to the germline classification."""
+CLASSIFICATION_KIND_SOMATIC_CLINICAL_IMPACT: ClassificationKind.ValueType  # 2
+"""Corresponds to the somatic clinical impact."""
+CLASSIFICATION_KIND_ONCOGENICITY: ClassificationKind.ValueType  # 3
+"""Corresponds to the oncogenicity classification."""
+global___ClassificationKind = ClassificationKind
+
+@typing.final
+class ClassificationChange(google.protobuf.message.Message):
+    """Change of an aggregate classification of a VCV."""
+
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+
+    KIND_FIELD_NUMBER: builtins.int
+    OLD_DESCRIPTION_FIELD_NUMBER: builtins.int
+    NEW_DESCRIPTION_FIELD_NUMBER: builtins.int
+    OLD_REVIEW_STATUS_FIELD_NUMBER: builtins.int
+    NEW_REVIEW_STATUS_FIELD_NUMBER: builtins.int
+    kind: global___ClassificationKind.ValueType
+    """The kind of classification."""
+    old_description: builtins.str
+    """Description in the old release, if any."""
+    new_description: builtins.str
+    """Description in the new release, if any."""
+    old_review_status: builtins.str
+    """Name of the review status value in the old release, if any."""
+    new_review_status: builtins.str
+    """Name of the review status value in the new release, if any."""
+    def __init__(
+        self,
+        *,
+        kind: global___ClassificationKind.ValueType = ...,
+        old_description: builtins.str | None = ...,
+        new_description: builtins.str | None = ...,
+        old_review_status: builtins.str | None = ...,
+        new_review_status: builtins.str | None = ...,
+    ) -> None: ...
+    def HasField(
+        self,
+        field_name: typing.Literal[
+            "_new_description",
+            b"_new_description",
+            "_new_review_status",
+            b"_new_review_status",
+            "_old_description",
+            b"_old_description",
+            "_old_review_status",
+            b"_old_review_status",
+            "new_description",
+            b"new_description",
+            "new_review_status",
+            b"new_review_status",
+            "old_description",
+            b"old_description",
+            "old_review_status",
+            b"old_review_status",
+        ],
+    ) -> builtins.bool: ...
+    def ClearField(
+        self,
+        field_name: typing.Literal[
+            "_new_description",
+            b"_new_description",
+            "_new_review_status",
+            b"_new_review_status",
+            "_old_description",
+            b"_old_description",
+            "_old_review_status",
+            b"_old_review_status",
+            "kind",
+            b"kind",
+            "new_description",
+            b"new_description",
+            "new_review_status",
+            b"new_review_status",
+            "old_description",
+            b"old_description",
+            "old_review_status",
+            b"old_review_status",
+        ],
+    ) -> None: ...
+    @typing.overload
+    def WhichOneof(
+        self, oneof_group: typing.Literal["_new_description", b"_new_description"]
+    ) -> typing.Literal["new_description"] | None: ...
+    @typing.overload
+    def WhichOneof(
+        self, oneof_group: typing.Literal["_new_review_status", b"_new_review_status"]
+    ) -> typing.Literal["new_review_status"] | None: ...
+    @typing.overload
+    def WhichOneof(
+        self, oneof_group: typing.Literal["_old_description", b"_old_description"]
+    ) -> typing.Literal["old_description"] | None: ...
+    @typing.overload
+    def WhichOneof(
+        self, oneof_group: typing.Literal["_old_review_status", b"_old_review_status"]
+    ) -> typing.Literal["old_review_status"] | None: ...
+
+global___ClassificationChange = ClassificationChange
+
+@typing.final
+class ScvChange(google.protobuf.message.Message):
+    """Change of an SCV of a VCV."""
+
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+
+    CHANGE_TYPE_FIELD_NUMBER: builtins.int
+    OLD_ACCESSION_FIELD_NUMBER: builtins.int
+    NEW_ACCESSION_FIELD_NUMBER: builtins.int
+    OLD_CLASSIFICATION_FIELD_NUMBER: builtins.int
+    NEW_CLASSIFICATION_FIELD_NUMBER: builtins.int
+    OLD_REVIEW_STATUS_FIELD_NUMBER: builtins.int
+    NEW_REVIEW_STATUS_FIELD_NUMBER: builtins.int
+    change_type: global___ChangeType.ValueType
+    """The type of change."""
+    old_classification: builtins.str
+    """Classification in the old release, if any."""
+    new_classification: builtins.str
+    """Classification in the new release, if any."""
+    old_review_status: builtins.str
+    """Name of the review status value in the old release, if any."""
+    new_review_status: builtins.str
+    """Name of the review status value in the new release, if any."""
+    @property
+    def old_accession(self) -> clinvar_data.pbs.extracted_vars_pb2.VersionedAccession:
+        """Accession in the old release, if any."""
+
+    @property
+    def new_accession(self) -> clinvar_data.pbs.extracted_vars_pb2.VersionedAccession:
+        """Accession in the new release, if any."""
+
+    def __init__(
+        self,
+        *,
+        change_type: global___ChangeType.ValueType = ...,
+        old_accession: clinvar_data.pbs.extracted_vars_pb2.VersionedAccession | None = ...,
+        new_accession: clinvar_data.pbs.extracted_vars_pb2.VersionedAccession | None = ...,
+        old_classification: builtins.str | None = ...,
+        new_classification: builtins.str | None = ...,
+        old_review_status: builtins.str | None = ...,
+        new_review_status: builtins.str | None = ...,
+    ) -> None: ...
+    def HasField(
+        self,
+        field_name: typing.Literal[
+            "_new_accession",
+            b"_new_accession",
+            "_new_classification",
+            b"_new_classification",
+            "_new_review_status",
+            b"_new_review_status",
+            "_old_accession",
+            b"_old_accession",
+            "_old_classification",
+            b"_old_classification",
+            "_old_review_status",
+            b"_old_review_status",
+            "new_accession",
+            b"new_accession",
+            "new_classification",
+            b"new_classification",
+            "new_review_status",
+            b"new_review_status",
+            "old_accession",
+            b"old_accession",
+            "old_classification",
+            b"old_classification",
+            "old_review_status",
+            b"old_review_status",
+        ],
+    ) -> builtins.bool: ...
+    def ClearField(
+        self,
+        field_name: typing.Literal[
+            "_new_accession",
+            b"_new_accession",
+            "_new_classification",
+            b"_new_classification",
+            "_new_review_status",
+            b"_new_review_status",
+            "_old_accession",
+            b"_old_accession",
+            "_old_classification",
+            b"_old_classification",
+            "_old_review_status",
+            b"_old_review_status",
+            "change_type",
+            b"change_type",
+            "new_accession",
+            b"new_accession",
+            "new_classification",
+            b"new_classification",
+            "new_review_status",
+            b"new_review_status",
+            "old_accession",
+            b"old_accession",
+            "old_classification",
+            b"old_classification",
+            "old_review_status",
+            b"old_review_status",
+        ],
+    ) -> None: ...
+    @typing.overload
+    def WhichOneof(
+        self, oneof_group: typing.Literal["_new_accession", b"_new_accession"]
+    ) -> typing.Literal["new_accession"] | None: ...
+    @typing.overload
+    def WhichOneof(
+        self, oneof_group: typing.Literal["_new_classification", b"_new_classification"]
+    ) -> typing.Literal["new_classification"] | None: ...
+    @typing.overload
+    def WhichOneof(
+        self, oneof_group: typing.Literal["_new_review_status", b"_new_review_status"]
+    ) -> typing.Literal["new_review_status"] | None: ...
+    @typing.overload
+    def WhichOneof(
+        self, oneof_group: typing.Literal["_old_accession", b"_old_accession"]
+    ) -> typing.Literal["old_accession"] | None: ...
+    @typing.overload
+    def WhichOneof(
+        self, oneof_group: typing.Literal["_old_classification", b"_old_classification"]
+    ) -> typing.Literal["old_classification"] | None: ...
+    @typing.overload
+    def WhichOneof(
+        self, oneof_group: typing.Literal["_old_review_status", b"_old_review_status"]
+    ) -> typing.Literal["old_review_status"] | None: ...
+
+global___ScvChange = ScvChange
+
+@typing.final
+class VcvChange(google.protobuf.message.Message):
+    """Changes of one VCV between two releases."""
+
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+
+    CHANGE_TYPE_FIELD_NUMBER: builtins.int
+    OLD_ACCESSION_FIELD_NUMBER: builtins.int
+    NEW_ACCESSION_FIELD_NUMBER: builtins.int
+    CLASSIFICATION_CHANGES_FIELD_NUMBER: builtins.int
+    SCV_CHANGES_FIELD_NUMBER: builtins.int
+    change_type: global___ChangeType.ValueType
+    """The type of change."""
+    @property
+    def old_accession(self) -> clinvar_data.pbs.extracted_vars_pb2.VersionedAccession:
+        """Accession in the old release, if any."""
+
+    @property
+    def new_accession(self) -> clinvar_data.pbs.extracted_vars_pb2.VersionedAccession:
+        """Accession in the new release, if any."""
+
+    @property
+    def classification_changes(
+        self,
+    ) -> google.protobuf.internal.containers.RepeatedCompositeFieldContainer[
+        global___ClassificationChange
+    ]:
+        """Changes of the aggregate classifications."""
+
+    @property
+    def scv_changes(
+        self,
+    ) -> google.protobuf.internal.containers.RepeatedCompositeFieldContainer[global___ScvChange]:
+        """Changes of the SCVs."""
+
+    def __init__(
+        self,
+        *,
+        change_type: global___ChangeType.ValueType = ...,
+        old_accession: clinvar_data.pbs.extracted_vars_pb2.VersionedAccession | None = ...,
+        new_accession: clinvar_data.pbs.extracted_vars_pb2.VersionedAccession | None = ...,
+        classification_changes: (
+            collections.abc.Iterable[global___ClassificationChange] | None
+        ) = ...,
+        scv_changes: collections.abc.Iterable[global___ScvChange] | None = ...,
+    ) -> None: ...
+    def HasField(
+        self,
+        field_name: typing.Literal[
+            "_new_accession",
+            b"_new_accession",
+            "_old_accession",
+            b"_old_accession",
+            "new_accession",
+            b"new_accession",
+            "old_accession",
+            b"old_accession",
+        ],
+    ) -> builtins.bool: ...
+    def ClearField(
+        self,
+        field_name: typing.Literal[
+            "_new_accession",
+            b"_new_accession",
+            "_old_accession",
+            b"_old_accession",
+            "change_type",
+            b"change_type",
+            "classification_changes",
+            b"classification_changes",
+            "new_accession",
+            b"new_accession",
+            "old_accession",
+            b"old_accession",
+            "scv_changes",
+            b"scv_changes",
+        ],
+    ) -> None: ...
+    @typing.overload
+    def WhichOneof(
+        self, oneof_group: typing.Literal["_new_accession", b"_new_accession"]
+    ) -> typing.Literal["new_accession"] | None: ...
+    @typing.overload
+    def WhichOneof(
+        self, oneof_group: typing.Literal["_old_accession", b"_old_accession"]
+    ) -> typing.Literal["old_accession"] | None: ...
+
+global___VcvChange = VcvChange
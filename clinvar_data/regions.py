@@ -0,0 +1,155 @@
+"""Coordinate-sorted and indexed files of extracted variants for region queries.
+
+``sort_and_index()`` turns a JSONL file written by ``extract_vars`` into a BGZF
+compressed TSV file with the columns chromosome, start, stop (1-based, inclusive)
+and the original JSON record, sorted by coordinate and indexed with tabix.  The
+result can be queried with ``RegionIndex`` (or the ``tabix`` command line tool).
+"""
+
+import contextlib
+import heapq
+import json
+import re
+import tempfile
+import typing
+
+import pysam
+
+from clinvar_data.io import bgzf, records
+from clinvar_data.pbs.clinvar_public import Chromosome
+
+#: Number of lines to sort in memory at once.
+CHUNK_LINES = 100_000
+
+#: Columns of the sequence location to use for start and stop, in order of preference.
+START_KEYS = ("start", "innerStart", "outerStart", "positionVcf")
+STOP_KEYS = ("stop", "innerStop", "outerStop")
+
+#: Regular expression for regions ``chrom:start-stop`` or ``chrom:pos`` or ``chrom``.
+REGION_RE = re.compile(r"^(?P<chrom>[^:]+)(:(?P<start>[0-9,]+)(-(?P<stop>[0-9,]+))?)?$")
+
+
+class Interval(typing.NamedTuple):
+    """Genomic interval with 1-based, inclusive coordinates."""
+
+    #: Chromosome name without ``chr`` prefix.
+    chrom: str
+    #: Start position.
+    start: int
+    #: Stop position.
+    stop: int
+
+
+def record_interval(record: dict[str, typing.Any]) -> typing.Optional[Interval]:
+    """Return the interval of an extracted variant record in JSON representation, if any."""
+    sequence_location = record.get("sequenceLocation", {})
+    chrom = sequence_location.get("chr")
+    start = next((sequence_location[key] for key in START_KEYS if key in sequence_location), None)
+    if chrom is None or start is None:
+        return None
+    stop = next((sequence_location[key] for key in STOP_KEYS if key in sequence_location), None)
+    if stop is None:
+        stop = start + max(1, len(sequence_location.get("referenceAlleleVcf", ""))) - 1
+    return Interval(chrom[len("CHROMOSOME_") :], start, max(start, stop))
+
+
+def parse_region(region: str) -> Interval:
+    """Parse a region string such as ``chr1:1,000-2,000`` into an ``Interval``."""
+    match = REGION_RE.match(region.strip())
+    if not match:
+        raise ValueError(f"Invalid region: {region}")
+    chrom = match.group("chrom")
+    if chrom.lower().startswith("chr"):
+        chrom = chrom[3:]
+    if chrom == "M":
+        chrom = "MT"
+    start = int((match.group("start") or "1").replace(",", ""))
+    stop = match.group("stop")
+    if stop is not None:
+        return Interval(chrom, start, int(stop.replace(",", "")))
+    elif match.group("start") is not None:
+        return Interval(chrom, start, start)
+    else:
+        return Interval(chrom, 1, 2**31 - 1)
+
+
+def _sort_key(line: str) -> tuple[int, int, int]:
+    chrom, start, stop, _ = line.split("\t", 3)
+    return Chromosome.Value(f"CHROMOSOME_{chrom}"), int(start), int(stop)
+
+
+def _write_sorted_chunk(lines: list[str], stack: contextlib.ExitStack) -> typing.TextIO:
+    """Sort ``lines`` and write them to a temporary file, returned rewound."""
+    lines.sort(key=_sort_key)
+    tmpf = stack.enter_context(tempfile.TemporaryFile("w+t", encoding="utf-8"))
+    tmpf.writelines(lines)
+    tmpf.seek(0)
+    return tmpf
+
+
+def sort_and_index(path_input: str, path_output: str, chunk_lines: int = CHUNK_LINES) -> int:
+    """Sort the extracted variants in ``path_input`` by coordinate and write indexed output.
+
+    ``path_output`` should end in ``.gz``, the tabix index is written to ``path_output``
+    with ``.tbi`` appended.  Records are sorted in chunks of ``chunk_lines`` that are
+    merged in the end such that memory use stays bounded.  Records without position
+    are skipped; the index is written even if no records are left.  Returns the number
+    of records written.
+    """
+    written = 0
+    with contextlib.ExitStack() as stack:
+        chunks: list[typing.TextIO] = []
+        lines: list[str] = []
+        with records.open_text(path_input, "rt") as inputf:
+            for line in inputf:
+                interval = record_interval(json.loads(line))
+                if interval is None:
+                    continue
+                line = line.rstrip("\n")
+                lines.append(f"{interval.chrom}\t{interval.start}\t{interval.stop}\t{line}\n")
+                if len(lines) >= chunk_lines:
+                    chunks.append(_write_sorted_chunk(lines, stack))
+                    lines = []
+        if lines or not chunks:
+            chunks.append(_write_sorted_chunk(lines, stack))
+
+        with bgzf.BgzfWriter(open(path_output, "wb")) as outputf:
+            for line in heapq.merge(*chunks, key=_sort_key):
+                outputf.write(line.encode("utf-8"))
+                written += 1
+
+    pysam.tabix_index(path_output, force=True, seq_col=0, start_col=1, end_col=2, zerobased=False)
+    return written
+
+
+class RegionIndex:
+    """Query a file written by ``sort_and_index()`` for records overlapping a region.
+
+    Keep the object open for running many queries as opening reads the tabix index.
+    """
+
+    def __init__(self, path: str):
+        #: The tabix file.
+        self.tabix_file = pysam.TabixFile(path)
+        #: Chromosome names present in the file.
+        self.contigs = set(self.tabix_file.contigs)
+
+    def fetch_lines(self, interval: Interval) -> typing.Iterator[str]:
+        """Yield the JSON lines of the records overlapping ``interval``."""
+        if interval.chrom not in self.contigs:
+            return
+        for line in self.tabix_file.fetch(interval.chrom, interval.start - 1, interval.stop):
+            yield line.split("\t", 3)[3]
+
+    def fetch(self, region: str) -> typing.Iterator[str]:
+        """Yield the JSON lines of the records overlapping ``region`` (see ``parse_region()``)."""
+        return self.fetch_lines(parse_region(region))
+
+    def close(self):
+        self.tabix_file.close()
+
+    def __enter__(self) -> "RegionIndex":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,297 @@
+"""Changes between two converted ClinVar releases.
+
+The two files are streamed in merge-join fashion, so both must be sorted by VCV
+accession, see ``sort_records()``.  Consecutive records with the same VCV accession
+(from expanded IUPAC codes) are compared only by their first record.  For each VCV
+that was added, removed, or changed, a ``VcvChange`` record is written with the
+changes of the aggregate classifications and of the SCVs.
+"""
+
+import contextlib
+import heapq
+import os
+import tempfile
+import typing
+
+from clinvar_data.classifications import scv_classification
+from clinvar_data.io import binpb, records
+from clinvar_data.pbs.clinvar_public import (
+    AggregateClassificationSet,
+    AggregateGermlineReviewStatus,
+    AggregateOncogenicityReviewStatus,
+    AggregateSomaticClinicalImpactReviewStatus,
+    ClinicalAssertion,
+    SubmitterReviewStatus,
+    VariationArchive,
+)
+from clinvar_data.pbs.extracted_vars import VersionedAccession
+from clinvar_data.pbs.release_diff import (
+    ChangeType,
+    ClassificationChange,
+    ClassificationKind,
+    ScvChange,
+    VcvChange,
+)
+
+#: Number of records to sort in memory at once in ``sort_records()``.
+CHUNK_RECORDS = 100_000
+
+#: Aggregate classification kinds with the field name and review status enum.
+AGGREGATE_CLASSIFICATIONS: tuple[tuple[ClassificationKind.ValueType, str, typing.Any], ...] = (
+    (
+        ClassificationKind.CLASSIFICATION_KIND_GERMLINE,
+        "germline_classification",
+        AggregateGermlineReviewStatus,
+    ),
+    (
+        ClassificationKind.CLASSIFICATION_KIND_SOMATIC_CLINICAL_IMPACT,
+        "somatic_clinical_impact",
+        AggregateSomaticClinicalImpactReviewStatus,
+    ),
+    (
+        ClassificationKind.CLASSIFICATION_KIND_ONCOGENICITY,
+        "oncogenicity_classification",
+        AggregateOncogenicityReviewStatus,
+    ),
+)
+
+
+def iter_vcvs(path: str) -> typing.Iterator[VariationArchive]:
+    """Yield the first record of each VCV from ``path``, checking the sort order."""
+    previous = ""
+    for va in records.iter_variation_archives(path):
+        if va.accession == previous:
+            continue
+        elif va.accession < previous:
+            raise ValueError(
+                f"{path} is not sorted by accession ({va.accession} after {previous}), "
+                "use sort_records() first"
+            )
+        previous = va.accession
+        yield va
+
+
+def _versioned_accession(accession: str, version: int) -> VersionedAccession:
+    return VersionedAccession(accession=accession, version=version)
+
+
+def diff_classifications(
+    old: AggregateClassificationSet, new: AggregateClassificationSet
+) -> list[ClassificationChange]:
+    """Return the changes of description or review status of the aggregate classifications."""
+    result = []
+    for kind, field, review_status_enum in AGGREGATE_CLASSIFICATIONS:
+        values = []
+        for classifications in (old, new):
+            if classifications.HasField(field):
+                classification = getattr(classifications, field)
+                values.append(
+                    (
+                        (
+                            classification.description
+                            if classification.HasField("description")
+                            else None
+                        ),
+                        review_status_enum.Name(classification.review_status),
+                    )
+                )
+            else:
+                values.append((None, None))
+        if values[0] != values[1]:
+            result.append(
+                ClassificationChange(
+                    kind=kind,
+                    old_description=values[0][0],
+                    new_description=values[1][0],
+                    old_review_status=values[0][1],
+                    new_review_status=values[1][1],
+                )
+            )
+    return result
+
+
+def _scv_state(
+    assertion: ClinicalAssertion,
+) -> tuple[VersionedAccession, typing.Optional[str], str]:
+    return (
+        _versioned_accession(
+            assertion.clinvar_accession.accession, assertion.clinvar_accession.version
+        ),
+        scv_classification(assertion),
+        SubmitterReviewStatus.Name(assertion.classifications.review_status),
+    )
+
+
+def diff_scvs(
+    old: typing.Sequence[ClinicalAssertion], new: typing.Sequence[ClinicalAssertion]
+) -> list[ScvChange]:
+    """Return the added, removed, and updated SCVs (new version, classification, or status)."""
+    old_by_accession = {
+        assertion.clinvar_accession.accession: _scv_state(assertion) for assertion in old
+    }
+    new_by_accession = {
+        assertion.clinvar_accession.accession: _scv_state(assertion) for assertion in new
+    }
+    result = []
+    for accession in sorted(old_by_accession.keys() | new_by_accession.keys()):
+        old_state = old_by_accession.get(accession)
+        new_state = new_by_accession.get(accession)
+        if old_state == new_state:
+            continue
+        if old_state is None:
+            change = ScvChange(change_type=ChangeType.CHANGE_TYPE_ADDED)
+        elif new_state is None:
+            change = ScvChange(change_type=ChangeType.CHANGE_TYPE_REMOVED)
+        else:
+            change = ScvChange(change_type=ChangeType.CHANGE_TYPE_UPDATED)
+        if old_state is not None:
+            change.old_accession.CopyFrom(old_state[0])
+            if old_state[1] is not None:
+                change.old_classification = old_state[1]
+            change.old_review_status = old_state[2]
+        if new_state is not None:
+            change.new_accession.CopyFrom(new_state[0])
+            if new_state[1] is not None:
+                change.new_classification = new_state[1]
+            change.new_review_status = new_state[2]
+        result.append(change)
+    return result
+
+
+def diff_vcvs(
+    old: typing.Optional[VariationArchive], new: typing.Optional[VariationArchive]
+) -> typing.Optional[VcvChange]:
+    """Return the changes of a VCV, ``None`` if unchanged."""
+    empty = VariationArchive()
+    old_record = (old if old is not None else empty).classified_record
+    new_record = (new if new is not None else empty).classified_record
+    classification_changes = diff_classifications(
+        old_record.classifications, new_record.classifications
+    )
+    scv_changes = diff_scvs(old_record.clinical_assertions, new_record.clinical_assertions)
+    if old is None:
+        change_type = ChangeType.CHANGE_TYPE_ADDED
+    elif new is None:
+        change_type = ChangeType.CHANGE_TYPE_REMOVED
+    elif old.version != new.version or classification_changes or scv_changes:
+        change_type = ChangeType.CHANGE_TYPE_UPDATED
+    else:
+        return None
+    return VcvChange(
+        change_type=change_type,
+        old_accession=(
+            _versioned_accession(old.accession, old.version) if old is not None else None
+        ),
+        new_accession=(
+            _versioned_accession(new.accession, new.version) if new is not None else None
+        ),
+        classification_changes=classification_changes,
+        scv_changes=scv_changes,
+    )
+
+
+def iter_changes(path_old: str, path_new: str) -> typing.Iterator[VcvChange]:
+    """Yield the changes between the accession-sorted files ``path_old`` and ``path_new``."""
+    old_vcvs = iter_vcvs(path_old)
+    new_vcvs = iter_vcvs(path_new)
+    old = next(old_vcvs, None)
+    new = next(new_vcvs, None)
+    while old is not None or new is not None:
+        if new is None or (old is not None and old.accession < new.accession):
+            change = diff_vcvs(old, None)
+            old = next(old_vcvs, None)
+        elif old is None or new.accession < old.accession:
+            change = diff_vcvs(None, new)
+            new = next(new_vcvs, None)
+        else:
+            change = diff_vcvs(old, new)
+            old = next(old_vcvs, None)
+            new = next(new_vcvs, None)
+        if change is not None:
+            yield change
+
+
+def _write_sorted_chunk(
+    chunk: list[tuple[str, bytes]], stack: contextlib.ExitStack
+) -> typing.BinaryIO:
+    """Write the sorted ``(accession, data)`` pairs to a temporary file, rewound."""
+    tmpf = stack.enter_context(tempfile.TemporaryFile("w+b"))
+    chunk.sort(key=lambda item: item[0])
+    for accession, data in chunk:
+        binpb.write_delimited(tmpf, accession.encode("utf-8"))
+        binpb.write_delimited(tmpf, data)
+    tmpf.seek(0)
+    return tmpf
+
+
+def _iter_chunk(tmpf: typing.BinaryIO) -> typing.Iterator[tuple[str, bytes]]:
+    items = binpb.iter_delimited(tmpf)
+    for accession, data in zip(items, items):
+        yield accession.decode("utf-8"), data
+
+
+def sort_records(path_input: str, path_output: str, chunk_records: int = CHUNK_RECORDS) -> int:
+    """Sort the records in ``path_input`` by VCV accession and write them to ``path_output``.
+
+    The serialized records are copied, the formats of input and output must match.
+    Records are sorted in chunks of ``chunk_records`` that are merged in the end such
+    that memory use stays bounded.  The sort is stable.  Returns the number of records.
+    """
+    fmt = records.format_for_path(path_input)
+    if records.format_for_path(path_output) != fmt:
+        raise ValueError(f"Output {path_output} must have the same format as {path_input}")
+    written = 0
+    with contextlib.ExitStack() as stack:
+        chunks: list[typing.BinaryIO] = []
+        chunk: list[tuple[str, bytes]] = []
+        for data in records.iter_serialized(path_input):
+            va = records.parse(data, VariationArchive())
+            if isinstance(data, str):
+                data = data.rstrip("\n").encode("utf-8")
+            chunk.append((va.accession, data))
+            if len(chunk) >= chunk_records:
+                chunks.append(_write_sorted_chunk(chunk, stack))
+                chunk = []
+        chunks.append(_write_sorted_chunk(chunk, stack))
+
+        with records.RecordWriter(path_output) as writer:
+            merged = heapq.merge(*map(_iter_chunk, chunks), key=lambda item: item[0])
+            for _, data in merged:
+                if writer.index is not None:
+                    writer.write(records.parse(_decode(data, fmt), VariationArchive()))
+                else:
+                    writer.write_serialized(_decode(data, fmt))
+                written += 1
+    return written
+
+
+def _decode(data: bytes, fmt: str) -> typing.Union[str, bytes]:
+    return data if fmt == records.FORMAT_BINPB else data.decode("utf-8")
+
+
+def run(path_old: str, path_new: str, path_output: str, sort: bool = False) -> int:
+    """Write the changes between ``path_old`` and ``path_new`` to ``path_output``.
+
+    The output format is derived from ``path_output``, see ``clinvar_data.io.records``.
+    BGZF output is rejected as its index is by VCV records, not changes.  With ``sort``,
+    the inputs are sorted into temporary files first.  Returns the number of changed VCVs.
+    """
+    if path_output.endswith(records.SUFFIX_BGZF):
+        raise ValueError(
+            f"Cannot write changes to {path_output}, "
+            f"{records.SUFFIX_BGZF} output is indexed by VCV records, use .gz instead"
+        )
+    with tempfile.TemporaryDirectory() as tmpdir:
+        if sort:
+            paths = []
+            for i, path in enumerate((path_old, path_new)):
+                fmt = records.format_for_path(path)
+                paths.append(os.path.join(tmpdir, f"sorted-{i}.{fmt}"))
+                sort_records(path, paths[-1])
+            path_old, path_new = paths
+        written = 0
+        with records.RecordWriter(path_output, use_click=True) as writer:
+            for change in iter_changes(path_old, path_new):
+                writer.write(change)
+                written += 1
+    return written
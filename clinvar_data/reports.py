@@ -0,0 +1,135 @@
+"""Single-pass computation of several reports over converted ClinVar records.
+
+Each report is implemented as an ``Accumulator`` that is fed the ``VariationArchive``
+records one by one.  ``run()`` reads and parses the input only once and hands each
+record to all accumulators such that any combination of reports can be written in
+one pass.
+
+Accumulators that only count (and thus can combine partial results with ``merge()``)
+can also be run in several processes on line-aligned ranges of uncompressed or BGZF
+compressed JSONL input.
+"""
+
+import contextlib
+import copy
+import multiprocessing
+import sys
+import typing
+
+import tqdm
+
+from clinvar_data.io import projection, ranges, records
+from clinvar_data.pbs.clinvar_public_pb2 import VariationArchive
+
+
+class Accumulator:
+    """Base class for reports computed from a stream of ``VariationArchive`` records.
+
+    Accumulators must not modify the records passed to ``add()`` as they are shared
+    between all accumulators of a run.
+    """
+
+    #: Whether partial results can be combined with ``merge()``, which is required for
+    #: running in several processes.
+    mergeable: bool = False
+    #: Paths of the fields used by ``add()`` (see ``clinvar_data.io.projection``),
+    #: ``None`` for all fields.  Only these fields are parsed from JSON input.
+    fields: typing.Optional[typing.Sequence[str]] = None
+
+    def add(self, va: VariationArchive):
+        """Process the next record."""
+        raise NotImplementedError
+
+    def merge(self, other: "Accumulator"):
+        """Add the partial results of ``other`` (computed on another part of the input)."""
+        raise NotImplementedError
+
+    def finish(self):
+        """Called after the last record has been processed, e.g., to write out results."""
+
+    def close(self):
+        """Release resources such as open output files; called even on errors."""
+
+    def __enter__(self) -> "Accumulator":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def record_projection(
+    accumulators: typing.Sequence[Accumulator],
+) -> typing.Optional[projection.Projection]:
+    """Return the projection to the fields used by any of ``accumulators``, if restricted."""
+    paths: list[str] = []
+    for accumulator in accumulators:
+        if accumulator.fields is None:
+            return None
+        paths += accumulator.fields
+    return projection.compile_projection(VariationArchive.DESCRIPTOR, paths)
+
+
+def _process_range(
+    args: tuple[str, int, int, list[Accumulator]],
+) -> list[Accumulator]:
+    """Feed the records of one range of the input to fresh accumulators in a worker."""
+    path_input, start, end, accumulators = args
+    fields = record_projection(accumulators)
+    for line in ranges.iter_lines(path_input, start, end):
+        va = records.parse(line, VariationArchive(), fields)
+        for accumulator in accumulators:
+            accumulator.add(va)
+    return accumulators
+
+
+def _run_parallel(path_input: str, accumulators: typing.Sequence[Accumulator], processes: int):
+    """Process ranges of the input in ``processes`` worker processes and merge the results."""
+    # copies are taken before any merging so all workers start out empty
+    tasks = [
+        (path_input, start, end, copy.deepcopy(list(accumulators)))
+        for start, end in ranges.split(path_input, processes * 4)
+    ]
+    with multiprocessing.Pool(processes=processes) as pool:
+        for partials in tqdm.tqdm(
+            pool.imap_unordered(_process_range, tasks),
+            total=len(tasks),
+            desc="processing",
+            unit=" chunks",
+        ):
+            for accumulator, partial in zip(accumulators, partials):
+                accumulator.merge(partial)
+
+
+def run(path_input: str, accumulators: typing.Sequence[Accumulator], processes: int = 1):
+    """Read the records from ``path_input`` once and feed them to all ``accumulators``.
+
+    With ``processes > 1``, the input is processed in parallel if all accumulators are
+    mergeable and the input can be split; otherwise, a single process is used.
+    """
+    parallel = processes > 1
+    if parallel and not all(accumulator.mergeable for accumulator in accumulators):
+        print("Not all reports can be run in parallel, using one process", file=sys.stderr)
+        parallel = False
+    elif parallel and not ranges.is_splittable(path_input):
+        print(
+            "Input must be uncompressed or BGZF JSONL for parallel processing, using one process",
+            file=sys.stderr,
+        )
+        parallel = False
+
+    with contextlib.ExitStack() as stack:
+        for accumulator in accumulators:
+            stack.enter_context(accumulator)
+        if parallel:
+            _run_parallel(path_input, accumulators, processes)
+        else:
+            va: VariationArchive
+            for va in tqdm.tqdm(
+                records.iter_variation_archives(path_input, record_projection(accumulators)),
+                desc="processing",
+                unit=" records",
+            ):
+                for accumulator in accumulators:
+                    accumulator.add(va)
+        for accumulator in accumulators:
+            accumulator.finish()
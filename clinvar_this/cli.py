@@ -12,7 +12,12 @@ from clinvar_data import (
     extract_vars,
     gene_impact,
     phenotype_link,
+    regions,
+    release_diff,
+    reports,
 )
+from clinvar_data.conversion import incremental
+from clinvar_data.io import index, records
 from clinvar_this import batches, exceptions, version
 from clinvar_this.config import Config, dump_config, load_config, save_config
 
@@ -239,6 +244,42 @@ def data():
     default=True,
     help="Whether to show progress bar.",
 )
+@click.option(
+    "--jobs",
+    type=int,
+    default=1,
+    help="Number of worker processes for conversion (default: 1)",
+)
+@click.option(
+    "--parser",
+    type=click.Choice(conversion.parsing.PARSERS),
+    default=conversion.parsing.PARSER_XMLTODICT,
+    help="XML parser backend to use (default: xmltodict)",
+)
+@click.option(
+    "--normalization-cache",
+    required=False,
+    default=None,
+    help="Directory for caching normalization results across runs",
+)
+@click.option(
+    "--previous-output",
+    required=False,
+    default=None,
+    help="BGZF output with index of the previous release, only convert changed records",
+)
+@click.option(
+    "--changes-manifest",
+    required=False,
+    default=None,
+    help="Manifest of changed records with --previous-output (default: OUTPUT_FILE.changes.tsv)",
+)
+@click.option(
+    "--profile-converters",
+    required=False,
+    default=None,
+    help="Log call counts and times of the converters and write them as JSON to this path",
+)
 @click.pass_context
 def xml_to_jsonl(
     ctx: click.Context,
@@ -248,8 +289,48 @@ def xml_to_jsonl(
     fasta_ref_hg38: str,
     max_records: int,
     show_progress: bool,
+    jobs: int,
+    parser: str,
+    normalization_cache: typing.Optional[str],
+    previous_output: typing.Optional[str],
+    changes_manifest: typing.Optional[str],
+    profile_converters: typing.Optional[str],
 ):
-    """Convert XML to JSONL"""
+    """Convert XML to JSONL
+
+    Writes length-delimited binary protobuf instead if ``OUTPUT_FILE`` ends in ``.binpb``
+    (optionally followed by ``.gz``, ``.bgz``, or ``.zst``).  For ``.bgz`` output, BGZF
+    is written together with an index for ``clinvar-this data fetch``.
+
+    With ``--previous-output``, records that did not change since the previous release
+    are copied from its output and a manifest of the changes is written.
+
+    With ``--profile-converters``, the call counts and wall times of the converters,
+    XML parsing, normalization, and serialization are logged and written as JSON.
+    """
+    if profile_converters and (jobs > 1 or previous_output):
+        raise click.UsageError(
+            "--profile-converters is not supported with --jobs or --previous-output"
+        )
+    if previous_output:
+        if jobs > 1 or max_records:
+            raise click.UsageError(
+                "--jobs and --max-records are not supported with --previous-output"
+            )
+        ctx.exit(
+            incremental.convert_incremental(
+                input_file,
+                output_file,
+                previous_output,
+                manifest_file=changes_manifest,
+                use_click=True,
+                show_progress=show_progress,
+                fasta_ref_hg19=fasta_ref_hg19,
+                fasta_ref_hg38=fasta_ref_hg38,
+                parser=parser,
+                normalization_cache=normalization_cache,
+            )
+        )
     retcode = conversion.convert(
         input_file,
         output_file,
@@ -258,18 +339,47 @@ def xml_to_jsonl(
         show_progress=show_progress,
         fasta_ref_hg19=fasta_ref_hg19,
         fasta_ref_hg38=fasta_ref_hg38,
+        jobs=jobs,
+        parser=parser,
+        normalization_cache=normalization_cache,
+        profile_converters=profile_converters,
     )
     ctx.exit(retcode)
 
 
+@data.command("fetch")
+@click.argument("input_file")
+@click.argument("accessions", nargs=-1)
+@click.pass_context
+def cli_fetch(ctx: click.Context, input_file: str, accessions: typing.Tuple[str, ...]):
+    """Fetch records by VCV, RCV, or SCV accession from indexed ``.bgz`` file.
+
+    The records are written as JSONL to stdout.
+    """
+    with index.IndexReader(input_file + index.INDEX_SUFFIX) as index_reader:
+        for accession in accessions:
+            fetched = records.fetch_records(input_file, accession, index_reader)
+            if not fetched:
+                click.echo(f"Accession {accession} not found in index", err=True)
+                ctx.exit(1)
+            for record in fetched:
+                click.echo(records.serialize(record, records.FORMAT_JSONL))
+
+
 @data.command("gene-variant-report")
 @click.argument("input_file")
 @click.argument("output_file")
+@click.option(
+    "--processes",
+    type=int,
+    default=1,
+    help="Number of processes for uncompressed or BGZF input (default: 1)",
+)
 @click.pass_context
-def gene_impact_report(ctx: click.Context, input_file: str, output_file: str):
-    """Create a gene variant summary report."""
+def gene_impact_report(ctx: click.Context, input_file: str, output_file: str, processes: int):
+    """Create a gene variant summary report (JSONL or, with ``.npz`` suffix, NumPy arrays)."""
     _ = ctx
-    gene_impact.run_report(input_file, output_file)
+    gene_impact.run_report(input_file, output_file, processes=processes)
 
 
 @data.command("gene-phenotype-links")
@@ -299,12 +409,22 @@ def gene_phenotype_link(
     default=",".join(map(str, class_by_freq.DEFAULT_THRESHOLDS)),
     help="Whether to filter to rows with HPO terms (default: true)",
 )
+@click.option(
+    "--processes",
+    type=int,
+    default=1,
+    help="Number of processes for uncompressed or BGZF input (default: 1)",
+)
 @click.pass_context
-def acmg_class_by_freq(ctx: click.Context, input_file: str, output_file: str, thresholds: str):
+def acmg_class_by_freq(
+    ctx: click.Context, input_file: str, output_file: str, thresholds: str, processes: int
+):
     """Create links between gene and phenotype."""
     _ = ctx
     thresholds_float = list(map(float, thresholds.split(",")))
-    class_by_freq.run_report(input_file, output_file, thresholds=thresholds_float)
+    class_by_freq.run_report(
+        input_file, output_file, thresholds=thresholds_float, processes=processes
+    )
 
 
 @data.command("extract-vars")
@@ -313,8 +433,166 @@ def acmg_class_by_freq(ctx: click.Context, input_file: str, output_file: str, th
 @click.option(
     "--gzip-output/--no-gzip-output", default=True, help="Whether to gzip output (default: true)"
 )
+@click.option(
+    "--output-format",
+    type=click.Choice(extract_vars.OUTPUT_FORMATS),
+    default=extract_vars.FORMAT_JSONL,
+    help="Format of extracted variants, Parquet requires pyarrow (default: jsonl)",
+)
 @click.pass_context
-def cli_extract_vars(ctx: click.Context, path_input: str, path_output_dir: str, gzip_output: bool):
+def cli_extract_vars(
+    ctx: click.Context, path_input: str, path_output_dir: str, gzip_output: bool, output_format: str
+):
     """Write out variants from RCV records."""
     _ = ctx
-    extract_vars.run(path_input, path_output_dir, gzip_output)
+    extract_vars.run(path_input, path_output_dir, gzip_output, output_format)
+
+
+@data.command("reports")
+@click.argument("input_file")
+@click.option("--gene-variant-report", default=None, help="Write gene variant report to path")
+@click.option("--gene-phenotype-links", default=None, help="Write gene to phenotype links to path")
+@click.option(
+    "--needs-hpo-terms/--no-needs-hpo-terms",
+    type=bool,
+    default=True,
+    help="Whether to filter phenotype links to rows with HPO terms (default: true)",
+)
+@click.option(
+    "--acmg-class-by-freq", default=None, help="Write ACMG class by frequency report to path"
+)
+@click.option(
+    "--thresholds",
+    type=str,
+    default=",".join(map(str, class_by_freq.DEFAULT_THRESHOLDS)),
+    help="Frequency thresholds for the ACMG class by frequency report",
+)
+@click.option(
+    "--extract-vars",
+    "extract_vars_dir",
+    default=None,
+    help="Write extracted variants to directory",
+)
+@click.option(
+    "--gzip-output/--no-gzip-output",
+    default=True,
+    help="Whether to gzip extracted variants (default: true)",
+)
+@click.option(
+    "--output-format",
+    type=click.Choice(extract_vars.OUTPUT_FORMATS),
+    default=extract_vars.FORMAT_JSONL,
+    help="Format of extracted variants, Parquet requires pyarrow (default: jsonl)",
+)
+@click.option(
+    "--processes",
+    type=int,
+    default=1,
+    help="Number of processes if only counting reports are requested (default: 1)",
+)
+@click.pass_context
+def cli_reports(
+    ctx: click.Context,
+    input_file: str,
+    gene_variant_report: typing.Optional[str],
+    gene_phenotype_links: typing.Optional[str],
+    needs_hpo_terms: bool,
+    acmg_class_by_freq: typing.Optional[str],
+    thresholds: str,
+    extract_vars_dir: typing.Optional[str],
+    gzip_output: bool,
+    output_format: str,
+    processes: int,
+):
+    """Create several reports in a single pass over the input."""
+    _ = ctx
+    accumulators: typing.List[reports.Accumulator] = []
+    if gene_variant_report:
+        accumulators.append(gene_impact.GeneImpactAccumulator(gene_variant_report))
+    if gene_phenotype_links:
+        accumulators.append(
+            phenotype_link.PhenotypeLinkAccumulator(gene_phenotype_links, needs_hpo_terms)
+        )
+    if acmg_class_by_freq:
+        thresholds_float = list(map(float, thresholds.split(",")))
+        accumulators.append(
+            class_by_freq.ClassByFreqAccumulator(thresholds_float, acmg_class_by_freq)
+        )
+    if extract_vars_dir:
+        accumulators.append(
+            extract_vars.ExtractVarsAccumulator(extract_vars_dir, gzip_output, output_format)
+        )
+    if not accumulators:
+        raise click.UsageError("At least one report output must be given")
+    reports.run(input_file, accumulators, processes=processes)
+
+
+@data.command("index-vars")
+@click.argument("path_input")
+@click.argument("path_output")
+@click.pass_context
+def cli_index_vars(ctx: click.Context, path_input: str, path_output: str):
+    """Sort extracted variants by coordinate and write tabix-indexed ``PATH_OUTPUT``.
+
+    ``PATH_INPUT`` is a file written by ``extract-vars``, ``PATH_OUTPUT`` should end
+    in ``.gz``.
+    """
+    _ = ctx
+    regions.sort_and_index(path_input, path_output)
+
+
+@data.command("query-region")
+@click.argument("path_input")
+@click.argument("regions_", metavar="REGIONS", nargs=-1, required=True)
+@click.pass_context
+def cli_query_region(ctx: click.Context, path_input: str, regions_: typing.Tuple[str, ...]):
+    """Write extracted variants overlapping ``REGIONS`` (e.g., ``chr1:1000-2000``) as JSONL.
+
+    ``PATH_INPUT`` is a file written by ``index-vars``.
+    """
+    _ = ctx
+    with regions.RegionIndex(path_input) as region_index:
+        for region in regions_:
+            try:
+                interval = regions.parse_region(region)
+            except ValueError as e:
+                raise click.BadParameter(str(e))
+            for line in region_index.fetch_lines(interval):
+                click.echo(line)
+
+
+@data.command("diff")
+@click.argument("path_old")
+@click.argument("path_new")
+@click.option(
+    "--output",
+    "path_output",
+    default="-",
+    help=("Output file, JSONL or binary protobuf depending on suffix, not .bgz (default: stdout)"),
+)
+@click.option(
+    "--sort/--no-sort",
+    default=False,
+    help="Sort the inputs by accession first (default: inputs must be sorted)",
+)
+@click.pass_context
+def cli_diff(ctx: click.Context, path_old: str, path_new: str, path_output: str, sort: bool):
+    """Write the changes of VCVs, classifications, and SCVs from ``PATH_OLD`` to ``PATH_NEW``.
+
+    Both are outputs of ``xml-to-jsonl`` sorted by VCV accession, see ``sort-records``.
+    """
+    _ = ctx
+    try:
+        release_diff.run(path_old, path_new, path_output, sort=sort)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+
+
+@data.command("sort-records")
+@click.argument("path_input")
+@click.argument("path_output")
+@click.pass_context
+def cli_sort_records(ctx: click.Context, path_input: str, path_output: str):
+    """Sort the output of ``xml-to-jsonl`` by VCV accession for ``diff``."""
+    _ = ctx
+    release_diff.sort_records(path_input, path_output)
@@ -29,6 +29,15 @@ with open("CHANGELOG.md") as history_file:
 
 test_requirements = parse_requirements("requirements/test.txt")
 install_requirements = parse_requirements("requirements/base.txt")
+#: Optional dependencies of ``clinvar_data`` by extra name.
+extras_requirements = {
+    "parquet": ["pyarrow"],
+    "zstd": ["zstandard"],
+    "fast-json": ["orjson"],
+}
+extras_requirements["all"] = sorted(
+    {requirement for requirements in extras_requirements.values() for requirement in requirements}
+)
 
 
 package_root = os.path.abspath(os.path.dirname(__file__))
@@ -54,6 +63,7 @@ setup(
     description="ClinVar Submission via API Made Easy",
     entry_points={"console_scripts": ["clinvar-this=clinvar_this.cli:cli"]},
     install_requires=install_requirements,
+    extras_require=extras_requirements,
     license="MIT license",
     long_description=readme + "\n\n" + history,
     long_description_content_type="text/markdown",
@@ -1,5 +1,7 @@
 import os
+import random
 
+import pysam
 import pytest
 
 
@@ -11,3 +13,20 @@ def use_utc_time():
     yield
     if curr_time:
         os.environ["TZ"] = curr_time
+
+
+@pytest.fixture
+def fasta_path(tmp_path):
+    """Write a small random FASTA file with index and return its path."""
+    rng = random.Random(42)
+    path = f"{tmp_path}/ref.fa"
+    with open(path, "wt") as outputf:
+        for name, length in (("chr1", 1000), ("chr2", 123)):
+            seq = "".join(rng.choice("ACGT") for _ in range(length))
+            # homopolymer run for left-alignment
+            seq = seq[:100] + "AAAAAAAAAA" + seq[110:]
+            print(f">{name}", file=outputf)
+            for i in range(0, len(seq), 60):
+                print(seq[i : i + 60], file=outputf)
+    pysam.faidx(path)
+    return path
@@ -1,4 +1,10 @@
+import random
+
+import numpy as np
+import pytest
+
 from clinvar_data import class_by_freq
+from clinvar_data.pbs.class_by_freq import CoarseClinicalSignificance
 
 
 def test_smoke_test_run(tmpdir, snapshot):
@@ -8,3 +14,42 @@ def test_smoke_test_run(tmpdir, snapshot):
 
     with open(path_output, "rt") as outputf:
         snapshot.assert_match(outputf.read(), "output.jsonl")
+
+
+@pytest.mark.parametrize(
+    "thresholds",
+    [
+        class_by_freq.DEFAULT_THRESHOLDS,
+        [i / 500 for i in range(501)],
+        [0.5, 0.1, 0.25, 1.0],
+        [],
+    ],
+)
+def test_locate_all(thresholds):
+    rng = random.Random(42)
+    values = [rng.random() for _ in range(1000)] + thresholds + [None, 0.0, 1.0, 2.0]
+    expected = [class_by_freq.locate(thresholds, value) for value in values]
+    array = np.array([np.nan if value is None else value for value in values])
+    assert class_by_freq.locate_all(thresholds, array).tolist() == expected
+
+
+def test_class_by_freq_counter_merge():
+    pathogenic = CoarseClinicalSignificance.COARSE_CLINICAL_SIGNIFICANCE_PATHOGENIC
+    benign = CoarseClinicalSignificance.COARSE_CLINICAL_SIGNIFICANCE_BENIGN
+    thresholds = [0.0, 0.01, 0.1, 1.0]
+    first = class_by_freq.ClassByFreqCounter(thresholds)
+    first.add("HGNC:1", pathogenic, None)
+    first.add("HGNC:1", pathogenic, 0.005)
+    first.add("HGNC:2", benign, 0.5)
+    second = class_by_freq.ClassByFreqCounter(thresholds)
+    second.add("HGNC:3", benign, 0.0)
+    second.add("HGNC:1", pathogenic, 0.01)
+
+    first.merge(second)
+
+    counts = first.to_dict()
+    assert sorted(counts) == ["HGNC:1", "HGNC:2", "HGNC:3"]
+    assert counts["HGNC:1"][pathogenic] == [1, 2, 0, 0, 0]
+    assert counts["HGNC:1"][benign] == [0, 0, 0, 0, 0]
+    assert counts["HGNC:2"][benign] == [0, 0, 0, 1, 0]
+    assert counts["HGNC:3"][benign] == [1, 0, 0, 0, 0]
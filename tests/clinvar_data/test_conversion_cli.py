@@ -2,7 +2,10 @@
 
 import os
 
+import pytest
+
 from clinvar_data import conversion
+from clinvar_data.conversion import parallel
 
 
 def test_cli_xml_to_json(tmp_path, snapshot):
@@ -16,3 +19,27 @@ def test_cli_xml_to_json(tmp_path, snapshot):
 
     with open(out_path, "rt") as output_f:
         snapshot.assert_match(output_f.read(), "one_record.jsonl")
+
+
+@pytest.mark.parametrize("max_records", [0, 3])
+def test_convert_parallel_matches_serial(max_records, tmp_path):
+    in_path = os.path.dirname(__file__) + "/data/ten_records.xml"
+    out_serial = f"{tmp_path}/serial.jsonl"
+    out_parallel = f"{tmp_path}/parallel.jsonl"
+    assert conversion.convert(in_path, out_serial, max_records=max_records) == 0
+    assert conversion.convert(in_path, out_parallel, max_records=max_records, jobs=2) == 0
+
+    with open(out_serial, "rt") as serial_f, open(out_parallel, "rt") as parallel_f:
+        serial_lines = serial_f.readlines()
+        assert serial_lines
+        assert parallel_f.readlines() == serial_lines
+
+
+def test_iter_variation_archive_chunks():
+    in_path = os.path.dirname(__file__) + "/data/ten_records.xml"
+    with open(in_path, "rb") as inputf:
+        chunks = list(parallel.iter_variation_archive_chunks(inputf, read_size=100))
+    assert len(chunks) == 10
+    for chunk in chunks:
+        assert chunk.startswith(b"<VariationArchive ")
+        assert chunk.endswith(b"</VariationArchive>")
@@ -0,0 +1,63 @@
+"""Tests for the XML parser backends of the conversion."""
+
+import io
+
+import pytest
+
+from clinvar_data.conversion import parsing
+
+#: Small document with namespace declarations and namespaced attributes.
+XML_WITH_NS = b"""<?xml version="1.0" encoding="UTF-8"?>
+<Root xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" xsi:noNamespaceSchemaLocation="x.xsd">
+  <VariationArchive Accession="VCV1">
+    <Comment xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" Type="public">text</Comment>
+    <Item xsi:type="foo">one</Item>
+    <Item>two <b>bold</b> tail</Item>
+    <Empty/>
+    <xsi:Extra xsi:type="bar">three</xsi:Extra>
+  </VariationArchive>
+  <VariationArchive Accession="VCV2"/>
+</Root>
+"""
+
+
+def _parse_all(inputf, parser):
+    result = []
+    parsing.parse_stream(inputf, lambda item: result.append(item) or True, parser)
+    return result
+
+
+def test_iterparse_namespaces():
+    expected = _parse_all(io.BytesIO(XML_WITH_NS), parsing.PARSER_XMLTODICT)
+    assert expected[0]["VariationArchive"]["Item"][0] == {"@xsi:type": "foo", "#text": "one"}
+    assert _parse_all(io.BytesIO(XML_WITH_NS), parsing.PARSER_ITERPARSE) == expected
+
+
+def test_iterparse_namespace_prefixes_per_document():
+    for prefix in ("a", "b"):
+        xml = (
+            f'<Root xmlns:{prefix}="urn:x"><VariationArchive {prefix}:attr="1">'
+            f"<{prefix}:Child>text</{prefix}:Child></VariationArchive></Root>"
+        ).encode()
+        (item,) = _parse_all(io.BytesIO(xml), parsing.PARSER_ITERPARSE)
+        assert item == {"VariationArchive": {f"@{prefix}:attr": "1", f"{prefix}:Child": "text"}}
+
+
+@pytest.mark.parametrize("fname", ["ten_records.xml", "ex_kynu.xml", "records_with_hpo.xml"])
+def test_parsers_equal(fname):
+    path = f"tests/clinvar_data/data/{fname}"
+    with open(path, "rb") as inputf:
+        expected = _parse_all(inputf, parsing.PARSER_XMLTODICT)
+    with open(path, "rb") as inputf:
+        assert _parse_all(inputf, parsing.PARSER_ITERPARSE) == expected
+
+
+def test_parse_stream_interrupted():
+    path = "tests/clinvar_data/data/ten_records.xml"
+    for parser in parsing.PARSERS:
+        result = []
+        with open(path, "rb") as inputf:
+            assert not parsing.parse_stream(
+                inputf, lambda item: result.append(item) or len(result) < 3, parser
+            )
+        assert len(result) == 3
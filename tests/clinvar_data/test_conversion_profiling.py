@@ -0,0 +1,55 @@
+"""Tests for the ``clinvar_data.conversion.profiling`` module."""
+
+import json
+import os
+import time
+
+import pytest
+
+from clinvar_data import conversion
+from clinvar_data.conversion import dict_to_pb, profiling
+
+
+def test_installed_restores_converters():
+    profile = profiling.ConverterProfile()
+    original = vars(dict_to_pb.ConvertVariationArchive)["xmldict_data_to_pb"]
+    with profile.installed():
+        assert vars(dict_to_pb.ConvertVariationArchive)["xmldict_data_to_pb"] is not original
+    assert vars(dict_to_pb.ConvertVariationArchive)["xmldict_data_to_pb"] is original
+
+
+def test_section_nested():
+    profile = profiling.ConverterProfile()
+    with profile.section("outer"):
+        for _ in range(2):
+            with profile.section("inner"):
+                time.sleep(0.01)
+    assert profile.calls == {"outer": 1, "inner": 2}
+    assert profile.total["inner"] >= 0.02
+    assert profile.own["outer"] == pytest.approx(profile.total["outer"] - profile.total["inner"])
+    assert [entry.name for entry in profile.entries()] == ["inner", "outer"]
+
+
+def test_convert_profile_converters(tmp_path):
+    in_path = os.path.dirname(__file__) + "/data/ten_records.xml"
+    out_path = f"{tmp_path}/ten_records.jsonl"
+    profile_path = f"{tmp_path}/profile.json"
+    assert conversion.convert(in_path, out_path, profile_converters=profile_path) == 0
+
+    with open(profile_path, "rt") as inputf:
+        entries = {entry["name"]: entry for entry in json.load(inputf)}
+    assert entries["ConvertVariationArchive"]["calls"] == 10
+    assert entries[profiling.SECTION_NORMALIZATION]["calls"] == 10
+    assert entries[profiling.SECTION_SERIALIZATION]["calls"] == 10
+    assert entries[profiling.SECTION_XML_PARSE]["calls"] == 1
+    assert sum(entry["own"] for entry in entries.values()) == pytest.approx(
+        entries[profiling.SECTION_XML_PARSE]["total"]
+    )
+
+
+def test_convert_profile_converters_jobs(tmp_path):
+    in_path = os.path.dirname(__file__) + "/data/ten_records.xml"
+    with pytest.raises(ValueError):
+        conversion.convert(
+            in_path, f"{tmp_path}/out.jsonl", jobs=2, profile_converters=f"{tmp_path}/p.json"
+        )
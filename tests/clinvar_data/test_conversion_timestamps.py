@@ -0,0 +1,45 @@
+import time
+
+import pytest
+
+from clinvar_data.conversion import timestamps
+from clinvar_data.conversion.dict_to_pb import ConvertBaseAttribute
+
+
+@pytest.fixture
+def non_utc_time(monkeypatch):
+    """Use a local time zone that is not UTC."""
+    monkeypatch.setenv("TZ", "America/New_York")
+    time.tzset()
+    timestamps.parse_seconds.cache_clear()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+@pytest.mark.parametrize(
+    "value,expected",
+    [
+        ("1970-01-01", 0),
+        ("2020-09-27", 1601164800),
+        ("1969-12-31", -86400),
+        ("2020-09-27T00:00:00", 1601164800),
+        ("2020-09-27T12:30:00Z", 1601209800),
+        ("2020-09-27T08:30:00-04:00", 1601209800),
+    ],
+)
+def test_parse_seconds(value, expected, non_utc_time):
+    assert timestamps.parse_seconds(value) == expected
+    # memoized result
+    assert timestamps.parse_seconds(value) == expected
+
+
+@pytest.mark.parametrize("value", ["2020-13-01", "2020-02-30", "not a date"])
+def test_parse_seconds_invalid(value):
+    with pytest.raises(ValueError):
+        timestamps.parse_seconds(value)
+
+
+def test_convert_base_attribute_non_utc(non_utc_time):
+    result = ConvertBaseAttribute.xmldict_data_to_pb({"Attribute": {"@dateValue": "2020-09-27"}})
+    assert result.date_value.seconds == 1601164800
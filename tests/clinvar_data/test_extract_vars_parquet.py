@@ -0,0 +1,87 @@
+import json
+import os
+
+from google.protobuf.json_format import ParseDict
+import pytest
+
+from clinvar_data import extract_vars, extract_vars_parquet
+from clinvar_data.pbs.extracted_vars import ExtractedVcvRecord
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+def test_run_parquet(tmpdir):
+    extract_vars.run(
+        "tests/clinvar_data/data/ex_kynu.jsonl",
+        str(tmpdir),
+        gzip_output=False,
+        output_format=extract_vars.FORMAT_PARQUET,
+    )
+
+    path = os.path.join(tmpdir, "clinvar-variants-grch38-seqvars.parquet")
+    table = pq.read_table(path)
+    assert table.schema == extract_vars_parquet.schema()
+    rows = table.to_pylist()
+    assert len(rows) == 1
+    row = rows[0]
+    assert row["accession"] == "VCV000978270"
+    assert row["version"] == 1
+    assert row["variation_type"] == "VARIATION_TYPE_SNV"
+    assert (row["assembly"], row["chrom"], row["sequence_accession"]) == (
+        "GRCh38",
+        "2",
+        "NC_000002.12",
+    )
+    assert (
+        row["position_vcf"],
+        row["reference_allele_vcf"],
+        row["alternate_allele_vcf"],
+    ) == (142927694, "G", "C")
+    assert row["reference_allele"] is None
+    assert row["hgnc_ids"] == ["HGNC:6469"]
+    assert row["germline_classification"] == "Pathogenic"
+    assert row["germline_date_last_evaluated"].isoformat() == "2012-01-07T00:00:00+00:00"
+    assert row["oncogenicity_classification"] is None
+    assert row["rcvs"] == [
+        {
+            "accession": "RCV001256675",
+            "version": 1,
+            "title": "NM_003937.3(KYNU):c.326G>C (p.Trp109Ser) AND Catel-Manzke syndrome",
+            "germline_classification": "Pathogenic",
+            "germline_review_status": (
+                "AGGREGATE_GERMLINE_REVIEW_STATUS_CRITERIA_PROVIDED_SINGLE_SUBMITTER"
+            ),
+            "oncogenicity_classification": None,
+            "oncogenicity_review_status": None,
+        }
+    ]
+    assert [
+        (scv["accession"], scv["classification"], scv["review_status"])
+        for scv in row["clinical_assertions"]
+    ] == [
+        (
+            "SCV001433049",
+            "Pathogenic",
+            "SUBMITTER_REVIEW_STATUS_CRITERIA_PROVIDED_SINGLE_SUBMITTER",
+        )
+    ]
+
+    # predicate pushdown and column projection
+    assert pq.read_table(path, columns=["accession"], filters=[("chrom", "=", "1")]).num_rows == 0
+
+
+def test_parquet_record_writer_batches(tmpdir):
+    path_jsonl = "tests/clinvar_data/snapshots/test_extract_vars/test_smoke_test_run/ex_kynu.jsonl"
+    with open(os.path.join(path_jsonl, "clinvar-variants-grch37-seqvars.jsonl"), "rt") as inputf:
+        record = ExtractedVcvRecord()
+        ParseDict(json.loads(inputf.readline()), record)
+
+    path = str(tmpdir / "out.parquet")
+    with extract_vars_parquet.ParquetRecordWriter(path, batch_size=2) as writer:
+        for _ in range(5):
+            writer.write(record)
+        assert writer.buffered == 1
+
+    parquet_file = pq.ParquetFile(path)
+    assert parquet_file.metadata.num_rows == 5
+    assert parquet_file.metadata.num_row_groups == 3
@@ -1,4 +1,5 @@
 from clinvar_data import gene_impact
+from clinvar_data.pbs.gene_impact import ClinicalSignificance, GeneImpact
 
 
 def test_smoke_test_run(tmpdir, snapshot):
@@ -8,3 +9,40 @@ def test_smoke_test_run(tmpdir, snapshot):
 
     with open(path_output, "rt") as outputf:
         snapshot.assert_match(outputf.read(), "output.jsonl")
+
+
+def test_gene_impact_counter_merge():
+    missense = GeneImpact.GENE_IMPACT_MISSENSE_VARIANT
+    stop_gained = GeneImpact.GENE_IMPACT_STOP_GAINED
+    pathogenic = ClinicalSignificance.CLINICAL_SIGNIFICANCE_PATHOGENIC
+    benign = ClinicalSignificance.CLINICAL_SIGNIFICANCE_BENIGN
+    first = gene_impact.GeneImpactCounter()
+    first.add("HGNC:1", missense, pathogenic)
+    first.add("HGNC:1", missense, pathogenic)
+    first.add("HGNC:2", stop_gained, benign)
+    second = gene_impact.GeneImpactCounter()
+    second.add("HGNC:3", missense, benign)
+    second.add("HGNC:1", missense, pathogenic)
+
+    first.merge(second)
+
+    counts = first.to_dict()
+    assert sorted(counts) == ["HGNC:1", "HGNC:2", "HGNC:3"]
+    assert counts["HGNC:1"][(missense, pathogenic)] == 3
+    assert counts["HGNC:2"][(stop_gained, benign)] == 1
+    assert counts["HGNC:3"][(missense, benign)] == 1
+    assert sum(counts["HGNC:1"].values()) == 3
+    assert gene_impact.GeneImpactCounter.from_dict(counts).to_dict() == counts
+
+
+def test_run_report_npz(tmpdir):
+    path_input = "tests/clinvar_data/data/ten_records.jsonl"
+    gene_impact.run_report(path_input, f"{tmpdir}/output.jsonl")
+    gene_impact.run_report(path_input, f"{tmpdir}/output.npz")
+
+    counter = gene_impact.GeneImpactCounter.load_npz(f"{tmpdir}/output.npz")
+    assert counter.to_dict() == gene_impact.generate_counts(path_input)
+    gene_impact.write_report(counter, f"{tmpdir}/from_npz.jsonl")
+    with open(f"{tmpdir}/output.jsonl", "rt") as expectedf:
+        with open(f"{tmpdir}/from_npz.jsonl", "rt") as actualf:
+            assert actualf.read() == expectedf.read()
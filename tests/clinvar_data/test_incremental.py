@@ -0,0 +1,141 @@
+"""Tests for incremental conversion based on the previous conversion."""
+
+import os
+
+from click.testing import CliRunner
+import pytest
+
+from clinvar_data import conversion
+from clinvar_data.conversion import incremental, parallel
+from clinvar_data.io import index, records
+from clinvar_this import cli
+
+#: Path to the previous release.
+PATH_XML = os.path.dirname(__file__) + "/data/ten_records.xml"
+
+
+@pytest.fixture
+def new_release(tmp_path):
+    """Write a new release with an added, a removed, and two updated VCVs."""
+    with open(PATH_XML, "rt") as inputf:
+        xml = inputf.read()
+    for old, new in (
+        ('Accession="VCV000000002" Version="3"', 'Accession="VCV000000002" Version="4"'),
+        (
+            'Accession="VCV000000006" Version="1" NumberOfSubmissions="1" '
+            'NumberOfSubmitters="1" DateLastUpdated="2022-04-25"',
+            'Accession="VCV000000006" Version="1" NumberOfSubmissions="1" '
+            'NumberOfSubmitters="1" DateLastUpdated="2023-01-01"',
+        ),
+        ('Accession="VCV000000003"', 'Accession="VCV900000003"'),
+    ):
+        assert old in xml
+        xml = xml.replace(old, new)
+    path = f"{tmp_path}/new.xml"
+    with open(path, "wt") as outputf:
+        outputf.write(xml)
+    return path
+
+
+def _read(path):
+    with open(path, "rb") as inputf:
+        return inputf.read()
+
+
+def test_chunk_state_matches_record_state():
+    with open(PATH_XML, "rb") as inputf:
+        chunks = list(parallel.iter_variation_archive_chunks(inputf))
+    for chunk in chunks:
+        va = conversion.convert_variation_archive(conversion.parsing.parse_chunk(chunk))
+        attributes = incremental.chunk_attributes(chunk)
+        assert attributes["Accession"] == va.accession
+        assert incremental.chunk_state(attributes) == index.record_state(va)
+
+
+@pytest.mark.parametrize("suffix", ["jsonl.bgz", "binpb.bgz"])
+def test_convert_incremental(suffix, new_release, tmp_path, monkeypatch):
+    path_prev = f"{tmp_path}/prev.{suffix}"
+    path_full = f"{tmp_path}/full.{suffix}"
+    path_incr = f"{tmp_path}/incr.{suffix}"
+    assert conversion.convert(PATH_XML, path_prev, show_progress=False) == 0
+    assert conversion.convert(new_release, path_full, show_progress=False) == 0
+
+    converted = []
+    convert_chunk = parallel.convert_chunk
+
+    def counting_convert_chunk(chunk, *args, **kwargs):
+        converted.append(incremental.chunk_attributes(chunk)["Accession"])
+        return convert_chunk(chunk, *args, **kwargs)
+
+    monkeypatch.setattr(parallel, "convert_chunk", counting_convert_chunk)
+    # the previous index is only looked up, never loaded as a whole
+    monkeypatch.delattr(index.IndexReader, "iter_entries")
+    assert (
+        incremental.convert_incremental(new_release, path_incr, path_prev, show_progress=False) == 0
+    )
+
+    assert sorted(converted) == ["VCV000000002", "VCV000000006", "VCV900000003"]
+    assert _read(path_incr) == _read(path_full)
+    assert _read(path_incr + index.INDEX_SUFFIX) == _read(path_full + index.INDEX_SUFFIX)
+    with open(path_incr + incremental.MANIFEST_SUFFIX, "rt") as inputf:
+        assert inputf.read().splitlines() == [
+            "#change\taccession\tversion",
+            "updated\tVCV000000002\t4",
+            "updated\tVCV000000006\t1",
+            "added\tVCV900000003\t1",
+            "removed\tVCV000000003\t1",
+        ]
+
+
+def test_previous_vcv(tmp_path):
+    path = f"{tmp_path}/prev.jsonl.bgz.idx"
+    writer = index.IndexWriter(path)
+    # two records of the same VCV from expanded IUPAC codes
+    writer.add([("VCV000000002", 3), ("SCV000000003", 1)], 0, 100, "state")
+    writer.add([("VCV000000002", 3), ("SCV000000003", 1)], 100, 50, "state")
+    writer.add([("VCV000000004", 1)], 150, 10, "other")
+    writer.close()
+    with index.IndexReader(path) as index_reader:
+        keys = [("VCV000000002", 3), ("SCV000000003", 1)]
+        assert incremental.previous_vcv(index_reader, "VCV000000002") == incremental.PreviousVcv(
+            3,
+            "state",
+            [incremental.PreviousRecord(0, 100, keys), incremental.PreviousRecord(100, 50, keys)],
+        )
+        assert incremental.previous_vcv(index_reader, "SCV000000003") is None
+        assert list(index_reader.iter_vcvs()) == [("VCV000000002", 3), ("VCV000000004", 1)]
+
+
+def test_convert_incremental_requires_same_format(tmp_path):
+    path_prev = f"{tmp_path}/prev.jsonl.bgz"
+    assert conversion.convert(PATH_XML, path_prev, show_progress=False) == 0
+    with pytest.raises(ValueError):
+        incremental.convert_incremental(PATH_XML, f"{tmp_path}/out.binpb.bgz", path_prev)
+    with pytest.raises(ValueError):
+        incremental.convert_incremental(PATH_XML, f"{tmp_path}/out.jsonl", f"{tmp_path}/x.jsonl")
+
+
+def test_cli_xml_to_jsonl_incremental(new_release, tmp_path):
+    path_prev = f"{tmp_path}/prev.jsonl.bgz"
+    path_incr = f"{tmp_path}/incr.jsonl.bgz"
+    path_manifest = f"{tmp_path}/changes.tsv"
+    assert conversion.convert(PATH_XML, path_prev, show_progress=False) == 0
+
+    runner = CliRunner()
+    result = runner.invoke(
+        cli.cli,
+        [
+            "data",
+            "xml-to-jsonl",
+            "--no-show-progress",
+            "--previous-output",
+            path_prev,
+            "--changes-manifest",
+            path_manifest,
+            new_release,
+            path_incr,
+        ],
+    )
+    assert result.exit_code == 0, result.output
+    assert len(list(records.iter_variation_archives(path_incr))) == 10
+    assert os.path.exists(path_manifest)
@@ -0,0 +1,107 @@
+import json
+
+from google.protobuf import struct_pb2
+from google.protobuf.json_format import (
+    MessageToDict,
+    MessageToJson,
+    ParseDict,
+    ParseError,
+)
+import pytest
+
+from clinvar_data.io import json_codec, records
+from clinvar_data.pbs.clinvar_public_pb2 import Allele, VariationArchive
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        "tests/clinvar_data/data/ex_kynu.jsonl",
+        "tests/clinvar_data/data/records_with_hpo.jsonl",
+        "tests/clinvar_data/data/records_with_maf.jsonl",
+        "tests/clinvar_data/data/ten_records.jsonl",
+    ],
+)
+def test_dumps_same_as_message_to_dict(path):
+    for va in records.iter_variation_archives(path):
+        assert json_codec.dumps(va) == json.dumps(MessageToDict(va))
+        assert json_codec.dumps(va) == MessageToJson(va, indent=None)
+
+
+def test_message_to_dict_scalars():
+    va = VariationArchive(variation_id=12345678901, accession="VCV000000001")
+    va.date_created.seconds = 1_700_000_000
+    gene = va.classified_record.simple_allele.genes.add(gene_id=1, omims=[2**63])
+    gene.hgnc_id = "HGNC:1"
+    va.classified_record.simple_allele.global_minor_allele_frequency.value = 0.1
+    result = json_codec.message_to_dict(va)
+    assert result == MessageToDict(va)
+    assert result["variationId"] == "12345678901"
+    assert result["dateCreated"] == "2023-11-14T22:13:20Z"
+
+
+@pytest.mark.parametrize("value", [float("inf"), float("-inf"), float("nan"), 1e-300, 1e-05])
+def test_message_to_dict_special_floats(value):
+    frequency = Allele.GlobalMinorAlleleFrequency(value=value)
+    assert json_codec.dumps(frequency) == json.dumps(MessageToDict(frequency))
+
+
+def test_dumps_escapes_non_ascii():
+    va = VariationArchive(accession="VCV000000001", variation_name="c.1A>G (Ménétrier)")
+    assert json_codec.dumps(va) == MessageToJson(va, indent=None)
+    assert "\\u00e9" in json_codec.dumps(va)
+
+
+def test_message_to_dict_well_known_types():
+    struct = struct_pb2.Struct()
+    struct.update({"a": [1, "b", None], "c": {"d": True}})
+    assert json_codec.message_to_dict(struct) == MessageToDict(struct)
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        "tests/clinvar_data/data/ex_kynu.jsonl",
+        "tests/clinvar_data/data/records_with_hpo.jsonl",
+        "tests/clinvar_data/data/ten_records.jsonl",
+    ],
+)
+def test_loads_same_as_parse_dict(path):
+    with open(path, "rt") as inputf:
+        for line in inputf:
+            expected = ParseDict(json.loads(line), VariationArchive())
+            assert json_codec.loads(line, VariationArchive()) == expected
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        {"variation_id": 1, "record_status": 1},
+        {"variationId": 1.0, "dateCreated": None},
+        {"recordType": "RECORD_TYPE_CLASSIFIED", "classifiedRecord": None},
+        {"classifiedRecord": {"simpleAllele": {"genes": [{"omims": ["1", 2]}]}}},
+        {"classifiedRecord": {"simpleAllele": {"globalMinorAlleleFrequency": {"value": "NaN"}}}},
+    ],
+)
+def test_parse_dict_fallback(value):
+    assert json_codec.parse_dict(value, VariationArchive()) == ParseDict(value, VariationArchive())
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        {"noSuchField": 1},
+        {"variationId": "x"},
+        {"variationId": -(2**70)},
+        {"accession": 1},
+        {"recordType": "NO_SUCH_VALUE"},
+        {"dateCreated": "yesterday"},
+        {"classifiedRecord": 1},
+        {"classifiedRecord": {"simpleAllele": {"genes": [None]}}},
+    ],
+)
+def test_parse_dict_error(value):
+    with pytest.raises(ParseError):
+        ParseDict(value, VariationArchive())
+    with pytest.raises(ParseError):
+        json_codec.parse_dict(value, VariationArchive())
@@ -0,0 +1,79 @@
+import pytest
+
+from clinvar_data import class_by_freq, gene_impact, phenotype_link
+from clinvar_data.io import projection, records
+from clinvar_data.pbs.clinvar_public_pb2 import VariationArchive
+
+
+def test_compile_projection():
+    result = projection.compile_projection(
+        VariationArchive.DESCRIPTOR,
+        ["accession", "classified_record.simple_allele.genes.hgnc_id"],
+    )
+    assert result["accession"] is None
+    assert result["classifiedRecord"] is result["classified_record"]
+    assert result["classifiedRecord"]["simpleAllele"]["genes"] == {
+        "hgncId": None,
+        "hgnc_id": None,
+    }
+
+
+def test_compile_projection_whole_field_wins():
+    for paths in (
+        ["classified_record.simple_allele.genes.hgnc_id", "classified_record.simple_allele"],
+        ["classified_record.simple_allele", "classified_record.simple_allele.genes.hgnc_id"],
+    ):
+        result = projection.compile_projection(VariationArchive.DESCRIPTOR, paths)
+        assert result["classifiedRecord"]["simpleAllele"] is None
+
+
+@pytest.mark.parametrize("path", ["no_such_field", "accession.value", "classified_record.x"])
+def test_compile_projection_invalid(path):
+    with pytest.raises(ValueError):
+        projection.compile_projection(VariationArchive.DESCRIPTOR, [path])
+
+
+def test_prune():
+    fields = projection.compile_projection(
+        VariationArchive.DESCRIPTOR, ["classified_record.simple_allele.genes.hgnc_id"]
+    )
+    data = {
+        "accession": "VCV000000001",
+        "classifiedRecord": {
+            "simpleAllele": {"genes": [{"hgncId": "HGNC:1", "symbol": "A"}, {"symbol": "B"}]},
+            "clinicalAssertions": [{"id": "1"}],
+        },
+    }
+    assert projection.prune(data, fields) == {
+        "classifiedRecord": {"simpleAllele": {"genes": [{"hgncId": "HGNC:1"}, {}]}}
+    }
+
+
+@pytest.mark.parametrize(
+    "inputf", ["ten_records.jsonl", "records_with_hpo.jsonl", "records_with_maf.jsonl"]
+)
+@pytest.mark.parametrize(
+    "make_accumulator",
+    [
+        lambda path: gene_impact.GeneImpactAccumulator(path),
+        lambda path: class_by_freq.ClassByFreqAccumulator(class_by_freq.DEFAULT_THRESHOLDS, path),
+        lambda path: phenotype_link.PhenotypeLinkAccumulator(path, needs_hpo_terms=False),
+    ],
+)
+def test_declared_fields_suffice(inputf, make_accumulator, tmpdir):
+    """Reports must not change when only their declared fields are parsed."""
+    outputs = []
+    for full in (True, False):
+        path_output = f"{tmpdir}/output-{full}.jsonl"
+        accumulator = make_accumulator(path_output)
+        fields = None
+        if not full:
+            fields = projection.compile_projection(VariationArchive.DESCRIPTOR, accumulator.fields)
+        with accumulator:
+            for va in records.iter_variation_archives(f"tests/clinvar_data/data/{inputf}", fields):
+                accumulator.add(va)
+            accumulator.finish()
+        with open(path_output, "rt") as outputf:
+            outputs.append(outputf.read())
+    assert outputs[0]
+    assert outputs[0] == outputs[1]
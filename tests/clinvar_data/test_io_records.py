@@ -0,0 +1,164 @@
+"""Tests for reading and writing record streams in JSONL and binary protobuf format."""
+
+import io
+import os
+
+from click.testing import CliRunner
+import pytest
+
+from clinvar_data import (
+    class_by_freq,
+    conversion,
+    extract_vars,
+    gene_impact,
+    phenotype_link,
+)
+from clinvar_data.io import bgzf, binpb, index, records
+from clinvar_this import cli
+
+
+@pytest.mark.parametrize("value", [0, 1, 127, 128, 300, 2**32, 2**63 - 1])
+def test_varint_roundtrip(value):
+    inputf = io.BytesIO(binpb.encode_varint(value))
+    assert binpb.read_varint(inputf) == value
+    assert binpb.read_varint(inputf) is None
+
+
+def test_iter_delimited_truncated():
+    outputf = io.BytesIO()
+    binpb.write_delimited(outputf, b"12345")
+    with pytest.raises(EOFError):
+        list(binpb.iter_delimited(io.BytesIO(outputf.getvalue()[:-1])))
+
+
+@pytest.mark.parametrize(
+    "path,expected",
+    [
+        ("out.jsonl", records.FORMAT_JSONL),
+        ("out.jsonl.gz", records.FORMAT_JSONL),
+        ("-", records.FORMAT_JSONL),
+        ("out.binpb", records.FORMAT_BINPB),
+        ("out.binpb.gz", records.FORMAT_BINPB),
+        ("out.binpb.zst", records.FORMAT_BINPB),
+    ],
+)
+def test_format_for_path(path, expected):
+    assert records.format_for_path(path) == expected
+
+
+@pytest.fixture
+def converted(tmp_path):
+    """Convert ``ten_records.xml`` to JSONL and return the output path."""
+    path_xml = os.path.dirname(__file__) + "/data/ten_records.xml"
+    path_jsonl = f"{tmp_path}/ten_records.jsonl"
+    assert conversion.convert(path_xml, path_jsonl, show_progress=False) == 0
+    return path_xml, path_jsonl
+
+
+@pytest.mark.parametrize("suffix", ["binpb", "binpb.gz", "binpb.zst", "jsonl.zst"])
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_convert_roundtrip(suffix, jobs, converted, tmp_path):
+    path_xml, path_jsonl = converted
+    path_out = f"{tmp_path}/out.{suffix}"
+    assert conversion.convert(path_xml, path_out, show_progress=False, jobs=jobs) == 0
+
+    expected = list(records.iter_variation_archives(path_jsonl))
+    assert len(expected) == 10
+    assert list(records.iter_variation_archives(path_out)) == expected
+
+
+def _read(path):
+    with open(path, "rt") as inputf:
+        return inputf.read()
+
+
+def test_reports_accept_binpb(converted, tmp_path):
+    path_xml, path_jsonl = converted
+    path_binpb = f"{tmp_path}/ten_records.binpb.zst"
+    assert conversion.convert(path_xml, path_binpb, show_progress=False) == 0
+
+    for path_input, name in ((path_jsonl, "jsonl"), (path_binpb, "binpb")):
+        gene_impact.run_report(path_input, f"{tmp_path}/gene_impact.{name}.jsonl")
+        phenotype_link.run_report(
+            path_input, f"{tmp_path}/phenotype_link.{name}.jsonl", needs_hpo_terms=False
+        )
+        class_by_freq.run_report(
+            path_input, f"{tmp_path}/class_by_freq.{name}.jsonl", class_by_freq.DEFAULT_THRESHOLDS
+        )
+        extract_vars.run(path_input, f"{tmp_path}/extract_vars.{name}", gzip_output=False)
+
+    for report in ("gene_impact", "phenotype_link", "class_by_freq"):
+        expected = _read(f"{tmp_path}/{report}.jsonl.jsonl")
+        assert expected
+        assert _read(f"{tmp_path}/{report}.binpb.jsonl") == expected
+    for fname in os.listdir(f"{tmp_path}/extract_vars.jsonl"):
+        assert _read(f"{tmp_path}/extract_vars.binpb/{fname}") == _read(
+            f"{tmp_path}/extract_vars.jsonl/{fname}"
+        )
+
+
+@pytest.mark.parametrize("suffix", ["jsonl.bgz", "binpb.bgz"])
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_convert_bgzf_with_index(suffix, jobs, converted, tmp_path):
+    path_xml, path_jsonl = converted
+    path_out = f"{tmp_path}/out.{suffix}"
+    assert conversion.convert(path_xml, path_out, show_progress=False, jobs=jobs) == 0
+
+    assert bgzf.is_bgzf(path_out)
+    expected = list(records.iter_variation_archives(path_jsonl))
+    assert list(records.iter_variation_archives(path_out)) == expected
+
+    with index.IndexReader(path_out + index.INDEX_SUFFIX) as index_reader:
+        for va in expected:
+            assert records.fetch_records(path_out, va.accession, index_reader) == [va]
+            for accession, _ in index.record_keys(va)[1:]:
+                assert va in records.fetch_records(path_out, accession, index_reader)
+    assert records.fetch_records(path_out, "VCV999999999") == []
+
+
+def _write_index(path, n):
+    writer = index.IndexWriter(path)
+    for i in range(n):
+        vcv = f"VCV{i:09d}"
+        writer.add([(vcv, 1), (f"SCV{i:09d}", 2)], i << 16, 100, f"state{i}")
+    writer.close()
+
+
+def test_index_lookup_does_not_scan(tmp_path):
+    path = f"{tmp_path}/out.jsonl.bgz.idx"
+    _write_index(path, 20_000)
+    with index.IndexReader(path) as index_reader:
+        steps = []
+        # count the virtual machine instructions, a scan needs more than one per entry
+        index_reader.conn.set_progress_handler(lambda: steps.append(1), 1)
+        assert index_reader.lookup("SCV000012345") == [
+            index.IndexEntry("SCV000012345", 2, "VCV000012345", 12345 << 16, 100)
+        ]
+        assert [entry.accession for entry in index_reader.vcv_entries("VCV000012345")] == [
+            "VCV000012345",
+            "SCV000012345",
+        ]
+        assert len(steps) < 1_000
+
+
+def test_index_rejects_other_files(tmp_path):
+    path = f"{tmp_path}/out.jsonl.bgz.idx"
+    with open(path, "wt") as outputf:
+        print("VCV000000002\t3\tVCV000000002\t0\t100", file=outputf)
+    with pytest.raises(ValueError, match="Not an index"):
+        index.IndexReader(path)
+
+
+def test_cli_fetch(converted, tmp_path):
+    path_xml, path_jsonl = converted
+    path_bgz = f"{tmp_path}/out.jsonl.bgz"
+    assert conversion.convert(path_xml, path_bgz, show_progress=False) == 0
+    va = next(iter(records.iter_variation_archives(path_jsonl)))
+
+    runner = CliRunner()
+    result = runner.invoke(cli.cli, ["data", "fetch", path_bgz, va.accession])
+    assert result.exit_code == 0
+    assert result.output == records.serialize(va, records.FORMAT_JSONL) + "\n"
+
+    result = runner.invoke(cli.cli, ["data", "fetch", path_bgz, "VCV999999999"])
+    assert result.exit_code == 1
@@ -0,0 +1,77 @@
+import pysam
+
+from clinvar_data.conversion import norm_cache, normalizer
+
+
+def test_normalization_cache_roundtrip(tmp_path, fasta_path):
+    cache = norm_cache.NormalizationCache(f"{tmp_path}/cache", "GRCh38", fasta_path)
+    assert cache.get("chr1", 109, "AA", "A") is None
+    cache.put("chr1", 109, "AA", "A", norm_cache.CachedResult(100, "GA", "G", False))
+    cache.close()
+
+    cache = norm_cache.NormalizationCache(f"{tmp_path}/cache", "GRCh38", fasta_path)
+    assert cache.get("chr1", 109, "AA", "A") == norm_cache.CachedResult(100, "GA", "G", False)
+    assert (cache.hits, cache.misses) == (1, 0)
+    # results are by assembly
+    other = norm_cache.NormalizationCache(f"{tmp_path}/cache", "GRCh37", fasta_path)
+    assert other.get("chr1", 109, "AA", "A") is None
+
+
+def test_normalization_cache_get_pending(tmp_path, fasta_path):
+    cache = norm_cache.NormalizationCache(f"{tmp_path}/cache", "GRCh37", fasta_path)
+    result = norm_cache.CachedResult(5, "A", "AT", False)
+    cache.put("chr1", 10, "TA", "TAT", result)
+    assert cache.pending
+    assert cache.get("chr1", 10, "TA", "TAT") == result
+    assert cache.get("chr1", 11, "TA", "TAT") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+    cache.close()
+
+
+def test_normalization_cache_invalidated_on_fasta_change(tmp_path, fasta_path):
+    cache = norm_cache.NormalizationCache(f"{tmp_path}/cache", "GRCh38", fasta_path)
+    cache.put("chr1", 109, "AA", "A", norm_cache.CachedResult(100, "GA", "G", False))
+    cache.close()
+    with open(fasta_path, "at") as outputf:
+        print(">chr3\nACGT", file=outputf)
+
+    cache = norm_cache.NormalizationCache(f"{tmp_path}/cache", "GRCh38", fasta_path)
+    assert cache.get("chr1", 109, "AA", "A") is None
+
+
+def test_dna_normalizer_with_cache(tmp_path, fasta_path):
+    seq = pysam.FastaFile(fasta_path).fetch("chr1", 0, 200)
+    variants = [
+        normalizer.VcfRecord("chr1", 109, "AA", "A"),
+        normalizer.VcfRecord("chr1", 50, "T" if seq[49] != "T" else "G", seq[49]),
+        normalizer.VcfRecord("chr1", 50, seq[49], seq[49]),
+    ]
+    cache = norm_cache.NormalizationCache(f"{tmp_path}/cache", "GRCh38", fasta_path)
+    dna_normalizer = normalizer.DnaNormalizer(fasta_path, cache)
+    expected = [dna_normalizer.normalize_record(variant) for variant in variants]
+    assert dna_normalizer.wrong_ref == 1
+    cache.close()
+
+    cache = norm_cache.NormalizationCache(f"{tmp_path}/cache", "GRCh38", fasta_path)
+    dna_normalizer = normalizer.DnaNormalizer(fasta_path, cache)
+    assert [dna_normalizer.normalize_record(variant) for variant in variants] == expected
+    assert dna_normalizer.wrong_ref == 1
+    assert cache.hits == len(variants)
+    # no access to the FASTA file
+    assert dna_normalizer.fasta_ref.cache_info().misses == 0
+
+
+def test_variation_archive_normalizer_with_cache(tmp_path, fasta_path):
+    va_normalizer = normalizer.VariationArchiveNormalizer(
+        fasta_ref_hg38=fasta_path, cache_dir=f"{tmp_path}/cache"
+    )
+    variant = normalizer.VcfRecord("chr1", 109, "AA", "A")
+    result = va_normalizer.normalizer_hg38.normalize_record(variant)
+    va_normalizer.close()
+    assert va_normalizer.caches == {}
+
+    va_normalizer = normalizer.VariationArchiveNormalizer(
+        fasta_ref_hg38=fasta_path, cache_dir=f"{tmp_path}/cache"
+    )
+    assert va_normalizer.normalizer_hg38.normalize_record(variant) == result
+    assert va_normalizer.caches["GRCh38"].hits == 1
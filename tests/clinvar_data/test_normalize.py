@@ -0,0 +1,97 @@
+import random
+
+import pysam
+import pytest
+
+from clinvar_data.conversion import normalize
+
+
+def normalize_stepwise(pysam_fasta, chrom, pos, ref, alt):
+    """The original implementation, shifting one base at a time (after the REF check)."""
+    keep_working = True
+    while keep_working:
+        keep_working = False
+        if len(ref) > 0 and len(alt) > 0 and ref[-1] == alt[-1]:
+            ref = ref[:-1]
+            alt = alt[:-1]
+            keep_working = True
+        if len(ref) == 0 or len(alt) == 0:
+            preceding_base = pysam_fasta.fetch(chrom, pos - 2, pos - 1)
+            ref = preceding_base + ref
+            alt = preceding_base + alt
+            pos = pos - 1
+            keep_working = True
+    while len(ref) > 1 and len(alt) > 1 and ref[0] == alt[0]:
+        ref = ref[1:]
+        alt = alt[1:]
+        pos = pos + 1
+    return chrom, pos, ref, alt
+
+
+def random_repetitive_seq(rng, length):
+    """Random sequence with homopolymers, STRs, and soft-masked stretches."""
+    parts = []
+    while sum(map(len, parts)) < length:
+        unit = "".join(rng.choice("ACGT") for _ in range(rng.randint(1, 6)))
+        part = unit * rng.randint(1, 40)
+        if rng.random() < 0.1:
+            part = part.lower()
+        parts.append(part)
+    return "".join(parts)[:length]
+
+
+@pytest.fixture
+def fasta(tmp_path):
+    rng = random.Random(7)
+    path = f"{tmp_path}/ref.fa"
+    seqs = {"chr1": random_repetitive_seq(rng, 5000), "chr2": "ACACACACACGT" * 20}
+    with open(path, "wt") as outputf:
+        for name, seq in seqs.items():
+            print(f">{name}\n{seq}", file=outputf)
+    pysam.faidx(path)
+    return pysam.FastaFile(path), seqs
+
+
+def test_normalize_matches_stepwise(fasta):
+    fasta_file, seqs = fasta
+    rng = random.Random(11)
+    compared = 0
+    for _ in range(3000):
+        chrom = rng.choice(list(seqs))
+        seq = seqs[chrom]
+        pos = rng.randint(1, len(seq) - 60)
+        ref = seq[pos - 1 : pos - 1 + rng.randint(0, 8)].upper()
+        kind = rng.random()
+        if kind < 0.4:  # duplication of upstream or downstream sequence
+            alt = ref + seq[pos - 1 + len(ref) : pos - 1 + len(ref) + rng.randint(1, 50)].upper()
+        elif kind < 0.7:  # deletion
+            alt = ref[: rng.randint(0, len(ref))]
+        else:
+            alt = "".join(rng.choice("ACGT") for _ in range(rng.randint(0, 5)))
+        args = (fasta_file, chrom, pos, ref or "-", alt or "-")
+        try:
+            result = normalize.normalize(*args)
+        except (normalize.RefEqualsAltError, normalize.WrongRefError):
+            continue
+        except ValueError:  # left-aligned to contig start
+            with pytest.raises(ValueError):
+                normalize_stepwise(fasta_file, chrom, pos, ref, alt)
+            continue
+        assert result == normalize_stepwise(fasta_file, chrom, pos, ref, alt), args
+        compared += 1
+    assert compared > 1000
+
+
+def test_normalize_long_homopolymer(tmp_path):
+    path = f"{tmp_path}/ref.fa"
+    with open(path, "wt") as outputf:
+        print(">chr1\nG" + "A" * 5000 + "C", file=outputf)
+    pysam.faidx(path)
+    fasta_file = pysam.FastaFile(path)
+    # right-aligned deletion of 10 bases at the end of the run
+    assert normalize.normalize(fasta_file, "chr1", 4992, "A" * 10, "-") == (
+        "chr1",
+        1,
+        "G" + "A" * 10,
+        "G",
+    )
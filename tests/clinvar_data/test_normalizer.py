@@ -0,0 +1,131 @@
+import random
+
+import pysam
+import pytest
+
+from clinvar_data.conversion import normalizer
+
+
+def test_cached_fasta_file_fetch(fasta_path):
+    fasta_file = pysam.FastaFile(fasta_path)
+    cached = normalizer.CachedFastaFile(fasta_file, window_size=16, max_windows=4)
+    rng = random.Random(1)
+    for _ in range(500):
+        chrom = rng.choice(["chr1", "chr2"])
+        start = rng.randint(0, 1100)
+        end = start + rng.randint(0, 50)
+        assert cached.fetch(chrom, start, end) == fasta_file.fetch(chrom, start, end)
+    info = cached.cache_info()
+    assert info.hits > 0 and info.misses > 0
+    assert info.maxsize == 4 and info.currsize == 4
+
+
+def test_cached_fasta_file_counters(fasta_path):
+    cached = normalizer.CachedFastaFile(pysam.FastaFile(fasta_path), window_size=16)
+    cached.fetch("chr1", 0, 10)
+    cached.fetch("chr1", 5, 20)
+    assert cached.cache_info() == normalizer.CacheInfo(
+        hits=1, misses=2, maxsize=normalizer.FASTA_MAX_WINDOWS, currsize=2
+    )
+
+
+def test_dna_normalizer_left_aligns(fasta_path):
+    dna_normalizer = normalizer.DnaNormalizer(fasta_path)
+    seq = pysam.FastaFile(fasta_path).fetch("chr1", 0, 200)
+    # deletion of one "A" at the right end of the homopolymer run (1-based 101-110)
+    variant = normalizer.VcfVariant(chrom="chr1", pos=109, ref="AA", alt="A")
+    result = dna_normalizer.normalize(variant)
+    assert result == normalizer.VcfVariant(chrom="chr1", pos=100, ref=seq[99:101], alt=seq[99])
+    assert dna_normalizer.fasta_ref.cache_info().hits > 0
+
+
+def _make_va(chrom, pos, ref, alt, assembly="GRCh38"):
+    va = normalizer.VariationArchive(accession="VCV000000001", version=1)
+    location = va.classified_record.simple_allele.locations.add()
+    location.sequence_locations.add(
+        assembly=assembly,
+        chr=normalizer.clinvar_public.Chromosome.Value(f"CHROMOSOME_{chrom[3:]}"),
+        position_vcf=pos,
+        reference_allele_vcf=ref,
+        alternate_allele_vcf=alt,
+    )
+    return va
+
+
+def _other_bases(ref):
+    """Return a same-length allele that differs from ``ref`` in each base."""
+    return "".join("G" if base == "T" else "T" for base in ref)
+
+
+@pytest.mark.parametrize(
+    "make_variant,category",
+    [
+        # SNV and MNV
+        (lambda seq: (50, seq[49], _other_bases(seq[49])), "untouched"),
+        (lambda seq: (50, seq[49:52], _other_bases(seq[49:52])), "untouched"),
+        # SNV with wrong REF
+        (lambda seq: (50, _other_bases(seq[49]), seq[49]), "wrong_ref"),
+        # deletion at right end of homopolymer run
+        (lambda seq: (109, "AA", "A"), "normalized"),
+        # ambiguous alternate allele
+        (lambda seq: (50, seq[49], "B"), "expanded_iupac"),
+    ],
+)
+def test_variation_archive_normalizer_categories(fasta_path, make_variant, category):
+    seq = pysam.FastaFile(fasta_path).fetch("chr1")
+    va = _make_va("chr1", *make_variant(seq))
+    va_normalizer = normalizer.VariationArchiveNormalizer(fasta_ref_hg38=fasta_path)
+    result, result_category = va_normalizer.normalize_with_category(va)
+    assert result_category == category
+    if category in ("untouched", "wrong_ref"):
+        assert len(result) == 1 and result[0] is va
+    else:
+        assert len(result) == (3 if category == "expanded_iupac" else 1)
+        assert result[0] is not va
+    va_normalizer.normalize(va)
+    assert va_normalizer.stats == {category: 1}
+
+
+def test_variation_archive_normalizer_fast_path_matches_slow_path(fasta_path):
+    seq = pysam.FastaFile(fasta_path).fetch("chr1")
+    rng = random.Random(7)
+    va_normalizer = normalizer.VariationArchiveNormalizer(fasta_ref_hg38=fasta_path)
+    for _ in range(300):
+        pos = rng.randint(1, len(seq) - 5)
+        length = rng.randint(1, 4)
+        ref = seq[pos - 1 : pos - 1 + length] if rng.random() < 0.9 else "A" * length
+        alt = "".join(rng.choice("ACGT") for _ in range(length))
+        va = _make_va("chr1", pos, ref, alt)
+        category = va_normalizer._fast_path_category(va)
+        if category is None:
+            continue
+        dna_normalizer = va_normalizer.normalizer_hg38.normalizer
+        variant = normalizer.VcfVariant(chrom="chr1", pos=pos, ref=ref, alt=alt)
+        wrong_ref = dna_normalizer.wrong_ref
+        assert dna_normalizer.normalize(variant) == variant
+        assert (category == "wrong_ref") == (dna_normalizer.wrong_ref != wrong_ref)
+
+
+def test_variation_archive_normalizer_without_fasta():
+    va = _make_va("chr1", 50, "A", "C")
+    va_normalizer = normalizer.VariationArchiveNormalizer()
+    assert va_normalizer.normalize_with_category(va) == ([va], "untouched")
+
+
+def test_vcf_variant_record_roundtrip():
+    variant = normalizer.VcfVariant(chrom="chr1", pos=100, ref="A", alt="C")
+    record = variant.to_record()
+    assert record == normalizer.VcfRecord("chr1", 100, "A", "C")
+    assert normalizer.VcfVariant.from_record(record) == variant
+
+
+def test_ambiguous_dna_normalizer_records_match_models(fasta_path):
+    ambiguous_normalizer = normalizer.AmbiguousDnaNormalizer(fasta_path)
+    seq = pysam.FastaFile(fasta_path).fetch("chr1", 0, 200)
+    for ref, alt, pos in (("AA", "A", 109), (seq[49], "B", 50), (seq[49], "AAC", 50)):
+        variant = normalizer.VcfVariant(chrom="chr1", pos=pos, ref=ref, alt=alt)
+        records = ambiguous_normalizer.normalize_record(variant.to_record())
+        assert all(isinstance(record, normalizer.VcfRecord) for record in records)
+        assert ambiguous_normalizer.normalize(variant) == [
+            normalizer.VcfVariant.from_record(record) for record in records
+        ]
@@ -0,0 +1,89 @@
+import json
+
+from click.testing import CliRunner
+import pytest
+
+from clinvar_data import extract_vars, regions
+from clinvar_data.io import records
+from clinvar_this import cli
+
+
+@pytest.mark.parametrize(
+    "region,expected",
+    [
+        ("chr1:1,000-2,000", regions.Interval("1", 1000, 2000)),
+        ("X:5", regions.Interval("X", 5, 5)),
+        ("chrM:1-10", regions.Interval("MT", 1, 10)),
+        ("17", regions.Interval("17", 1, 2**31 - 1)),
+    ],
+)
+def test_parse_region(region, expected):
+    assert regions.parse_region(region) == expected
+
+
+def test_parse_region_invalid():
+    with pytest.raises(ValueError):
+        regions.parse_region("chr1:x-y")
+
+
+@pytest.fixture
+def extracted(tmpdir):
+    """Extract the variants of ``ten_records.jsonl`` and return the GRCh38 seqvars path."""
+    extract_vars.run("tests/clinvar_data/data/ten_records.jsonl", str(tmpdir), gzip_output=True)
+    return f"{tmpdir}/clinvar-variants-grch38-seqvars.jsonl.gz"
+
+
+def _load(path):
+    with records.open_text(path, "rt") as inputf:
+        return [line.rstrip("\n") for line in inputf]
+
+
+@pytest.mark.parametrize("chunk_lines", [3, regions.CHUNK_LINES])
+def test_sort_and_index(chunk_lines, extracted, tmpdir):
+    lines = _load(extracted)
+    path_output = f"{tmpdir}/indexed.tsv.gz"
+    assert regions.sort_and_index(extracted, path_output, chunk_lines=chunk_lines) == len(lines)
+
+    intervals = [regions.record_interval(json.loads(line)) for line in lines]
+    sorted_keys = [regions._sort_key(line) for line in _load(path_output)]
+    assert sorted_keys == sorted(sorted_keys)
+
+    with regions.RegionIndex(path_output) as region_index:
+        for interval in set(intervals):
+            # compare with brute-force overlap computation
+            query = regions.Interval(interval.chrom, interval.start - 100, interval.stop + 100)
+            expected = sorted(
+                line
+                for line, other in zip(lines, intervals)
+                if other.chrom == query.chrom
+                and other.start <= query.stop
+                and other.stop >= query.start
+            )
+            assert sorted(region_index.fetch_lines(query)) == expected
+        assert list(region_index.fetch("chrY:1-1000")) == []
+
+
+def test_cli_query_region(extracted, tmpdir):
+    path_output = f"{tmpdir}/indexed.tsv.gz"
+    runner = CliRunner()
+    result = runner.invoke(cli.cli, ["data", "index-vars", extracted, path_output])
+    assert result.exit_code == 0
+
+    line = _load(extracted)[0]
+    interval = regions.record_interval(json.loads(line))
+    region = f"chr{interval.chrom}:{interval.start}-{interval.stop}"
+    result = runner.invoke(cli.cli, ["data", "query-region", path_output, region])
+    assert result.exit_code == 0
+    assert line in result.output.splitlines()
+
+
+def test_cli_query_region_no_positioned_records(tmpdir):
+    path_input = f"{tmpdir}/unplaced.jsonl"
+    with open(path_input, "wt") as outputf:
+        print(json.dumps({"accession": {"accession": "VCV000000001"}}), file=outputf)
+    path_output = f"{tmpdir}/indexed.tsv.gz"
+    assert regions.sort_and_index(path_input, path_output) == 0
+
+    result = CliRunner().invoke(cli.cli, ["data", "query-region", path_output, "chr1:1-1000"])
+    assert result.exit_code == 0, result.output
+    assert result.output == ""
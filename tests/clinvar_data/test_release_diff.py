@@ -0,0 +1,127 @@
+"""Tests for the changes between two converted releases."""
+
+import os
+
+from click.testing import CliRunner
+import pytest
+
+from clinvar_data import release_diff
+from clinvar_data.io import records
+from clinvar_data.pbs.clinvar_public import AggregateGermlineReviewStatus
+from clinvar_data.pbs.release_diff import ChangeType, ClassificationKind
+from clinvar_this import cli
+
+#: Path to the converted records.
+PATH_JSONL = os.path.dirname(__file__) + "/data/ten_records.jsonl"
+
+
+def _write(path, vas):
+    with records.RecordWriter(path) as writer:
+        for va in vas:
+            writer.write(va)
+
+
+@pytest.fixture
+def releases(tmp_path):
+    """Write old and new release sorted by accession and return their paths."""
+    old = sorted(records.iter_variation_archives(PATH_JSONL), key=lambda va: va.accession)
+    new = [type(va)() for va in old]
+    for va_new, va_old in zip(new, old):
+        va_new.CopyFrom(va_old)
+    # VCV000000002: version and germline classification changed, one SCV removed
+    new[0].version += 1
+    germline = new[0].classified_record.classifications.germline_classification
+    germline.description = "Likely pathogenic"
+    germline.review_status = (
+        AggregateGermlineReviewStatus.AGGREGATE_GERMLINE_REVIEW_STATUS_NO_ASSERTION_CRITERIA_PROVIDED
+    )
+    del new[0].classified_record.clinical_assertions[1]
+    # VCV000000003: SCV with new version
+    new[1].classified_record.clinical_assertions[0].clinvar_accession.version += 1
+    # VCV000000006: removed, VCV999999999: added (with duplicate record)
+    removed = new.pop(2)
+    added = type(removed)()
+    added.CopyFrom(removed)
+    added.accession = "VCV999999999"
+    new += [added, added]
+    path_old = f"{tmp_path}/old.jsonl"
+    path_new = f"{tmp_path}/new.binpb"
+    _write(path_old, old)
+    _write(path_new, new)
+    return path_old, path_new
+
+
+def test_iter_changes(releases):
+    changes = list(release_diff.iter_changes(*releases))
+    assert [
+        (change.change_type, change.old_accession.accession, change.new_accession.accession)
+        for change in changes
+    ] == [
+        (ChangeType.CHANGE_TYPE_UPDATED, "VCV000000002", "VCV000000002"),
+        (ChangeType.CHANGE_TYPE_UPDATED, "VCV000000003", "VCV000000003"),
+        (ChangeType.CHANGE_TYPE_REMOVED, "VCV000000006", ""),
+        (ChangeType.CHANGE_TYPE_ADDED, "", "VCV999999999"),
+    ]
+
+    (classification_change,) = changes[0].classification_changes
+    assert classification_change.kind == ClassificationKind.CLASSIFICATION_KIND_GERMLINE
+    assert classification_change.old_description == "Pathogenic"
+    assert classification_change.new_description == "Likely pathogenic"
+    assert classification_change.old_review_status != classification_change.new_review_status
+    assert [scv.change_type for scv in changes[0].scv_changes] == [ChangeType.CHANGE_TYPE_REMOVED]
+
+    (scv_change,) = changes[1].scv_changes
+    assert scv_change.change_type == ChangeType.CHANGE_TYPE_UPDATED
+    assert scv_change.new_accession.version == scv_change.old_accession.version + 1
+    assert not changes[1].classification_changes
+
+    assert changes[2].scv_changes[0].change_type == ChangeType.CHANGE_TYPE_REMOVED
+    assert changes[3].scv_changes[0].change_type == ChangeType.CHANGE_TYPE_ADDED
+    assert changes[3].classification_changes[0].new_description == "Pathogenic"
+
+
+def test_iter_changes_unsorted(tmp_path):
+    with pytest.raises(ValueError):
+        list(release_diff.iter_changes(PATH_JSONL, PATH_JSONL))
+
+
+@pytest.mark.parametrize("suffix", ["jsonl", "binpb.gz"])
+def test_sort_records(suffix, tmp_path):
+    path_input = f"{tmp_path}/input.{suffix}"
+    path_output = f"{tmp_path}/output.{suffix}"
+    vas = list(records.iter_variation_archives(PATH_JSONL))
+    _write(path_input, vas)
+    assert release_diff.sort_records(path_input, path_output, chunk_records=3) == len(vas)
+    assert list(records.iter_variation_archives(path_output)) == sorted(
+        vas, key=lambda va: va.accession
+    )
+
+
+def test_cli_diff(releases, tmp_path):
+    path_old, path_new = releases
+    path_unsorted = f"{tmp_path}/unsorted.jsonl"
+    _write(path_unsorted, reversed(list(records.iter_variation_archives(path_old))))
+
+    runner = CliRunner()
+    result = runner.invoke(cli.cli, ["data", "diff", path_unsorted, path_new])
+    assert result.exit_code != 0
+    assert "not sorted" in result.output
+
+    path_output = f"{tmp_path}/changes.jsonl"
+    result = runner.invoke(
+        cli.cli, ["data", "diff", "--sort", path_unsorted, path_new, "--output", path_output]
+    )
+    assert result.exit_code == 0, result.output
+    assert len(list(records.iter_serialized(path_output))) == 4
+
+
+def test_cli_diff_bgzf_output(releases, tmp_path):
+    path_output = f"{tmp_path}/changes.jsonl.bgz"
+    result = CliRunner().invoke(cli.cli, ["data", "diff", *releases, "--output", path_output])
+    assert result.exit_code != 0
+    assert "use .gz instead" in result.output
+    assert not os.path.exists(path_output)
+
+    path_output = f"{tmp_path}/changes.jsonl.gz"
+    assert release_diff.run(*releases, path_output) == 4
+    assert len(list(records.iter_serialized(path_output))) == 4
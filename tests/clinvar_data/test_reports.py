@@ -0,0 +1,158 @@
+import os
+
+from click.testing import CliRunner
+from pysam.libcbgzf import BGZFile
+import pytest
+
+from clinvar_data import (
+    class_by_freq,
+    extract_vars,
+    gene_impact,
+    phenotype_link,
+    reports,
+)
+from clinvar_data.io import ranges
+from clinvar_this import cli
+
+
+def _read(path):
+    with open(path, "rt") as inputf:
+        return inputf.read()
+
+
+@pytest.mark.parametrize("inputf", ["ten_records.jsonl", "ex_kynu.jsonl"])
+def test_reports_single_pass(inputf, tmpdir):
+    path_input = f"tests/clinvar_data/data/{inputf}"
+
+    gene_impact.run_report(path_input, f"{tmpdir}/gene_impact.expected.jsonl")
+    phenotype_link.run_report(path_input, f"{tmpdir}/phenotype_link.expected.jsonl")
+    class_by_freq.run_report(
+        path_input, f"{tmpdir}/class_by_freq.expected.jsonl", class_by_freq.DEFAULT_THRESHOLDS
+    )
+    extract_vars.run(path_input, f"{tmpdir}/extract_vars.expected", gzip_output=False)
+
+    result = CliRunner().invoke(
+        cli.cli,
+        [
+            "data",
+            "reports",
+            path_input,
+            "--gene-variant-report",
+            f"{tmpdir}/gene_impact.jsonl",
+            "--gene-phenotype-links",
+            f"{tmpdir}/phenotype_link.jsonl",
+            "--acmg-class-by-freq",
+            f"{tmpdir}/class_by_freq.jsonl",
+            "--extract-vars",
+            f"{tmpdir}/extract_vars",
+            "--no-gzip-output",
+        ],
+    )
+    assert result.exit_code == 0, result.output
+
+    for report in ("gene_impact", "phenotype_link", "class_by_freq"):
+        assert _read(f"{tmpdir}/{report}.jsonl") == _read(f"{tmpdir}/{report}.expected.jsonl")
+    fnames = sorted(os.listdir(f"{tmpdir}/extract_vars.expected"))
+    assert fnames
+    assert sorted(os.listdir(f"{tmpdir}/extract_vars")) == fnames
+    for fname in fnames:
+        assert _read(f"{tmpdir}/extract_vars/{fname}") == _read(
+            f"{tmpdir}/extract_vars.expected/{fname}"
+        )
+
+
+def test_reports_requires_output():
+    result = CliRunner().invoke(
+        cli.cli, ["data", "reports", "tests/clinvar_data/data/ten_records.jsonl"]
+    )
+    assert result.exit_code == 2
+
+
+def test_run_closes_on_error(tmpdir):
+    class Failing(reports.Accumulator):
+        def add(self, va):
+            raise ValueError("failing")
+
+    accumulator = phenotype_link.PhenotypeLinkAccumulator(f"{tmpdir}/out.jsonl")
+    with pytest.raises(ValueError):
+        reports.run("tests/clinvar_data/data/ten_records.jsonl", [accumulator, Failing()])
+    assert accumulator.outputf.closed
+
+
+@pytest.fixture
+def large_jsonl(tmpdir):
+    """Write a JSONL file with the records of ``ten_records.jsonl`` repeated a few times."""
+    with open("tests/clinvar_data/data/ten_records.jsonl", "rt") as inputf:
+        lines = inputf.readlines()
+    path = f"{tmpdir}/input.jsonl"
+    with open(path, "wt") as outputf:
+        for _ in range(5):
+            outputf.writelines(lines)
+    return path
+
+
+@pytest.mark.parametrize("compression", ["", ".bgz"])
+def test_counting_reports_parallel(compression, large_jsonl, tmpdir):
+    path_input = large_jsonl
+    if compression:
+        path_input = f"{large_jsonl}{compression}"
+        with open(large_jsonl, "rb") as inputf, BGZFile(path_input, "wb") as outputf:
+            for line in inputf:
+                outputf.write(line)
+                outputf.flush()  # force many small blocks
+    assert ranges.is_splittable(path_input)
+
+    gene_impact.run_report(path_input, f"{tmpdir}/gene_impact.expected.jsonl")
+    gene_impact.run_report(path_input, f"{tmpdir}/gene_impact.jsonl", processes=3)
+    assert _read(f"{tmpdir}/gene_impact.jsonl") == _read(f"{tmpdir}/gene_impact.expected.jsonl")
+
+    thresholds = class_by_freq.DEFAULT_THRESHOLDS
+    class_by_freq.run_report(path_input, f"{tmpdir}/class_by_freq.expected.jsonl", thresholds)
+    class_by_freq.run_report(path_input, f"{tmpdir}/class_by_freq.jsonl", thresholds, processes=3)
+    assert _read(f"{tmpdir}/class_by_freq.jsonl") == _read(f"{tmpdir}/class_by_freq.expected.jsonl")
+
+
+def test_non_mergeable_reports_fall_back_to_serial(large_jsonl, tmpdir):
+    args = [
+        "data",
+        "reports",
+        large_jsonl,
+        "--gene-variant-report",
+        f"{tmpdir}/gene_impact.jsonl",
+        "--gene-phenotype-links",
+        f"{tmpdir}/phenotype_link.jsonl",
+        "--extract-vars",
+        f"{tmpdir}/extract_vars",
+        "--no-gzip-output",
+    ]
+    result = CliRunner().invoke(cli.cli, args)
+    assert result.exit_code == 0, result.output
+    expected = {
+        report: _read(f"{tmpdir}/{report}.jsonl") for report in ("gene_impact", "phenotype_link")
+    }
+    fnames = sorted(os.listdir(f"{tmpdir}/extract_vars"))
+    expected_vars = {fname: _read(f"{tmpdir}/extract_vars/{fname}") for fname in fnames}
+
+    result = CliRunner().invoke(cli.cli, args + ["--processes", "2"])
+    assert result.exit_code == 0, result.output
+    for report, content in expected.items():
+        assert _read(f"{tmpdir}/{report}.jsonl") == content
+    assert {fname: _read(f"{tmpdir}/extract_vars/{fname}") for fname in fnames} == expected_vars
+
+
+@pytest.mark.parametrize("path,count", [("input.jsonl", 7), ("input.jsonl.bgz", 4)])
+def test_ranges_cover_all_lines(path, count, large_jsonl, tmpdir):
+    with open(large_jsonl, "rb") as inputf:
+        data = inputf.read()
+    path = f"{tmpdir}/{path}"
+    if path.endswith(".bgz"):
+        with BGZFile(path, "wb") as outputf:
+            for start in range(0, len(data), 10_000):
+                outputf.write(data[start : start + 10_000])
+                outputf.flush()
+    lines = [
+        line
+        for start, end in ranges.split(path, count)
+        for line in ranges.iter_lines(path, start, end)
+    ]
+    assert lines == data.decode("utf-8").splitlines()